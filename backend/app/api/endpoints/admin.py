@@ -1,12 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy import and_, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 from app.db.db import get_db
-from app.models.models import User, Restaurant, UserRole
-from app.schemas.schemas import RestaurantCreate, Restaurant as RestaurantSchema, RestaurantUpdate, Login, Token, RestaurantWithOwner, QRCode, QRCodeCreate, EmailAlert, EmailAlertCreate
-from app.core.auth import get_admin_user, get_password_hash, authenticate_user, create_access_token
-from datetime import timedelta
+from app.models.models import User, Restaurant, UserRole, ScheduledJobStatus, RestaurantDeletionJob
+from app.schemas.schemas import RestaurantCreate, Restaurant as RestaurantSchema, RestaurantUpdate, Login, Token, RestaurantWithOwner, QRCode, QRCodeCreate, EmailAlert, EmailAlertCreate, ScheduledJobStatus as ScheduledJobStatusSchema, RestaurantBulkCreate, RestaurantBulkResult, RestaurantBulkItemResult, RestaurantDeletionJob as RestaurantDeletionJobSchema
+from app.core.auth import get_admin_user, get_password_hash, get_password_hashes, authenticate_user, create_access_token
+from datetime import datetime, timedelta, timezone
+import asyncio
+import os
 from app.core.config import settings
+from app.core.pagination import decode_cursor, set_next_cursor_header
+from app.core.etag import etag_matches
+from app.core.profiler import format_collapsed, profiler_lock, sample_stacks
+from app.core.responses import FastJSONResponse
+from app.services.qrcode_service import MEDIA_TYPES, feedback_url, render_qrcode, stream_qrcode_zip
+from app.services.tenant_deletion_service import start_restaurant_deletion, run_restaurant_deletion
+from app.services.version_service import bump_restaurant_version
 
 router = APIRouter()
 
@@ -64,60 +77,158 @@ async def create_restaurant(restaurant: RestaurantCreate, db: Session = Depends(
     
     return db_restaurant
 
+# Event loop'u bcrypt hesaplarıyla bloklamamak için senkron endpoint (thread havuzunda çalışır)
+@router.post("/restaurants/bulk", response_model=RestaurantBulkResult)
+def create_restaurants_bulk(payload: RestaurantBulkCreate, db: Session = Depends(get_db), current_user: User = Depends(get_admin_user)):
+    """
+    Çok sayıda restoranı sahipleriyle birlikte tek transaction'da oluşturur
+
+    Subdomain ve e-posta çakışmaları tek sorguda kontrol edilir, şifreler paralel
+    hash'lenir ve kayıtlar toplu eklenir. Sonuç her kayıt için ayrı raporlanır.
+    """
+    items = payload.restaurants
+    results = {}
+
+    # Mevcut subdomain ve e-postaları tek IN sorgusuyla getir
+    existing_subdomains = {
+        subdomain for (subdomain,) in db.query(Restaurant.subdomain).filter(Restaurant.subdomain.in_({item.subdomain for item in items}))
+    }
+    existing_emails = {
+        email for (email,) in db.query(User.email).filter(User.email.in_({item.owner_email for item in items}))
+    }
+
+    valid = []
+    for index, item in enumerate(items):
+        if item.subdomain in existing_subdomains:
+            results[index] = "Subdomain already registered"
+        elif item.owner_email in existing_emails:
+            results[index] = "Email already registered"
+        else:
+            # Aynı istekteki tekrarları da yakala
+            existing_subdomains.add(item.subdomain)
+            existing_emails.add(item.owner_email)
+            valid.append((index, item))
+
+    if valid:
+        hashed_passwords = get_password_hashes([item.owner_password for _, item in valid])
+        try:
+            restaurant_rows = db.execute(
+                insert(Restaurant).returning(Restaurant.id, Restaurant.subdomain),
+                [{"name": item.name, "subdomain": item.subdomain} for _, item in valid],
+            ).all()
+            restaurant_ids = {row.subdomain: row.id for row in restaurant_rows}
+
+            db.execute(
+                insert(User),
+                [
+                    {
+                        "email": item.owner_email,
+                        "hashed_password": hashed_password,
+                        "role": UserRole.RESTAURANT_OWNER,
+                        "is_active": True,
+                        "restaurant_id": restaurant_ids[item.subdomain],
+                    }
+                    for (_, item), hashed_password in zip(valid, hashed_passwords)
+                ],
+            )
+            db.commit()
+            for index, item in valid:
+                results[index] = restaurant_ids[item.subdomain]
+        except IntegrityError:
+            # Kontrol ile ekleme arasında eşzamanlı bir kayıt çakışma yarattı
+            db.rollback()
+            for index, _ in valid:
+                results[index] = "Subdomain or email registered concurrently, please retry"
+
+    item_results = []
+    for index, item in enumerate(items):
+        outcome = results[index]
+        success = isinstance(outcome, int)
+        item_results.append(RestaurantBulkItemResult(
+            index=index,
+            subdomain=item.subdomain,
+            owner_email=item.owner_email,
+            success=success,
+            restaurant_id=outcome if success else None,
+            detail=None if success else outcome,
+        ))
+
+    created = sum(1 for result in item_results if result.success)
+    return RestaurantBulkResult(created=created, failed=len(items) - created, results=item_results)
+
+def _restaurants_with_owner_query(db: Session):
+    """
+    Restoranları sahipleriyle birlikte tek sorguda, yalnızca gereken kolonlarla getirir
+    """
+    return (
+        db.query(
+            Restaurant.id,
+            Restaurant.name,
+            Restaurant.subdomain,
+            Restaurant.created_at,
+            Restaurant.updated_at,
+            User.id.label("owner_id"),
+            User.email.label("owner_email"),
+            User.role.label("owner_role"),
+            User.is_active.label("owner_is_active"),
+        )
+        .outerjoin(User, and_(User.restaurant_id == Restaurant.id, User.role == UserRole.RESTAURANT_OWNER))
+        .filter(Restaurant.deleted_at.is_(None))
+        # Birden fazla sahip varsa her restoran için ilk sahibi al
+        .distinct(Restaurant.id)
+        .order_by(Restaurant.id, User.id)
+    )
+
+def _restaurant_row_to_dict(row):
+    # Alanlar RestaurantWithOwner şemasının sırasıyla; liste yanıtı bu dict'leri doğrudan serileştirir
+    return {
+        "name": row.name,
+        "subdomain": row.subdomain,
+        "id": row.id,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+        "owner": {
+            "email": row.owner_email,
+            "id": row.owner_id,
+            "role": row.owner_role,
+            "is_active": row.owner_is_active,
+            "restaurant_id": row.id
+        } if row.owner_id is not None else None
+    }
+
 @router.get("/restaurants", response_model=List[RestaurantWithOwner])
-async def read_restaurants(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: User = Depends(get_admin_user)):
-    restaurants = db.query(Restaurant).offset(skip).limit(limit).all()
-    
-    # Manually create response with owner details
-    result = []
-    for restaurant in restaurants:
-        owner = db.query(User).filter(User.restaurant_id == restaurant.id, User.role == UserRole.RESTAURANT_OWNER).first()
-        restaurant_dict = {
-            "id": restaurant.id,
-            "name": restaurant.name,
-            "subdomain": restaurant.subdomain,
-            "created_at": restaurant.created_at,
-            "updated_at": restaurant.updated_at,
-            "owner": {
-                "id": owner.id if owner else None,
-                "email": owner.email if owner else None,
-                "role": owner.role if owner else None,
-                "is_active": owner.is_active if owner else None
-            } if owner else None
-        }
-        result.append(restaurant_dict)
-    
-    return result
+async def read_restaurants(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_db), current_user: User = Depends(get_admin_user)):
+    """
+    Restoranları sahipleriyle birlikte listeler
+
+    cursor verilirse keyset sayfalama (id > son id) kullanılır ve skip yok sayılır.
+    Sonraki sayfanın cursor'ı X-Next-Cursor header'ında döner.
+    """
+    query = _restaurants_with_owner_query(db)
+    if cursor:
+        (after_id,) = decode_cursor(cursor, 1)
+        if not isinstance(after_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.filter(Restaurant.id > after_id)
+    else:
+        query = query.offset(skip)
+    rows = query.limit(limit).all()
+    response = FastJSONResponse([_restaurant_row_to_dict(row) for row in rows])
+    set_next_cursor_header(response, rows, limit, "id")
+
+    return response
 
 @router.get("/restaurants/{restaurant_id}", response_model=RestaurantWithOwner)
 async def read_restaurant(restaurant_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_admin_user)):
-    db_restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
-    if db_restaurant is None:
+    row = _restaurants_with_owner_query(db).filter(Restaurant.id == restaurant_id).first()
+    if row is None:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
-    # Get owner details
-    owner = db.query(User).filter(User.restaurant_id == restaurant_id, User.role == UserRole.RESTAURANT_OWNER).first()
-    
-    # Create response with owner details
-    result = {
-        "id": db_restaurant.id,
-        "name": db_restaurant.name,
-        "subdomain": db_restaurant.subdomain,
-        "created_at": db_restaurant.created_at,
-        "updated_at": db_restaurant.updated_at,
-        "owner": {
-            "id": owner.id if owner else None,
-            "email": owner.email if owner else None,
-            "role": owner.role if owner else None,
-            "is_active": owner.is_active if owner else None
-        } if owner else None
-    }
-    
-    return result
+    return _restaurant_row_to_dict(row)
 
 @router.patch("/restaurants/{restaurant_id}", response_model=RestaurantSchema)
 async def update_restaurant(restaurant_id: int, restaurant: RestaurantUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_admin_user)):
-    db_restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    db_restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id, Restaurant.deleted_at.is_(None)).first()
     if db_restaurant is None:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
@@ -146,38 +257,52 @@ async def update_restaurant(restaurant_id: int, restaurant: RestaurantUpdate, db
             db.add(db_owner)
     
     db.add(db_restaurant)
+    bump_restaurant_version(db, restaurant_id)
     db.commit()
     db.refresh(db_restaurant)
     return db_restaurant
 
-@router.delete("/restaurants/{restaurant_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_restaurant(restaurant_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_admin_user)):
+@router.delete("/restaurants/{restaurant_id}", response_model=RestaurantDeletionJobSchema, status_code=status.HTTP_202_ACCEPTED)
+async def delete_restaurant(restaurant_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db), current_user: User = Depends(get_admin_user)):
+    """
+    Restoranı hemen devre dışı bırakır, bağlı verileri arka planda parça parça siler
+    """
     db_restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
     if db_restaurant is None:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
-    # Delete restaurant owner
-    db_owner = db.query(User).filter(User.restaurant_id == restaurant_id, User.role == UserRole.RESTAURANT_OWNER).first()
-    if db_owner:
-        db.delete(db_owner)
+    if db_restaurant.deleted_at is not None:
+        # Silme zaten başlamış, mevcut işi döndür
+        job = db.query(RestaurantDeletionJob).filter(RestaurantDeletionJob.restaurant_id == restaurant_id).order_by(RestaurantDeletionJob.id.desc()).first()
+        if job is not None:
+            return job
     
-    # Delete restaurant
-    db.delete(db_restaurant)
-    db.commit()
-    return None
+    job = start_restaurant_deletion(db, db_restaurant)
+    background_tasks.add_task(run_restaurant_deletion, job.id)
+    return job
+
+@router.get("/restaurants/{restaurant_id}/deletion", response_model=RestaurantDeletionJobSchema)
+async def read_restaurant_deletion(restaurant_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_admin_user)):
+    """
+    Restoran silme işinin durumunu ve tablo bazında ilerlemesini döner
+    """
+    job = db.query(RestaurantDeletionJob).filter(RestaurantDeletionJob.restaurant_id == restaurant_id).order_by(RestaurantDeletionJob.id.desc()).first()
+    if job is None:
+        raise HTTPException(status_code=404, detail="Deletion job not found")
+    return job
 
 # QR Kod Yönetimi API'leri
 @router.post("/qrcode", response_model=QRCode)
 async def create_qrcode(qrcode: QRCodeCreate, db: Session = Depends(get_db), current_user: User = Depends(get_admin_user)):
     # Check if restaurant exists
-    db_restaurant = db.query(Restaurant).filter(Restaurant.id == qrcode.restaurant_id).first()
+    db_restaurant = db.query(Restaurant).filter(Restaurant.id == qrcode.restaurant_id, Restaurant.deleted_at.is_(None)).first()
     if not db_restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
     # Create QR code
     db_qrcode = QRCode(
         restaurant_id=qrcode.restaurant_id,
-        url=f"{settings.FRONTEND_URL}/user-feedback?restaurant={qrcode.restaurant_id}",
+        url=feedback_url(qrcode.restaurant_id),
         size=qrcode.size
     )
     
@@ -187,18 +312,56 @@ async def create_qrcode(qrcode: QRCodeCreate, db: Session = Depends(get_db), cur
 async def read_qrcodes(db: Session = Depends(get_db), current_user: User = Depends(get_admin_user)):
     # In a real implementation, we would store QR codes in the database
     # For now, we'll return a list of QR codes for all restaurants
-    restaurants = db.query(Restaurant).all()
+    restaurants = db.query(Restaurant.id).filter(Restaurant.deleted_at.is_(None)).all()
     qrcodes = []
     
     for restaurant in restaurants:
         qrcodes.append(QRCode(
             restaurant_id=restaurant.id,
-            url=f"{settings.FRONTEND_URL}/user-feedback?restaurant={restaurant.id}",
+            url=feedback_url(restaurant.id),
             size=180
         ))
     
     return qrcodes
 
+@router.get("/qrcode/export")
+async def export_qrcodes(
+    size: int = Query(180, ge=64, le=2048),
+    format: Literal["png", "svg"] = "png",
+    current_user: User = Depends(get_admin_user),
+):
+    """
+    Tüm restoranların QR kodlarını ZIP arşivi olarak akış halinde indirir
+    """
+    return StreamingResponse(
+        stream_qrcode_zip(size, format),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="qrcodes-{size}.zip"'},
+    )
+
+@router.get("/qrcode/{restaurant_id}/image")
+async def get_qrcode_image(
+    restaurant_id: int,
+    request: Request,
+    size: int = Query(180, ge=64, le=2048),
+    format: Literal["png", "svg"] = "png",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user),
+):
+    """
+    Restoranın geri bildirim adresini PNG veya SVG QR kod olarak render eder
+    """
+    db_restaurant = db.query(Restaurant.id).filter(Restaurant.id == restaurant_id, Restaurant.deleted_at.is_(None)).first()
+    if not db_restaurant:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    
+    etag, data = await run_in_threadpool(render_qrcode, feedback_url(restaurant_id), size, format)
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=86400"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=data, media_type=MEDIA_TYPES[format], headers=headers)
+
 # E-posta Bildirim API'leri
 @router.post("/email-alerts", response_model=EmailAlert)
 async def create_email_alert(email_alert: EmailAlertCreate, db: Session = Depends(get_db), current_user: User = Depends(get_admin_user)):
@@ -224,4 +387,44 @@ async def read_email_alerts(db: Session = Depends(get_db), current_user: User =
             notify_on_low_rating=True,
             notify_on_new_feedback=True
         )
-    ] 
\ No newline at end of file
+    ]
+
+# Zamanlayıcı API'leri
+@router.get("/scheduler/jobs", response_model=List[ScheduledJobStatusSchema])
+async def read_scheduler_jobs(db: Session = Depends(get_db), current_user: User = Depends(get_admin_user)):
+    """
+    Zamanlanmış işlerin son çalışma zamanlarını, sürelerini ve durumlarını döner
+    """
+    return db.query(ScheduledJobStatus).order_by(ScheduledJobStatus.job_id).all()
+
+# Profil API'leri
+@router.post("/profile")
+async def profile_worker(
+    seconds: float = Query(10, gt=0, le=60),
+    interval_ms: int = Query(10, ge=1, le=1000),
+    include_idle: bool = False,
+    current_user: User = Depends(get_admin_user),
+):
+    """
+    İsteği karşılayan worker'ı verilen süre boyunca örnekleyerek profiller
+
+    Thread yığınları ve asyncio task'larının await zincirleri collapsed formatta
+    döner (flamegraph.pl veya speedscope ile açılabilir). Aynı worker'da ikinci bir
+    oturum 409 ile reddedilir.
+    """
+    if not profiler_lock.acquire(blocking=False):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profiling session is already running in this worker")
+    try:
+        stacks = await run_in_threadpool(sample_stacks, seconds, interval_ms / 1000, asyncio.get_running_loop(), include_idle)
+    finally:
+        profiler_lock.release()
+
+    filename = f"profile-{os.getpid()}-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.folded"
+    return PlainTextResponse(
+        format_collapsed(stacks),
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Profile-Samples": str(sum(stacks.values())),
+            "X-Profile-Worker": str(os.getpid()),
+        },
+    )
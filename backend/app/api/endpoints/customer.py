@@ -1,16 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Header, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.db.db import get_db
-from app.models.models import Restaurant, Feedback, Complaint, Platform, RatingStatistics, StarClickStatistics
+from app.models.models import Restaurant, Feedback, Complaint, Platform, RatingStatistics, StarClickStatistics, ArchiveRollup
 from app.schemas.schemas import FeedbackCreate, Feedback as FeedbackSchema, ComplaintCreate, Complaint as ComplaintSchema, FeedbackStats, Platform as PlatformSchema, Restaurant as RestaurantSchema
 from app.core.auth import get_restaurant_id_from_host
 from sqlalchemy import func
 from datetime import datetime
 from app.core.email import send_low_rating_notification
 from app.core.config import settings
+from app.core.pagination import paginate_by_created_at, set_next_cursor_header
+from app.core.responses import rows_response, schema_columns
+from app.core.etag import not_modified
 import logging
 from app.services.email_service import process_low_rating_feedback
+from app.services.archive_service import archived_count, archived_rating_sum
+from app.services.version_service import PUBLIC_CACHE_CONTROL, restaurant_changes, restaurant_etag
 
 router = APIRouter()
 
@@ -22,26 +27,32 @@ def get_restaurant_from_host(host: Optional[str] = Header(None), db: Session = D
     if not restaurant_id:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id, Restaurant.deleted_at.is_(None)).first()
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
     return restaurant
 
 @router.get("/restaurants/{restaurant_id}", response_model=RestaurantSchema)
-async def get_restaurant_details(restaurant_id: int, db: Session = Depends(get_db)):
+async def get_restaurant_details(restaurant_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get restaurant details by ID"""
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id, Restaurant.deleted_at.is_(None)).first()
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
+    cached = not_modified(request, response, restaurant_etag(db, restaurant_id, "details"), PUBLIC_CACHE_CONTROL)
+    if cached:
+        return cached
     return restaurant
 
 @router.get("/restaurants/subdomain/{subdomain}", response_model=RestaurantSchema)
-async def get_restaurant_by_subdomain(subdomain: str, db: Session = Depends(get_db)):
+async def get_restaurant_by_subdomain(subdomain: str, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get restaurant details by subdomain"""
-    restaurant = db.query(Restaurant).filter(Restaurant.subdomain == subdomain).first()
+    restaurant = db.query(Restaurant).filter(Restaurant.subdomain == subdomain, Restaurant.deleted_at.is_(None)).first()
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
+    cached = not_modified(request, response, restaurant_etag(db, restaurant.id, "details"), PUBLIC_CACHE_CONTROL)
+    if cached:
+        return cached
     return restaurant
 
 @router.post("/feedbacks", response_model=FeedbackSchema)
@@ -50,7 +61,7 @@ async def create_feedback(feedback: FeedbackCreate, db: Session = Depends(get_db
     Müşteri geri bildirimi oluşturur
     """
     # Restoranın varlığını kontrol et
-    restaurant = db.query(Restaurant).filter(Restaurant.id == feedback.restaurant_id).first()
+    restaurant = db.query(Restaurant).filter(Restaurant.id == feedback.restaurant_id, Restaurant.deleted_at.is_(None)).first()
     if not restaurant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -76,6 +87,8 @@ async def create_feedback(feedback: FeedbackCreate, db: Session = Depends(get_db
     db.add(db_feedback)
     db.commit()
     db.refresh(db_feedback)
+    # Canlı dashboard'lara bildirim ve sürüm artışı istek dışında, partiler halinde yapılır
+    restaurant_changes.comment_added(db_feedback.restaurant_id, "feedback", db_feedback.id)
     
     # Düşük puan ise e-posta bildirimi gönder (3 yıldızdan düşük)
     if db_feedback.average_rating < 3:
@@ -97,23 +110,23 @@ async def get_feedback_stats(db: Session = Depends(get_db)):
     # Get rating distribution
     rating_distribution = {}
     for i in range(1, 6):
-        count = db.query(func.count(Feedback.id)).filter(
+        count = (db.query(func.count(Feedback.id)).filter(
             func.round(Feedback.average_rating) == i
-        ).scalar() or 0
+        ).scalar() or 0) + archived_count(db, "feedbacks", None, func.round(ArchiveRollup.value) == i)
         rating_distribution[f"{i} Yıldız"] = count
     
-    # Get satisfaction data
+    # Get satisfaction data (including archived rows)
     satisfaction_data = {
-        "Memnun (4-5)": db.query(func.count(Feedback.id)).filter(
+        "Memnun (4-5)": (db.query(func.count(Feedback.id)).filter(
             Feedback.average_rating >= 4
-        ).scalar() or 0,
-        "Orta (3)": db.query(func.count(Feedback.id)).filter(
+        ).scalar() or 0) + archived_count(db, "feedbacks", None, ArchiveRollup.value >= 4),
+        "Orta (3)": (db.query(func.count(Feedback.id)).filter(
             Feedback.average_rating >= 3,
             Feedback.average_rating < 4
-        ).scalar() or 0,
-        "Memnun Değil (1-2)": db.query(func.count(Feedback.id)).filter(
+        ).scalar() or 0) + archived_count(db, "feedbacks", None, ArchiveRollup.value >= 3, ArchiveRollup.value < 4),
+        "Memnun Değil (1-2)": (db.query(func.count(Feedback.id)).filter(
             Feedback.average_rating < 3
-        ).scalar() or 0,
+        ).scalar() or 0) + archived_count(db, "feedbacks", None, ArchiveRollup.value < 3),
     }
     
     return {
@@ -127,7 +140,7 @@ async def create_complaint(complaint: ComplaintCreate, db: Session = Depends(get
     Müşteri şikayeti oluşturur
     """
     # Restoranın varlığını kontrol et
-    restaurant = db.query(Restaurant).filter(Restaurant.id == complaint.restaurant_id).first()
+    restaurant = db.query(Restaurant).filter(Restaurant.id == complaint.restaurant_id, Restaurant.deleted_at.is_(None)).first()
     if not restaurant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -153,6 +166,8 @@ async def create_complaint(complaint: ComplaintCreate, db: Session = Depends(get
     db.add(db_complaint)
     db.commit()
     db.refresh(db_complaint)
+    # Canlı dashboard'lara bildirim ve sürüm artışı istek dışında, partiler halinde yapılır
+    restaurant_changes.comment_added(db_complaint.restaurant_id, "complaint", db_complaint.id)
     
     # E-posta bildirimi gönder
     try:
@@ -168,39 +183,51 @@ async def create_complaint(complaint: ComplaintCreate, db: Session = Depends(get
     return db_complaint
 
 @router.get("/{restaurant_id}/feedbacks", response_model=List[FeedbackSchema])
-async def get_restaurant_feedbacks(restaurant_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_restaurant_feedbacks(restaurant_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_db)):
     """Get feedbacks for a restaurant"""
     # Check if restaurant exists
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id, Restaurant.deleted_at.is_(None)).first()
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
     # Get feedbacks
-    feedbacks = db.query(Feedback).filter(Feedback.restaurant_id == restaurant_id).order_by(Feedback.created_at.desc()).offset(skip).limit(limit).all()
+    query = db.query(*schema_columns(Feedback, FeedbackSchema)).filter(Feedback.restaurant_id == restaurant_id)
+    feedbacks = paginate_by_created_at(query, Feedback, cursor, skip).limit(limit).all()
+    response = rows_response(feedbacks)
+    set_next_cursor_header(response, feedbacks, limit, "created_at", "id")
     
-    return feedbacks
+    return response
 
 @router.get("/{restaurant_id}/analytics")
-async def get_restaurant_analytics(restaurant_id: int, db: Session = Depends(get_db)):
+async def get_restaurant_analytics(restaurant_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get analytics for a restaurant"""
     # Check if restaurant exists
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id, Restaurant.deleted_at.is_(None)).first()
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
-    # Get total feedbacks
-    total_feedbacks = db.query(func.count(Feedback.id)).filter(Feedback.restaurant_id == restaurant_id).scalar() or 0
+    # Return 304 before running the aggregation queries if nothing changed
+    cached = not_modified(request, response, restaurant_etag(db, restaurant_id, "analytics"), PUBLIC_CACHE_CONTROL)
+    if cached:
+        return cached
+    
+    # Get total feedbacks (including archived rows)
+    total_feedbacks = (db.query(func.count(Feedback.id)).filter(Feedback.restaurant_id == restaurant_id).scalar() or 0) + archived_count(db, "feedbacks", restaurant_id)
     
     # Get average rating
-    avg_rating = db.query(func.avg(Feedback.average_rating)).filter(Feedback.restaurant_id == restaurant_id).scalar() or 0
+    rating_sum = (db.query(func.sum(Feedback.average_rating)).filter(Feedback.restaurant_id == restaurant_id).scalar() or 0) + archived_rating_sum(db, "feedbacks", restaurant_id)
+    avg_rating = rating_sum / total_feedbacks if total_feedbacks else 0
+    
+    # Get average sentiment of scored comments
+    avg_sentiment = db.query(func.avg(Feedback.sentiment_score)).filter(Feedback.restaurant_id == restaurant_id).scalar()
     
     # Get rating distribution
     rating_distribution = {}
     for i in range(1, 6):
-        count = db.query(func.count(Feedback.id)).filter(
+        count = (db.query(func.count(Feedback.id)).filter(
             Feedback.restaurant_id == restaurant_id,
             func.round(Feedback.average_rating) == i
-        ).scalar() or 0
+        ).scalar() or 0) + archived_count(db, "feedbacks", restaurant_id, func.round(ArchiveRollup.value) == i)
         rating_distribution[f"{i} Yıldız"] = count
     
     # Get detailed rating statistics
@@ -231,24 +258,25 @@ async def get_restaurant_analytics(restaurant_id: int, db: Session = Depends(get
     
     # Get satisfaction data
     satisfaction_data = {
-        "Memnun (4-5)": db.query(func.count(Feedback.id)).filter(
+        "Memnun (4-5)": (db.query(func.count(Feedback.id)).filter(
             Feedback.restaurant_id == restaurant_id,
             Feedback.average_rating >= 4
-        ).scalar() or 0,
-        "Orta (3)": db.query(func.count(Feedback.id)).filter(
+        ).scalar() or 0) + archived_count(db, "feedbacks", restaurant_id, ArchiveRollup.value >= 4),
+        "Orta (3)": (db.query(func.count(Feedback.id)).filter(
             Feedback.restaurant_id == restaurant_id,
             Feedback.average_rating >= 3,
             Feedback.average_rating < 4
-        ).scalar() or 0,
-        "Memnun Değil (1-2)": db.query(func.count(Feedback.id)).filter(
+        ).scalar() or 0) + archived_count(db, "feedbacks", restaurant_id, ArchiveRollup.value >= 3, ArchiveRollup.value < 4),
+        "Memnun Değil (1-2)": (db.query(func.count(Feedback.id)).filter(
             Feedback.restaurant_id == restaurant_id,
             Feedback.average_rating < 3
-        ).scalar() or 0,
+        ).scalar() or 0) + archived_count(db, "feedbacks", restaurant_id, ArchiveRollup.value < 3),
     }
     
     return {
         "total_feedbacks": total_feedbacks,
         "average_rating": round(avg_rating, 1) if avg_rating else 0,
+        "average_sentiment": round(avg_sentiment, 2) if avg_sentiment is not None else None,
         "rating_distribution": rating_distribution,
         "satisfaction_data": satisfaction_data,
         "detailed_stats": detailed_stats,
@@ -256,18 +284,22 @@ async def get_restaurant_analytics(restaurant_id: int, db: Session = Depends(get
     }
 
 @router.get("/{restaurant_id}/platforms", response_model=List[PlatformSchema])
-async def get_restaurant_platforms(restaurant_id: int, db: Session = Depends(get_db)):
+async def get_restaurant_platforms(restaurant_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Restoran için platformları getirir
     """
     # Restoranın varlığını kontrol et
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id, Restaurant.deleted_at.is_(None)).first()
     if not restaurant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Restoran bulunamadı"
         )
     
+    cached = not_modified(request, response, restaurant_etag(db, restaurant_id, "platforms"), PUBLIC_CACHE_CONTROL)
+    if cached:
+        return cached
+    
     # Platformları getir
     platforms = db.query(Platform).filter(Platform.restaurant_id == restaurant_id).all()
     return platforms
@@ -279,7 +311,7 @@ async def send_test_email(restaurant_id: int, email: str, db: Session = Depends(
     """
     try:
         # Restoranın varlığını kontrol et
-        restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+        restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id, Restaurant.deleted_at.is_(None)).first()
         if not restaurant:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -358,7 +390,7 @@ async def send_test_email(restaurant_id: int, email: str, db: Session = Depends(
 async def track_star_click(restaurant_id: int, star_value: int, db: Session = Depends(get_db)):
     """Track star click statistics"""
     # Check if restaurant exists
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id, Restaurant.deleted_at.is_(None)).first()
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
@@ -384,16 +416,21 @@ async def track_star_click(restaurant_id: int, star_value: int, db: Session = De
         stat.updated_at = datetime.utcnow()
     
     db.commit()
+    restaurant_changes.restaurant_changed(restaurant_id)
     return {"success": True, "message": "Star click tracked successfully"}
 
 @router.get("/restaurants/{restaurant_id}/star-clicks")
-async def get_star_click_stats(restaurant_id: int, db: Session = Depends(get_db)):
+async def get_star_click_stats(restaurant_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """Get star click statistics for a restaurant"""
     # Check if restaurant exists
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id, Restaurant.deleted_at.is_(None)).first()
     if not restaurant:
         raise HTTPException(status_code=404, detail="Restaurant not found")
     
+    cached = not_modified(request, response, restaurant_etag(db, restaurant_id, "star_click_stats"), PUBLIC_CACHE_CONTROL)
+    if cached:
+        return cached
+    
     # Get statistics
     stats = db.query(StarClickStatistics).filter(
         StarClickStatistics.restaurant_id == restaurant_id
@@ -420,15 +457,19 @@ async def get_star_click_stats(restaurant_id: int, db: Session = Depends(get_db)
 
 # Restoran detayları için endpoint ekle (frontend uyumluluğu için)
 @router.get("/restaurant/details/{restaurant_id}", response_model=RestaurantSchema)
-async def get_restaurant_details_redirect(restaurant_id: int, db: Session = Depends(get_db)):
+async def get_restaurant_details_redirect(restaurant_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Belirli bir restoranın detaylarını getirir (frontend uyumluluğu için)
     """
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id, Restaurant.deleted_at.is_(None)).first()
     if not restaurant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Restoran bulunamadı"
         )
+    
+    cached = not_modified(request, response, restaurant_etag(db, restaurant_id, "details"), PUBLIC_CACHE_CONTROL)
+    if cached:
+        return cached
         
     return restaurant 
\ No newline at end of file
@@ -1,13 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 from app.db.db import get_db
-from app.models.models import User, Restaurant, Feedback, Complaint, Platform, StarClick, StarClickStatistics
-from app.schemas.schemas import Login, Token, UserUpdate, Platform as PlatformSchema, PlatformCreate, PlatformUpdate, DashboardData, Feedback as FeedbackSchema, Restaurant as RestaurantSchema
-from app.core.auth import get_restaurant_owner, get_password_hash, authenticate_user, create_access_token
+from app.models.models import User, Restaurant, Feedback, Complaint, Platform, StarClick, ArchiveRollup
+from app.schemas.schemas import Login, Token, UserUpdate, Platform as PlatformSchema, PlatformCreate, PlatformUpdate, DashboardData, Feedback as FeedbackSchema, FeedbackSearchResult, TopicCount, Restaurant as RestaurantSchema, StreamTicket
+from app.core.auth import get_restaurant_owner, get_stream_restaurant_owner, get_password_hash, authenticate_user, create_access_token, create_stream_ticket
 from datetime import timedelta
 from app.core.config import settings
-from sqlalchemy import func
+from app.core.pagination import paginate_by_created_at, set_next_cursor_header
+from app.core.responses import rows_response, schema_columns
+from app.core.etag import not_modified
+from app.services.export_service import MEDIA_TYPES, parquet_available, stream_query
+from app.services.archive_service import archived_count
+from app.services.dashboard_service import dashboard_data
+from app.services.event_service import KEEPALIVE_INTERVAL, event_hub, format_event, load_dashboard
+from app.services.search_service import search_feedbacks
+from app.services.topic_service import top_topics
+from app.services.version_service import PRIVATE_CACHE_CONTROL, PUBLIC_CACHE_CONTROL, bump_restaurant_version, restaurant_changes, restaurant_etag
+from sqlalchemy import func, literal
 from datetime import datetime
 
 router = APIRouter()
@@ -34,130 +47,81 @@ async def restaurant_login(login: Login, db: Session = Depends(get_db)):
     }
 
 @router.get("/dashboard", response_model=DashboardData)
-async def get_dashboard_data(db: Session = Depends(get_db), current_user: User = Depends(get_restaurant_owner)):
+async def get_dashboard_data(request: Request, response: Response, db: Session = Depends(get_db), current_user: User = Depends(get_restaurant_owner)):
     """
     Get dashboard data for the current restaurant
     """
     restaurant_id = current_user.restaurant_id
     
-    # Get total feedbacks (including complaints)
-    feedbacks_count = db.query(func.count(Feedback.id)).filter(Feedback.restaurant_id == restaurant_id).scalar() or 0
-    complaints_count = db.query(func.count(Complaint.id)).filter(Complaint.restaurant_id == restaurant_id).scalar() or 0
-    total_feedbacks = feedbacks_count + complaints_count
+    # Son istekten beri veri değişmediyse toplamları hesaplamadan 304 dön
+    cached = not_modified(request, response, restaurant_etag(db, restaurant_id, "dashboard"), PRIVATE_CACHE_CONTROL)
+    if cached:
+        return cached
     
-    # Get average rating (including complaints)
-    avg_feedback_rating = db.query(func.avg(Feedback.average_rating)).filter(Feedback.restaurant_id == restaurant_id).scalar() or 0
-    avg_complaint_rating = db.query(func.avg(Complaint.average_rating)).filter(Complaint.restaurant_id == restaurant_id).scalar() or 0
-    
-    # Calculate weighted average
-    if feedbacks_count + complaints_count > 0:
-        avg_rating = (avg_feedback_rating * feedbacks_count + avg_complaint_rating * complaints_count) / (feedbacks_count + complaints_count)
-    else:
-        avg_rating = 0
-    
-    # Get latest feedback date (including complaints)
-    latest_feedback = db.query(Feedback).filter(Feedback.restaurant_id == restaurant_id).order_by(Feedback.created_at.desc()).first()
-    latest_complaint = db.query(Complaint).filter(Complaint.restaurant_id == restaurant_id).order_by(Complaint.created_at.desc()).first()
-    
-    latest_feedback_date = None
-    if latest_feedback and latest_complaint:
-        latest_feedback_date = max(latest_feedback.created_at, latest_complaint.created_at)
-    elif latest_feedback:
-        latest_feedback_date = latest_feedback.created_at
-    elif latest_complaint:
-        latest_feedback_date = latest_complaint.created_at
-    
-    # Get rating distribution (including complaints)
-    rating_distribution = {}
-    for i in range(1, 6):
-        feedback_count = db.query(func.count(Feedback.id)).filter(
-            Feedback.restaurant_id == restaurant_id,
-            func.round(Feedback.average_rating) == i
-        ).scalar() or 0
-        
-        complaint_count = db.query(func.count(Complaint.id)).filter(
-            Complaint.restaurant_id == restaurant_id,
-            func.round(Complaint.average_rating) == i
-        ).scalar() or 0
-        
-        rating_distribution[f"{i} Yıldız"] = feedback_count + complaint_count
-    
-    # Get satisfaction data (including complaints)
-    satisfaction_data = {
-        "Memnun (4-5)": (
-            db.query(func.count(Feedback.id)).filter(
-                Feedback.restaurant_id == restaurant_id,
-                Feedback.average_rating >= 4
-            ).scalar() or 0
-        ) + (
-            db.query(func.count(Complaint.id)).filter(
-                Complaint.restaurant_id == restaurant_id,
-                Complaint.average_rating >= 4
-            ).scalar() or 0
-        ),
-        "Orta (3)": (
-            db.query(func.count(Feedback.id)).filter(
-                Feedback.restaurant_id == restaurant_id,
-                Feedback.average_rating >= 3,
-                Feedback.average_rating < 4
-            ).scalar() or 0
-        ) + (
-            db.query(func.count(Complaint.id)).filter(
-                Complaint.restaurant_id == restaurant_id,
-                Complaint.average_rating >= 3,
-                Complaint.average_rating < 4
-            ).scalar() or 0
-        ),
-        "Memnun Değil (1-2)": (
-            db.query(func.count(Feedback.id)).filter(
-                Feedback.restaurant_id == restaurant_id,
-                Feedback.average_rating < 3
-            ).scalar() or 0
-        ) + (
-            db.query(func.count(Complaint.id)).filter(
-                Complaint.restaurant_id == restaurant_id,
-                Complaint.average_rating < 3
-            ).scalar() or 0
-        ),
-    }
-    
-    # Get recent comments (including complaints)
-    recent_feedbacks = db.query(Feedback).filter(Feedback.restaurant_id == restaurant_id).order_by(Feedback.created_at.desc()).limit(5).all()
-    recent_complaints = db.query(Complaint).filter(Complaint.restaurant_id == restaurant_id).order_by(Complaint.created_at.desc()).limit(5).all()
-    
-    # Combine and sort recent comments
-    recent_comments = []
-    for feedback in recent_feedbacks:
-        recent_comments.append({
-            "id": feedback.id,
-            "name": feedback.name,
-            "email": feedback.email,
-            "average_rating": feedback.average_rating,
-            "comment": feedback.comment,
-            "created_at": feedback.created_at
-        })
-    
-    for complaint in recent_complaints:
-        recent_comments.append({
-            "id": complaint.id,
-            "name": complaint.name,
-            "email": complaint.email,
-            "average_rating": complaint.average_rating,
-            "comment": complaint.comment,
-            "created_at": complaint.created_at
-        })
-    
-    # Sort by created_at and limit to 5
-    recent_comments = sorted(recent_comments, key=lambda x: x["created_at"], reverse=True)[:5]
-    
-    return {
-        "total_feedbacks": total_feedbacks,
-        "average_rating": round(avg_rating, 1) if avg_rating else 0,
-        "latest_feedback_date": latest_feedback_date,
-        "rating_distribution": rating_distribution,
-        "satisfaction_data": satisfaction_data,
-        "recent_comments": recent_comments,
-    }
+    return dashboard_data(db, restaurant_id)
+
+@router.post("/events/ticket", response_model=StreamTicket)
+async def create_events_ticket(current_user: User = Depends(get_restaurant_owner)):
+    """
+    Olay akışı için kısa ömürlü bilet üretir
+
+    EventSource header gönderemediği için istemci önce bu endpoint'ten bilet alır
+    ve /events?ticket=... adresine bağlanır. Bilet yalnızca akış endpoint'inde
+    geçerlidir ve STREAM_TICKET_EXPIRE_SECONDS saniye sonra dolar; bağlantı
+    koptuğunda yeni bilet alınmalıdır.
+    """
+    return {"ticket": create_stream_ticket(current_user), "expires_in": settings.STREAM_TICKET_EXPIRE_SECONDS}
+
+@router.get("/events")
+async def dashboard_events(current_user: User = Depends(get_stream_restaurant_owner)):
+    """
+    Dashboard için canlı olay akışı (Server-Sent Events)
+
+    Bağlanınca güncel dashboard verisi "dashboard" olayı olarak gönderilir. Sonrasında
+    yeni geri bildirimler "feedback", yeni şikayetler "complaint" olayıyla anında,
+    güncellenen sayaçlar ise yeniden hesaplanan "dashboard" olayıyla gelir.
+    """
+    restaurant_id = current_user.restaurant_id
+    if not restaurant_id:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+
+    async def stream():
+        # Anlık görüntü hesaplanırken gelen olaylar kaçmasın diye önce abone olunur
+        queue = event_hub.subscribe(restaurant_id)
+        try:
+            yield format_event("dashboard", await run_in_threadpool(load_dashboard, restaurant_id))
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                yield format_event(event, data)
+        finally:
+            event_hub.unsubscribe(restaurant_id, queue)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        # Proxy'lerin (nginx) olayları tamponlamadan iletmesi için
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/analytics/topics", response_model=List[TopicCount])
+async def get_topics(
+    days: int = Query(7, ge=1, le=365),
+    source: Literal["feedbacks", "complaints", "all"] = "complaints",
+    ngram: Optional[int] = Query(None, ge=1, le=2),
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_restaurant_owner),
+):
+    """
+    Son günlerdeki yorumlarda en sık geçen konuları getirir (ör. "soğuk yemek", "yavaş servis")
+
+    Sayılar arka planda artımlı olarak hesaplanır; yeni yorumlar birkaç dakika içinde yansır.
+    """
+    return top_topics(db, current_user.restaurant_id, days=days, source=source, ngram=ngram, limit=limit)
 
 @router.patch("/settings", response_model=None)
 async def update_settings(user_update: UserUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_restaurant_owner)):
@@ -199,6 +163,7 @@ async def create_platform(platform: PlatformCreate, db: Session = Depends(get_db
     try:
         db_platform = Platform(**platform.dict())
         db.add(db_platform)
+        bump_restaurant_version(db, db_platform.restaurant_id)
         db.commit()
         db.refresh(db_platform)
         return db_platform
@@ -221,6 +186,7 @@ async def update_platform(platform_id: int, platform: PlatformUpdate, db: Sessio
         db_platform.url = platform.url
     
     db.add(db_platform)
+    bump_restaurant_version(db, db_platform.restaurant_id)
     db.commit()
     db.refresh(db_platform)
     return db_platform
@@ -232,18 +198,136 @@ async def delete_platform(platform_id: int, db: Session = Depends(get_db), curre
         raise HTTPException(status_code=404, detail="Platform not found")
     
     db.delete(db_platform)
+    bump_restaurant_version(db, db_platform.restaurant_id)
     db.commit()
     return None
 
 @router.get("/feedbacks", response_model=List[FeedbackSchema])
-async def get_feedbacks(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: User = Depends(get_restaurant_owner)):
-    feedbacks = db.query(Feedback).filter(Feedback.restaurant_id == current_user.restaurant_id).order_by(Feedback.created_at.desc()).offset(skip).limit(limit).all()
-    return feedbacks
+async def get_feedbacks(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_db), current_user: User = Depends(get_restaurant_owner)):
+    query = db.query(*schema_columns(Feedback, FeedbackSchema)).filter(Feedback.restaurant_id == current_user.restaurant_id)
+    feedbacks = paginate_by_created_at(query, Feedback, cursor, skip).limit(limit).all()
+    response = rows_response(feedbacks)
+    set_next_cursor_header(response, feedbacks, limit, "created_at", "id")
+    return response
 
 @router.get("/complaints", response_model=List[FeedbackSchema])
-async def get_complaints(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: User = Depends(get_restaurant_owner)):
-    complaints = db.query(Complaint).filter(Complaint.restaurant_id == current_user.restaurant_id).order_by(Complaint.created_at.desc()).offset(skip).limit(limit).all()
-    return complaints
+async def get_complaints(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_db), current_user: User = Depends(get_restaurant_owner)):
+    query = db.query(*schema_columns(Complaint, FeedbackSchema)).filter(Complaint.restaurant_id == current_user.restaurant_id)
+    complaints = paginate_by_created_at(query, Complaint, cursor, skip).limit(limit).all()
+    response = rows_response(complaints)
+    set_next_cursor_header(response, complaints, limit, "created_at", "id")
+    return response
+
+@router.get("/search", response_model=List[FeedbackSearchResult])
+async def search(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    source: Literal["feedbacks", "complaints", "all"] = "all",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    min_rating: Optional[float] = Query(None, ge=1, le=5),
+    max_rating: Optional[float] = Query(None, ge=1, le=5),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_restaurant_owner),
+):
+    """
+    Geri bildirim ve şikayet yorumlarında arama yapar
+
+    Sonuçlar ilgiye göre sıralanır; sonraki sayfanın cursor'ı X-Next-Cursor header'ında döner.
+    """
+    results = search_feedbacks(
+        db,
+        current_user.restaurant_id,
+        q,
+        source=source,
+        start=start,
+        end=end,
+        min_rating=min_rating,
+        max_rating=max_rating,
+        cursor=cursor,
+        limit=limit,
+    )
+    set_next_cursor_header(response, results, limit, "rank", "created_at", "kind", "id")
+    return results
+
+EXPORT_COLUMN_TYPES = {
+    "kind": "str",
+    "id": "int",
+    "name": "str",
+    "email": "str",
+    "phone": "str",
+    "food_rating": "int",
+    "service_rating": "int",
+    "atmosphere_rating": "int",
+    "average_rating": "float",
+    "sentiment_score": "float",
+    "comment": "str",
+    "created_at": "datetime",
+}
+
+def _export_query(db: Session, model, kind: str, restaurant_id: int, start: Optional[datetime], end: Optional[datetime]):
+    query = db.query(
+        literal(kind).label("kind"),
+        model.id,
+        model.name,
+        model.email,
+        model.phone,
+        model.food_rating,
+        model.service_rating,
+        model.atmosphere_rating,
+        model.average_rating,
+        model.sentiment_score,
+        model.comment,
+        model.created_at,
+    ).filter(model.restaurant_id == restaurant_id)
+    if start is not None:
+        query = query.filter(model.created_at >= start)
+    if end is not None:
+        query = query.filter(model.created_at < end)
+    return query
+
+@router.get("/export")
+async def export_feedbacks(
+    source: Literal["feedbacks", "complaints", "all"] = "all",
+    format: Literal["csv", "ndjson", "parquet"] = "csv",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    current_user: User = Depends(get_restaurant_owner),
+):
+    """
+    Restoranın geri bildirim ve şikayet geçmişini tek istekte akış halinde indirir
+
+    Satırlar sunucu tarafı cursor ile okunur, bellek kullanımı dışa aktarılan satır
+    sayısından bağımsızdır. Parquet çıktısında her parti ayrı bir row group olarak yazılır.
+
+    Args:
+        source: "feedbacks", "complaints" veya ikisi birden ("all")
+        format: "csv", "ndjson" veya "parquet"
+        start: Bu tarih ve sonrası (dahil)
+        end: Bu tarihten öncesi (hariç)
+    """
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Parquet çıktısı bu sunucuda desteklenmiyor")
+
+    restaurant_id = current_user.restaurant_id
+    models = {"feedbacks": [(Feedback, "feedback")], "complaints": [(Complaint, "complaint")]}
+    models["all"] = models["feedbacks"] + models["complaints"]
+
+    def build_query(db: Session):
+        queries = [_export_query(db, model, kind, restaurant_id, start, end) for model, kind in models[source]]
+        query = queries[0].union_all(*queries[1:]) if len(queries) > 1 else queries[0]
+        # union_all sonrası ilk modelin kolonları birleşik sorgunun kolonlarına uyarlanır
+        model = models[source][0][0]
+        return query.order_by(model.created_at, model.id)
+
+    columns = list(EXPORT_COLUMN_TYPES)
+    return StreamingResponse(
+        stream_query(build_query, columns, format, EXPORT_COLUMN_TYPES),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="restaurant-{restaurant_id}-{source}.{format}"'},
+    )
 
 @router.delete("/feedbacks/{feedback_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_feedback(feedback_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_restaurant_owner)):
@@ -252,6 +336,7 @@ async def delete_feedback(feedback_id: int, db: Session = Depends(get_db), curre
         raise HTTPException(status_code=404, detail="Feedback not found")
     
     db.delete(feedback)
+    bump_restaurant_version(db, feedback.restaurant_id)
     db.commit()
     return None
 
@@ -262,30 +347,38 @@ async def delete_complaint(complaint_id: int, db: Session = Depends(get_db), cur
         raise HTTPException(status_code=404, detail="Complaint not found")
     
     db.delete(complaint)
+    bump_restaurant_version(db, complaint.restaurant_id)
     db.commit()
     return None
 
 @router.get("/{restaurant_id}/star-clicks", response_model=dict)
 async def get_star_click_stats(
     restaurant_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
     """
     Belirli bir restoran için yıldız tıklama istatistiklerini getirir
     """
     # Restoranın varlığını kontrol et
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id, Restaurant.deleted_at.is_(None)).first()
     if not restaurant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Restoran bulunamadı"
         )
     
+    # Son istekten beri tıklama yoksa saymadan 304 dön
+    cached = not_modified(request, response, restaurant_etag(db, restaurant_id, "star_click_distribution"), PUBLIC_CACHE_CONTROL)
+    if cached:
+        return cached
+    
     # Veritabanından star click istatistiklerini getir
     # Toplam tıklama sayısını getir
-    total_clicks = db.query(func.count(StarClick.id)).filter(
+    total_clicks = (db.query(func.count(StarClick.id)).filter(
         StarClick.restaurant_id == restaurant_id
-    ).scalar() or 0
+    ).scalar() or 0) + archived_count(db, "star_clicks", restaurant_id)
     
     # Yıldız dağılımını getir
     star_distribution = {}
@@ -293,33 +386,12 @@ async def get_star_click_stats(
     
     for star in range(1, 6):
         # Veritabanından her yıldız değeri için tıklama sayısını getir
-        count = db.query(func.count(StarClick.id)).filter(
+        count = (db.query(func.count(StarClick.id)).filter(
             StarClick.restaurant_id == restaurant_id,
             StarClick.star_value == star
-        ).scalar() or 0
+        ).scalar() or 0) + archived_count(db, "star_clicks", restaurant_id, ArchiveRollup.value == star)
         
         star_distribution[str(star)] = count
-        
-        # İstatistik tablosunu güncelle veya oluştur
-        star_stat = db.query(StarClickStatistics).filter(
-            StarClickStatistics.restaurant_id == restaurant_id,
-            StarClickStatistics.star_value == star
-        ).first()
-        
-        if star_stat:
-            star_stat.count = count
-            star_stat.updated_at = datetime.now()
-            db.add(star_stat)
-        else:
-            new_stat = StarClickStatistics(
-                restaurant_id=restaurant_id,
-                star_value=star,
-                count=count
-            )
-            db.add(new_stat)
-    
-    # Değişiklikleri kaydet
-    db.commit()
     
     # Yüzde hesaplamalarını yap
     if total_clicks > 0:
@@ -343,7 +415,7 @@ async def track_star_click(
     Kullanıcının bir yıldıza tıklamasını kaydeder
     """
     # Restoranın varlığını kontrol et
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id, Restaurant.deleted_at.is_(None)).first()
     if not restaurant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -366,6 +438,8 @@ async def track_star_click(
     db.add(new_star_click)
     db.commit()
     db.refresh(new_star_click)
+    # Sürüm istek dışında, partiler halinde artırılır
+    restaurant_changes.restaurant_changed(restaurant_id)
     
     return {
         "success": True,
@@ -376,16 +450,22 @@ async def track_star_click(
 @router.get("/details/{restaurant_id}", response_model=RestaurantSchema)
 async def get_restaurant_details(
     restaurant_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
     Belirli bir restoranın detaylarını getirir
     """
-    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id).first()
+    restaurant = db.query(Restaurant).filter(Restaurant.id == restaurant_id, Restaurant.deleted_at.is_(None)).first()
     if not restaurant:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Restoran bulunamadı"
         )
+    
+    cached = not_modified(request, response, restaurant_etag(db, restaurant_id, "details"), PUBLIC_CACHE_CONTROL)
+    if cached:
+        return cached
         
     return restaurant 
\ No newline at end of file
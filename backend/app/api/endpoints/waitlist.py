@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 from datetime import datetime
 from app.db.db import get_db
-from app.models.models import Waitlist
+from app.models.models import User, Waitlist
 from app.schemas.schemas import WaitlistCreate, WaitlistResponse
 from app.core.auth import get_admin_user
+from app.core.pagination import decode_cursor, set_next_cursor_header
+from app.services.export_service import MEDIA_TYPES, stream_query
 
 router = APIRouter()
 
@@ -14,31 +18,62 @@ async def add_to_waitlist(data: WaitlistCreate, db: Session = Depends(get_db)):
     """
     Waitlist'e yeni bir e-posta ekler
     """
-    # E-posta adresi zaten var mı kontrol et
-    existing = db.query(Waitlist).filter(Waitlist.email == data.email).first()
-    if existing:
+    # Tek sorguda ekle; e-posta zaten varsa hiçbir satır dönmez
+    stmt = (
+        insert(Waitlist)
+        .values(email=data.email, created_at=datetime.now())
+        .on_conflict_do_nothing(index_elements=[Waitlist.email])
+        .returning(Waitlist.id, Waitlist.email, Waitlist.created_at)
+    )
+    new_waitlist = db.execute(stmt).first()
+    db.commit()
+
+    if new_waitlist is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Bu e-posta adresi zaten waitlist'te mevcut"
         )
-    
-    # Yeni waitlist kaydı oluştur
-    new_waitlist = Waitlist(
-        email=data.email,
-        created_at=datetime.now()
-    )
-    
-    # Veritabanına kaydet
-    db.add(new_waitlist)
-    db.commit()
-    db.refresh(new_waitlist)
-    
+
     return new_waitlist
 
 @router.get("/", response_model=List[WaitlistResponse])
-async def get_waitlist(db: Session = Depends(get_db)):
+async def get_waitlist(
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_admin_user),
+):
     """
-    Tüm waitlist e-postalarını döner
+    Waitlist e-postalarını id sırasıyla sayfalı döner
+
+    Sonraki sayfanın cursor'ı X-Next-Cursor header'ında döner.
+    """
+    query = db.query(Waitlist.id, Waitlist.email, Waitlist.created_at).order_by(Waitlist.id)
+    if cursor:
+        (after_id,) = decode_cursor(cursor, 1)
+        if not isinstance(after_id, int):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.filter(Waitlist.id > after_id)
+    waitlist = query.limit(limit).all()
+    set_next_cursor_header(response, waitlist, limit, "id")
+    return waitlist
+
+@router.get("/export")
+async def export_waitlist(
+    format: Literal["csv", "ndjson"] = "csv",
+    current_user: User = Depends(get_admin_user),
+):
     """
-    waitlist = db.query(Waitlist).all()
-    return waitlist 
\ No newline at end of file
+    Tüm waitlist'i sunucu tarafı cursor ile okuyarak CSV veya NDJSON olarak akış halinde indirir
+    """
+    columns = ["id", "email", "created_at"]
+    return StreamingResponse(
+        stream_query(
+            lambda db: db.query(Waitlist.id, Waitlist.email, Waitlist.created_at).order_by(Waitlist.id),
+            columns,
+            format,
+        ),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="waitlist.{format}"'},
+    )
@@ -1,32 +1,90 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import List, Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.core.config import settings
-from app.db.db import get_db
+from app.db.db import SessionLocal, get_db
 from app.models.models import User
 from app.schemas.schemas import TokenData
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Logger yapılandırması
+logger = logging.getLogger("auth")
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+oauth2_scheme_optional = OAuth2PasswordBearer(tokenUrl="token", auto_error=False)
+
+# Olay akışı biletlerinin kapsamı; bu kapsamdaki token'lar başka endpoint'lerde kabul edilmez
+STREAM_TICKET_SCOPE = "events"
+
+@lru_cache(maxsize=1)
+def get_pwd_context():
+    """
+    Şifre hash'leme bağlamını ilk kullanımda oluşturur
+
+    passlib'in yüklenmesi uygulamanın açılışını yavaşlatmasın diye import burada
+    yapılır. Maliyeti BCRYPT_ROUNDS'tan farklı (düşük veya yüksek) hash'ler
+    needs_update ile yenilenmek üzere işaretlenir.
+    """
+    from passlib.context import CryptContext
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+        bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+    )
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+def get_password_hashes(passwords: List[str]) -> List[str]:
+    """
+    Birden fazla şifreyi tüm çekirdekleri kullanarak paralel hash'ler
+    bcrypt hash hesaplarken GIL'i bıraktığı için thread havuzu yeterlidir
+    """
+    if len(passwords) <= 1:
+        return [get_password_hash(password) for password in passwords]
+    with ThreadPoolExecutor(max_workers=min(len(passwords), os.cpu_count() or 1)) as executor:
+        return list(executor.map(get_password_hash, passwords))
 
 def authenticate_user(db: Session, email: str, password: str):
+    """
+    Şifreyi doğrular; hash güncel maliyette değilse düz şifre elimizdeyken yeniden hash'lenir
+
+    Böylece BCRYPT_ROUNDS değiştirildiğinde toplu şifre sıfırlaması gerekmez,
+    kullanıcıların hash'leri ilk başarılı girişte yeni maliyete geçer.
+    """
     user = db.query(User).filter(User.email == email).first()
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = get_pwd_context().verify_and_update(password, user.hashed_password)
+    if not verified:
         return False
+    if new_hash is not None:
+        user.hashed_password = new_hash
+        db.commit()
+        logger.info(f"Kullanıcı {user.id} için şifre hash'i {settings.BCRYPT_ROUNDS} maliyetle yenilendi.")
     return user
 
+def decode_access_token(token: str) -> TokenData:
+    """
+    Token'ın imzasını ve süresini doğrular; geçersizse JWTError fırlatır
+    """
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    email: str = payload.get("sub")
+    if email is None:
+        raise JWTError("Token'da sub alanı yok")
+    return TokenData(email=email, role=payload.get("role"), restaurant_id=payload.get("restaurant_id"), scope=payload.get("scope"))
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -37,25 +95,43 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def create_stream_ticket(user: User) -> str:
+    """
+    Olay akışına bağlanmak için kısa ömürlü, tek amaçlı bir bilet üretir
+
+    EventSource header gönderemediği için bilet URL'de taşınır ve proxy/erişim
+    loglarına düşebilir. Bu yüzden uzun ömürlü erişim token'ı yerine yalnızca
+    akış endpoint'inde geçerli olan ve STREAM_TICKET_EXPIRE_SECONDS sonra dolan
+    bu bilet kullanılır.
+    """
+    return create_access_token(
+        data={"sub": user.email, "role": user.role, "scope": STREAM_TICKET_SCOPE},
+        expires_delta=timedelta(seconds=settings.STREAM_TICKET_EXPIRE_SECONDS),
+    )
+
+def _user_from_token(db: Session, token: str, scope: Optional[str] = None) -> User:
+    """
+    Token'ı doğrular ve kapsamı beklenenle eşleşiyorsa kullanıcısını döner
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email, role=payload.get("role"), restaurant_id=payload.get("restaurant_id"))
+        token_data = decode_access_token(token)
     except JWTError:
         raise credentials_exception
+    if token_data.scope != scope:
+        raise credentials_exception
     user = db.query(User).filter(User.email == token_data.email).first()
     if user is None:
         raise credentials_exception
     return user
 
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    return _user_from_token(db, token)
+
 async def get_current_active_user(current_user: User = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
@@ -77,6 +153,27 @@ async def get_restaurant_owner(current_user: User = Depends(get_current_active_u
         )
     return current_user
 
+async def get_stream_restaurant_owner(ticket: Optional[str] = Query(None), header_token: Optional[str] = Depends(oauth2_scheme_optional)):
+    """
+    Uzun süre açık kalan akış endpoint'leri için restoran sahibini doğrular
+
+    Tarayıcıların EventSource API'si header gönderemediği için query parametresi
+    olarak yalnızca create_stream_ticket ile üretilmiş kısa ömürlü bilet kabul
+    edilir; erişim token'ı yalnızca Authorization header'ında geçerlidir. Bağlantı
+    boyunca bir veritabanı bağlantısı tutulmasın diye get_db yerine kısa ömürlü
+    bir oturum kullanılır.
+    """
+    db = SessionLocal()
+    try:
+        if header_token:
+            current_user = _user_from_token(db, header_token)
+        else:
+            current_user = _user_from_token(db, ticket or "", STREAM_TICKET_SCOPE)
+        current_user = await get_current_active_user(current_user)
+        return await get_restaurant_owner(current_user)
+    finally:
+        db.close()
+
 def get_restaurant_id_from_host(host: str):
     """
     Extract restaurant_id from host header
@@ -20,6 +20,8 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+    STREAM_TICKET_EXPIRE_SECONDS: int = int(os.getenv("STREAM_TICKET_EXPIRE_SECONDS", "60"))  # Olay akışı biletlerinin geçerlilik süresi
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))  # bcrypt maliyeti (4-31); değişirse eski hash'ler ilk girişte yenilenir
     
     ADMIN_EMAIL: str = os.getenv("ADMIN_EMAIL", "admin@mutfakyazilim.com")
     ADMIN_PASSWORD: str = os.getenv("ADMIN_PASSWORD", "admin123")
@@ -39,6 +41,63 @@ class Settings(BaseSettings):
     NOTIFY_ON_LOW_RATING: bool = os.getenv("NOTIFY_ON_LOW_RATING", "True").lower() in ("true", "1", "t")
     LOW_RATING_THRESHOLD: int = int(os.getenv("LOW_RATING_THRESHOLD", "3"))
     
+    # QR Kod Ayarları
+    QRCODE_CACHE_MAX_BYTES: int = int(os.getenv("QRCODE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    
+    # HTTP Önbellek Ayarları
+    PUBLIC_CACHE_MAX_AGE: int = int(os.getenv("PUBLIC_CACHE_MAX_AGE", "60"))  # Public restoran endpoint'leri için CDN/tarayıcı önbellek süresi (saniye)
+    VERSION_FLUSH_INTERVAL_SECONDS: float = float(os.getenv("VERSION_FLUSH_INTERVAL_SECONDS", "1"))  # Müşteri yazmalarından sonra ETag sürümlerinin en fazla gecikmesi
+    
+    # Log Ayarları
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")  # text veya json
+    LOG_RATE_LIMIT_WINDOW_SECONDS: float = float(os.getenv("LOG_RATE_LIMIT_WINDOW_SECONDS", "60"))  # 0 ise sınırlama kapalı
+    LOG_RATE_LIMIT_BURST: int = int(os.getenv("LOG_RATE_LIMIT_BURST", "10"))  # Aynı satırdan pencere başına geçen en fazla uyarı/hata
+    
+    # İzleme (Tracing) Ayarları
+    TRACE_EXPORTER: str = os.getenv("TRACE_EXPORTER", "")  # Boş (kapalı), file veya otlp
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0.1"))  # İzlenen isteklerin oranı (0-1)
+    TRACE_FILE: str = os.getenv("TRACE_FILE", "traces.jsonl")
+    TRACE_OTLP_ENDPOINT: str = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    TRACE_SERVICE_NAME: str = os.getenv("TRACE_SERVICE_NAME", "mutfak-api")
+    TRACE_BATCH_SIZE: int = int(os.getenv("TRACE_BATCH_SIZE", "512"))
+    TRACE_EXPORT_INTERVAL_SECONDS: float = float(os.getenv("TRACE_EXPORT_INTERVAL_SECONDS", "2"))
+    
+    # Sorgu İzleme Ayarları
+    DEBUG: bool = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")  # Yanıtlara sorgu sayısı ve süresi header'larını ekler
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+    QUERY_REPEAT_WARN_THRESHOLD: int = int(os.getenv("QUERY_REPEAT_WARN_THRESHOLD", "10"))  # Aynı sorgu bir istekte bundan fazla çalışırsa N+1 uyarısı
+    
+    # Metrik Ayarları
+    ENABLE_METRICS: bool = os.getenv("ENABLE_METRICS", "True").lower() in ("true", "1", "t")
+    METRICS_DIR: str = os.getenv("METRICS_DIR", "")  # Gunicorn worker'larının metrikleri birleştirdiği dizin; boşsa /dev/shm altında geçici dizin
+    METRICS_SYNC_INTERVAL_SECONDS: float = float(os.getenv("METRICS_SYNC_INTERVAL_SECONDS", "5"))  # Worker'ın metrik görüntüsünü yazma aralığı
+    
+    # Restoran Silme Ayarları
+    TENANT_DELETE_CHUNK_SIZE: int = int(os.getenv("TENANT_DELETE_CHUNK_SIZE", "5000"))
+    TENANT_DELETE_CHUNK_PAUSE_SECONDS: float = float(os.getenv("TENANT_DELETE_CHUNK_PAUSE_SECONDS", "0.05"))
+    
+    # Duygu Analizi Ayarları
+    SENTIMENT_WORKERS: int = int(os.getenv("SENTIMENT_WORKERS", str(os.cpu_count() or 1)))
+    SENTIMENT_ALERT_THRESHOLD: float = float(os.getenv("SENTIMENT_ALERT_THRESHOLD", "-0.5"))
+    
+    # Arşiv Ayarları
+    ENABLE_ARCHIVE: bool = os.getenv("ENABLE_ARCHIVE", "False").lower() in ("true", "1", "t")
+    ARCHIVE_DIR: str = os.getenv("ARCHIVE_DIR", "archive")
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+    
+    # Sunucu Ayarları (python main.py)
+    HOST: str = os.getenv("HOST", "0.0.0.0")
+    PORT: int = int(os.getenv("PORT", "8000"))
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "0"))  # Worker sayısı; 0 ise container'a ayrılan çekirdek sayısı (en az 2)
+    SERVER_BACKLOG: int = int(os.getenv("SERVER_BACKLOG", "2048"))  # Kabul edilmeyi bekleyen bağlantı kuyruğu
+    KEEPALIVE_SECONDS: int = int(os.getenv("KEEPALIVE_SECONDS", "75"))  # Yük dengeleyicinin boşta bağlantı süresinden (ör. ALB 60 sn) uzun olmalı
+    MAX_REQUESTS: int = int(os.getenv("MAX_REQUESTS", "10000"))  # Worker bu kadar istekten sonra yenilenir; 0 ise kapalı
+    MAX_REQUESTS_JITTER: int = int(os.getenv("MAX_REQUESTS_JITTER", "1000"))  # Worker'lar aynı anda yenilenmesin diye eklenen rastgele pay
+    WORKER_TIMEOUT: int = int(os.getenv("WORKER_TIMEOUT", "60"))  # Bu kadar saniye yanıt vermeyen worker yeniden başlatılır
+    GRACEFUL_TIMEOUT: int = int(os.getenv("GRACEFUL_TIMEOUT", "30"))  # Kapanışta açık isteklerin ve kapanış işlerinin toplam süresi
+    ACCESS_LOG: bool = os.getenv("ACCESS_LOG", "True").lower() in ("true", "1", "t")  # İstek başına erişim logu (uvicorn.access)
+    
     CORS_ORIGINS: list = [
         "http://localhost:8080",
         "http://localhost:5173",
@@ -3,16 +3,24 @@ import smtplib
 import logging
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from jinja2 import Environment, FileSystemLoader
+from functools import lru_cache
 from app.core.config import settings
+from app.core.metrics import record_email
+from app.core.tracing import SPAN_KIND_CLIENT, span
 
-# E-posta şablonları için Jinja2 ortamını yapılandır
 templates_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates")
-env = Environment(loader=FileSystemLoader(templates_dir))
 
 # Logger yapılandırması
 logger = logging.getLogger("email_service")
 
+@lru_cache(maxsize=1)
+def get_template_env():
+    """
+    E-posta şablonları için Jinja2 ortamını ilk e-postada oluşturur
+    """
+    from jinja2 import Environment, FileSystemLoader
+    return Environment(loader=FileSystemLoader(templates_dir))
+
 def send_email(to_email: str, subject: str, html_content: str, text_content: str = None):
     """
     SMTP kullanarak e-posta gönderir
@@ -28,14 +36,15 @@ def send_email(to_email: str, subject: str, html_content: str, text_content: str
     """
     try:
         # SMTP ayarlarını logla
-        logger.error(f"[DEBUG] send_email başlangıç: to={to_email}, subject={subject}")
-        logger.error(f"[DEBUG] SMTP Ayarları: Server={settings.SMTP_SERVER}, Port={settings.SMTP_PORT}, "
-                    f"TLS={settings.SMTP_TLS}, Username={settings.SMTP_USERNAME}, "
-                    f"From={settings.SMTP_FROM}, Email Enabled={settings.ENABLE_EMAIL_NOTIFICATIONS}")
+        logger.debug(f"send_email başlangıç: to={to_email}, subject={subject}")
+        logger.debug(f"SMTP Ayarları: Server={settings.SMTP_SERVER}, Port={settings.SMTP_PORT}, "
+                     f"TLS={settings.SMTP_TLS}, Username={settings.SMTP_USERNAME}, "
+                     f"From={settings.SMTP_FROM}, Email Enabled={settings.ENABLE_EMAIL_NOTIFICATIONS}")
         
         # E-posta bildirimleri devre dışı bırakılmışsa, hemen çık
         if not settings.ENABLE_EMAIL_NOTIFICATIONS:
             logger.warning("E-posta bildirimleri devre dışı bırakıldı. Gönderim yapılmıyor.")
+            record_email("disabled")
             return False
 
         # E-posta mesajını oluştur
@@ -44,7 +53,7 @@ def send_email(to_email: str, subject: str, html_content: str, text_content: str
         message["From"] = settings.SMTP_FROM
         message["To"] = to_email
         
-        logger.error(f"[DEBUG] E-posta mesaj oluşturuldu: {message['Subject']}")
+        logger.debug(f"E-posta mesaj oluşturuldu: {message['Subject']}")
         
         # Düz metin içeriği ekle (HTML içeriği yoksa)
         if text_content is None:
@@ -60,36 +69,43 @@ def send_email(to_email: str, subject: str, html_content: str, text_content: str
         message.attach(part1)
         message.attach(part2)
         
-        logger.error("[DEBUG] İçerikler eklendi")
+        logger.debug("İçerikler eklendi")
         
         # SMTP sunucusuna bağlan
-        logger.error(f"[DEBUG] SMTP sunucusuna bağlanılıyor: {settings.SMTP_SERVER}:{settings.SMTP_PORT}")
+        logger.debug(f"SMTP sunucusuna bağlanılıyor: {settings.SMTP_SERVER}:{settings.SMTP_PORT}")
         
-        with smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT) as server:
-            logger.error("[DEBUG] SMTP bağlantısı kuruldu")
-            
-            if settings.SMTP_TLS:
-                logger.error("[DEBUG] TLS başlatılıyor")
-                server.starttls()
-                logger.error("[DEBUG] TLS başlatıldı")
-            
-            # Giriş yap
-            logger.error(f"[DEBUG] SMTP giriş yapılıyor: {settings.SMTP_USERNAME}")
-            server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
-            logger.error("[DEBUG] SMTP giriş başarılı")
-            
-            # E-postayı gönder
-            logger.error(f"[DEBUG] E-posta gönderiliyor: {to_email}")
-            server.sendmail(settings.SMTP_FROM, to_email, message.as_string())
-            logger.error("[DEBUG] E-posta gönderildi")
+        # Her SMTP adımı izlenen isteklerde ayrı bir span olarak görünür
+        with span("smtp.send", SPAN_KIND_CLIENT, **{"net.peer.name": settings.SMTP_SERVER, "net.peer.port": settings.SMTP_PORT}):
+            with span("smtp.connect"):
+                server = smtplib.SMTP(settings.SMTP_SERVER, settings.SMTP_PORT)
+            with server:
+                logger.debug("SMTP bağlantısı kuruldu")
+                
+                if settings.SMTP_TLS:
+                    logger.debug("TLS başlatılıyor")
+                    with span("smtp.starttls"):
+                        server.starttls()
+                    logger.debug("TLS başlatıldı")
+                
+                # Giriş yap
+                logger.debug(f"SMTP giriş yapılıyor: {settings.SMTP_USERNAME}")
+                with span("smtp.login"):
+                    server.login(settings.SMTP_USERNAME, settings.SMTP_PASSWORD)
+                logger.debug("SMTP giriş başarılı")
+                
+                # E-postayı gönder
+                logger.debug(f"E-posta gönderiliyor: {to_email}")
+                with span("smtp.sendmail"):
+                    server.sendmail(settings.SMTP_FROM, to_email, message.as_string())
+                logger.debug("E-posta gönderildi")
             
         logger.info(f"E-posta başarıyla gönderildi: {to_email}")
+        record_email("sent")
         return True
     
     except Exception as e:
-        logger.error(f"E-posta gönderilirken hata oluştu: {str(e)}")
-        import traceback
-        logger.error(f"Hata stack trace: {traceback.format_exc()}")
+        logger.error(f"E-posta gönderilirken hata oluştu: {str(e)}", exc_info=True)
+        record_email("failed")
         return False
 
 def send_low_rating_notification(restaurant_email: str, feedback_data: dict):
@@ -105,7 +121,7 @@ def send_low_rating_notification(restaurant_email: str, feedback_data: dict):
     """
     try:
         # E-posta şablonunu yükle
-        template = env.get_template("low_rating_notification.html")
+        template = get_template_env().get_template("low_rating_notification.html")
         
         # Şablonu render et
         html_content = template.render(
@@ -122,7 +138,10 @@ def send_low_rating_notification(restaurant_email: str, feedback_data: dict):
         )
         
         # E-postayı gönder
-        subject = f"Düşük Puanlı Yorum Bildirimi - {feedback_data.get('average_rating')} Yıldız"
+        if feedback_data.get("trigger") == "sentiment":
+            subject = f"Olumsuz Yorum Bildirimi - {feedback_data.get('average_rating')} Yıldız"
+        else:
+            subject = f"Düşük Puanlı Yorum Bildirimi - {feedback_data.get('average_rating')} Yıldız"
         return send_email(restaurant_email, subject, html_content)
     
     except Exception as e:
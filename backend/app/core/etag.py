@@ -0,0 +1,38 @@
+from typing import Optional
+from fastapi import Request, Response, status
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match header'ının verilen ETag ile eşleşip eşleşmediğini kontrol eder
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        # If-None-Match zayıf karşılaştırma kullanır
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+def not_modified(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+    """
+    Yanıta ETag ve Cache-Control header'larını ekler; istemcideki kopya güncelse 304 yanıtı döner
+
+    Args:
+        request: Gelen istek (If-None-Match header'ı okunur)
+        response: Endpoint'in header'ları taşıyan yanıt nesnesi
+        etag: Güncel ETag
+        cache_control: Cache-Control değeri
+
+    Returns:
+        Optional[Response]: Kopya güncelse döndürülecek 304 yanıtı, değilse None
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": cache_control})
+    return None
@@ -0,0 +1,144 @@
+import atexit
+import logging
+import queue
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+import orjson
+from app.core.config import settings
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+# Uvicorn kendi handler'larını kurar; kayıtları da aynı kuyruktan geçsin diye kök logger'a yönlendirilir.
+# Handler'ı olmayanlara dokunulmaz (ör. ACCESS_LOG=false ile kapatılmış uvicorn.access)
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+# LOG_LEVEL=DEBUG iken bile bu kütüphanelerin ayrıntılı kayıtları (ör. her SQL sorgusu) açılmaz
+QUIET_LOGGERS = ("sqlalchemy.engine", "sqlalchemy.pool", "apscheduler", "alembic", "multipart", "asyncio")
+
+_listener: Optional[QueueListener] = None
+
+class JsonFormatter(logging.Formatter):
+    """
+    Kayıtları satır başına bir JSON nesnesi olarak yazar
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry).decode("utf-8")
+
+class RateLimitFilter(logging.Filter):
+    """
+    Aynı yerden gelen tekrarlı hata kayıtlarını sınırlar
+
+    Bir log çağrısı (logger, dosya, satır) her pencerede en fazla `burst` kez
+    geçer; fazlası atılır ve bir sonraki pencerenin ilk kaydına bastırılan kayıt
+    sayısı eklenir. WARNING altındaki kayıtlar sınırlanmaz.
+    """
+
+    def __init__(self, window: float, burst: int):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        # anahtar -> [pencere başlangıcı, penceredeki kayıt sayısı, bastırılan kayıt sayısı]
+        self._counts: Dict[tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING or self.window <= 0:
+            return True
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        state = self._counts.get(key)
+        if state is None or now - state[0] >= self.window:
+            suppressed = state[2] if state is not None else 0
+            self._counts[key] = [now, 1, 0]
+            if suppressed:
+                record.msg = f"{record.getMessage()} (son {self.window:g} sn içinde {suppressed} benzer kayıt bastırıldı)"
+                record.args = None
+            return True
+        state[1] += 1
+        if state[1] <= self.burst:
+            return True
+        state[2] += 1
+        return False
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Kaydı biçimlendirmeden kuyruğa bırakan handler
+
+    Standart QueueHandler.prepare mesajı ve traceback'i çağıran thread'de
+    biçimlendirir; burada yalnızca mesaj argümanları birleştirilir, traceback ve
+    JSON/metin biçimlendirmesi listener thread'inde yapılır.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+def setup_logging():
+    """
+    Tüm logları kuyruk üzerinden tek bir arka plan thread'ine yönlendirir
+
+    İstek ve zamanlayıcı thread'leri kaydı yalnızca kuyruğa bırakır; biçimlendirme
+    ve stderr'e yazma QueueListener thread'inde yapılır. Seviye LOG_LEVEL, biçim
+    LOG_FORMAT (text|json) ile belirlenir. Birden fazla çağrılırsa ilk kurulum kullanılır.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(RateLimitFilter(settings.LOG_RATE_LIMIT_WINDOW_SECONDS, settings.LOG_RATE_LIMIT_BURST))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    for name in UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        if not uvicorn_logger.handlers:
+            continue
+        for handler in list(uvicorn_logger.handlers):
+            uvicorn_logger.removeHandler(handler)
+        uvicorn_logger.propagate = True
+
+    _listener = QueueListener(log_queue, stream_handler)
+    _listener.start()
+    # Çıkışta kuyrukta kalan kayıtlar yazılır
+    atexit.register(shutdown_logging)
+
+def shutdown_logging():
+    """
+    Kuyruktaki kayıtları yazar ve listener thread'ini durdurur
+    """
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
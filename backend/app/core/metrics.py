@@ -0,0 +1,418 @@
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("metrics")
+
+# İstek ve iş süreleri için histogram sınırları (saniye)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+JOB_DURATION_BUCKETS = (0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+
+# Eşleşmeyen isteklerin route etiketi
+UNMATCHED_ROUTE = "unmatched"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Ortak metrik dizinindeki dosyalar: çalışan worker'ların anlık görüntüleri ve çıkmış worker'ların birikmiş değerleri
+WORKER_FILE_PREFIX = "worker-"
+ARCHIVE_FILE = "archive.json"
+# Arşive eklenen worker dosyalarının adları, silinmeden önce okuyan worker'lar iki kez saymasın diye tutulur
+ARCHIVE_MERGED_LIMIT = 100
+
+class _Shard:
+    """
+    Tek bir thread'in yazdığı metrik değerleri
+
+    Her thread yalnızca kendi shard'ını günceller; bu yüzden yazma yolunda kilit
+    yoktur. /metrics isteği tüm shard'ların kopyalarını toplar.
+    """
+
+    def __init__(self):
+        self.counters: Dict[tuple, float] = {}
+        self.gauges: Dict[tuple, float] = {}
+        self.histograms: Dict[tuple, list] = {}
+
+class Histogram:
+    """
+    Sabit sınırlı histogram tanımı; gözlemler thread shard'larında tutulur
+    """
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+
+    def observe(self, labels: tuple, value: float):
+        histograms = registry.shard().histograms
+        key = (self.name, labels)
+        # [kova sayaçları..., +Inf, toplam]; anahtar başına bir kez oluşturulur
+        values = histograms.get(key)
+        if values is None:
+            values = histograms[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+class MetricsRegistry:
+    """
+    Süreç içi metrik kaydı ve Prometheus metin formatı çıktısı
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        # Yalnızca yeni thread'in shard'ı kaydedilirken kullanılır
+        self._shards_lock = threading.Lock()
+        self._metadata: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        self._collectors: List[Callable[[], List[Tuple[str, tuple, float]]]] = []
+        # share_across_workers çağrılınca ayarlanır
+        self._directory: Optional[str] = None
+        self._filename: Optional[str] = None
+        self._write_lock = threading.Lock()
+
+    def shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def counter(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self._metadata[name] = ("counter", help_text, label_names)
+
+    def gauge(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self._metadata[name] = ("gauge", help_text, label_names)
+
+    def histogram(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]) -> Histogram:
+        histogram = Histogram(name, help_text, label_names, buckets)
+        self._metadata[name] = ("histogram", help_text, label_names)
+        self._histograms[name] = histogram
+        return histogram
+
+    def inc(self, name: str, labels: tuple, amount: float = 1):
+        counters = self.shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0) + amount
+
+    def add_gauge(self, name: str, labels: tuple, amount: float):
+        # Shard'lardaki değerler toplanır; +1/-1 çiftleri aynı thread'de olmak zorunda değildir
+        gauges = self.shard().gauges
+        key = (name, labels)
+        gauges[key] = gauges.get(key, 0) + amount
+
+    def add_collector(self, collector: Callable[[], List[Tuple[str, tuple, float]]]):
+        """
+        /metrics isteği sırasında anlık değer üreten bir fonksiyon ekler
+
+        Fonksiyon önceden tanımlanmış metrikler için (metrik adı, etiket değerleri, değer) demetleri döner.
+        """
+        self._collectors.append(collector)
+
+    def _collect(self):
+        counters: Dict[tuple, float] = {}
+        gauges: Dict[tuple, float] = {}
+        histograms: Dict[tuple, list] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            # dict.copy GIL altında atomiktir; yazan thread'i durdurmaya gerek yoktur
+            for key, value in shard.counters.copy().items():
+                counters[key] = counters.get(key, 0) + value
+            for key, value in shard.gauges.copy().items():
+                gauges[key] = gauges.get(key, 0) + value
+            for key, values in shard.histograms.copy().items():
+                values = list(values)
+                total = histograms.get(key)
+                if total is None:
+                    histograms[key] = values
+                else:
+                    for i, value in enumerate(values):
+                        total[i] += value
+        return counters, gauges, histograms
+
+    def _snapshot(self) -> Tuple[dict, dict, dict]:
+        counters, gauges, histograms = self._collect()
+        for collector in self._collectors:
+            for name, labels, value in collector():
+                gauges[(name, labels)] = gauges.get((name, labels), 0) + value
+        return counters, gauges, histograms
+
+    def share_across_workers(self, directory: str, interval: float):
+        """
+        Metrikleri aynı sunucunun diğer worker'larıyla ortak dizin üzerinden birleştirir
+
+        Worker değerlerinin anlık görüntüsünü interval saniyede bir (ve kapanışta)
+        dizine yazar; /metrics isteğini hangi worker karşılarsa diğerlerinin son
+        görüntülerini ve çıkmış worker'ların archive_worker ile arşive eklenmiş
+        değerlerini kendi değerlerine ekler. Böylece sayaçlar worker yenilense de
+        geri gitmez; gauge'lar yalnızca çalışan worker'ların toplamıdır.
+        """
+        self._directory = directory
+        # Aynı PID yeniden kullanılırsa eski worker'ın arşivlenmiş dosyasıyla karışmasın diye zaman eklenir
+        self._filename = f"{WORKER_FILE_PREFIX}{os.getpid()}-{time.time_ns()}.json"
+        self.write_snapshot()
+        threading.Thread(target=self._sync, args=(interval,), name="metrics-sync", daemon=True).start()
+
+    def _sync(self, interval: float):
+        while True:
+            time.sleep(interval)
+            self.write_snapshot()
+
+    def write_snapshot(self):
+        if self._directory is None:
+            return
+        with self._write_lock:
+            try:
+                _write_json(os.path.join(self._directory, self._filename), _encode(*self._snapshot()))
+            except OSError as e:
+                logger.warning(f"Metrik görüntüsü yazılamadı: {str(e)}")
+
+    def _merged_snapshot(self) -> Tuple[dict, dict, dict]:
+        counters, gauges, histograms = self._snapshot()
+        if self._directory is None:
+            return counters, gauges, histograms
+        try:
+            names = sorted(os.listdir(self._directory))
+        except OSError:
+            names = []
+        # Worker dosyaları arşivden önce okunur: arşivlenip silinen bir dosya ya burada ya arşivde görülür
+        workers = []
+        for name in names:
+            if name != self._filename and name.startswith(WORKER_FILE_PREFIX) and name.endswith(".json"):
+                data = _read_json(os.path.join(self._directory, name))
+                if data is not None:
+                    workers.append((name, data))
+        archive = _read_json(os.path.join(self._directory, ARCHIVE_FILE)) or {}
+        merged = set(archive.get("merged", ()))
+        _merge_into(counters, gauges, histograms, archive)
+        for name, data in workers:
+            if name not in merged:
+                _merge_into(counters, gauges, histograms, data)
+        return counters, gauges, histograms
+
+    def render(self) -> str:
+        """
+        Tüm metrikleri Prometheus metin formatında döner
+        """
+        counters, gauges, histograms = self._merged_snapshot()
+        samples: Dict[str, List[str]] = {name: [] for name in self._metadata}
+
+        def add_sample(name: str, labels: tuple, value: float):
+            samples[name].append(f"{name}{_format_labels(self._metadata[name][2], labels)} {_format_value(value)}")
+
+        for (name, labels), value in sorted(counters.items()):
+            add_sample(name, labels, value)
+        for (name, labels), value in sorted(gauges.items()):
+            add_sample(name, labels, value)
+
+        for (name, labels), values in sorted(histograms.items()):
+            histogram = self._histograms[name]
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (float("inf"),), values):
+                cumulative += count
+                bucket_labels = _format_labels(histogram.label_names + ("le",), labels + (_format_value(bound),))
+                samples[name].append(f"{name}_bucket{bucket_labels} {cumulative}")
+            series_labels = _format_labels(histogram.label_names, labels)
+            samples[name].append(f"{name}_sum{series_labels} {_format_value(values[-1])}")
+            samples[name].append(f"{name}_count{series_labels} {cumulative}")
+
+        lines = []
+        for name, (metric_type, help_text, _) in self._metadata.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            lines.extend(samples[name])
+        return "\n".join(lines) + "\n"
+
+def _encode(counters: dict, gauges: dict, histograms: dict) -> dict:
+    # JSON'da tuple anahtar olamaz; [ad, etiketler, değer] listeleri yazılır
+    return {
+        "counters": [[name, list(labels), value] for (name, labels), value in counters.items()],
+        "gauges": [[name, list(labels), value] for (name, labels), value in gauges.items()],
+        "histograms": [[name, list(labels), values] for (name, labels), values in histograms.items()],
+    }
+
+def _merge_into(counters: dict, gauges: dict, histograms: dict, data: dict):
+    for name, labels, value in data.get("counters", ()):
+        key = (name, tuple(labels))
+        counters[key] = counters.get(key, 0) + value
+    for name, labels, value in data.get("gauges", ()):
+        key = (name, tuple(labels))
+        gauges[key] = gauges.get(key, 0) + value
+    for name, labels, values in data.get("histograms", ()):
+        key = (name, tuple(labels))
+        total = histograms.get(key)
+        if total is None:
+            histograms[key] = list(values)
+        else:
+            for i, value in enumerate(values):
+                total[i] += value
+
+def _read_json(path: str) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_json(path: str, data: dict):
+    # Okuyanlar yarım dosya görmesin diye geçici dosyaya yazılıp yer değiştirilir
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(temporary, path)
+
+def archive_worker(directory: str, pid: int):
+    """
+    Çıkan worker'ın son metrik görüntüsünü arşive ekler ve dosyasını siler
+
+    Gunicorn master'ında (child_exit) çağrılır; arşive yalnızca master yazar.
+    Sayaçlar ve histogramlar korunur, gauge'lar atılır. Dosya adı arşive
+    kaydedildikten sonra silinir; aradaki anda okuyan worker onu iki kez saymaz.
+    """
+    prefix = f"{WORKER_FILE_PREFIX}{pid}-"
+    try:
+        names = [name for name in os.listdir(directory) if name.startswith(prefix) and name.endswith(".json")]
+    except OSError:
+        return
+    if not names:
+        return
+    archive_path = os.path.join(directory, ARCHIVE_FILE)
+    archive = _read_json(archive_path) or {}
+    counters: Dict[tuple, float] = {}
+    histograms: Dict[tuple, list] = {}
+    _merge_into(counters, {}, histograms, archive)
+    merged = list(archive.get("merged", ()))
+    for name in names:
+        data = _read_json(os.path.join(directory, name))
+        if data is not None:
+            _merge_into(counters, {}, histograms, {"counters": data.get("counters", ()), "histograms": data.get("histograms", ())})
+        merged.append(name)
+    archive = _encode(counters, {}, histograms)
+    archive["merged"] = merged[-ARCHIVE_MERGED_LIMIT:]
+    _write_json(archive_path, archive)
+    for name in names:
+        try:
+            os.unlink(os.path.join(directory, name))
+        except OSError:
+            pass
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+registry = MetricsRegistry()
+
+# Metrik tanımları
+registry.counter("mutfak_http_requests_total", "Route, metot ve durum koduna göre tamamlanan HTTP istekleri", ("method", "route", "status"))
+registry.gauge("mutfak_http_requests_in_flight", "İşlenmekte olan HTTP istekleri")
+http_request_duration = registry.histogram(
+    "mutfak_http_request_duration_seconds",
+    "Route ve metoda göre HTTP istek süresi",
+    ("method", "route"),
+    LATENCY_BUCKETS,
+)
+scheduler_job_duration = registry.histogram(
+    "mutfak_scheduler_job_duration_seconds",
+    "Zamanlanmış işlerin çalışma süresi",
+    ("job", "status"),
+    JOB_DURATION_BUCKETS,
+)
+registry.counter("mutfak_emails_total", "Sonuca göre e-posta gönderim denemeleri", ("outcome",))
+registry.gauge("mutfak_db_pool_size", "Veritabanı havuzunun kalıcı bağlantı sayısı")
+registry.gauge("mutfak_db_pool_checked_out", "Kullanımdaki veritabanı bağlantıları")
+registry.gauge("mutfak_db_pool_overflow", "Havuz boyutunu aşan geçici bağlantılar")
+
+def register_pool_metrics(engine):
+    """
+    Veritabanı havuzu değerlerini /metrics isteği sırasında okunacak şekilde kaydeder
+    """
+    pool = engine.pool
+
+    def collect():
+        return [
+            ("mutfak_db_pool_size", (), pool.size()),
+            ("mutfak_db_pool_checked_out", (), pool.checkedout()),
+            ("mutfak_db_pool_overflow", (), max(pool.overflow(), 0)),
+        ]
+
+    registry.add_collector(collect)
+
+_route_templates: Dict[Callable, str] = {}
+
+def route_template(scope) -> str:
+    """
+    İstekle eşleşen endpoint'in path şablonunu döner ("/api/customer/feedbacks/{feedback_id}")
+
+    Şablonlar ilk çağrıda bir kez endpoint -> path sözlüğüne alınır. Eşleşmeyen
+    istekler (404 taramaları vb.) tek bir etikette toplanır.
+    """
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return UNMATCHED_ROUTE
+    if not _route_templates:
+        _route_templates.update(
+            (route.endpoint, route.path)
+            for route in scope["app"].routes
+            if hasattr(route, "endpoint")
+        )
+    return _route_templates.get(endpoint, UNMATCHED_ROUTE)
+
+def record_email(outcome: str):
+    registry.inc("mutfak_emails_total", (outcome,))
+
+def record_job(job_id: str, status: str, duration: float):
+    scheduler_job_duration.observe((job_id, status), duration)
+
+class MetricsMiddleware:
+    """
+    İstek sayısı, süre ve eşzamanlı istek metriklerini toplayan saf ASGI middleware
+
+    BaseHTTPMiddleware'in istek başına oluşturduğu task ve stream nesneleri
+    kullanılmaz. Route etiketi eşleşen endpoint'in path şablonudur.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        registry.add_gauge("mutfak_http_requests_in_flight", (), 1)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            registry.add_gauge("mutfak_http_requests_in_flight", (), -1)
+            method = scope["method"]
+            route = route_template(scope)
+            registry.inc("mutfak_http_requests_total", (method, route, status_code))
+            http_request_duration.observe((method, route), duration)
@@ -0,0 +1,71 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+from fastapi import HTTPException, Response, status
+from sqlalchemy import tuple_
+
+# Bir sonraki sayfanın cursor'ı bu header ile döner (liste yanıtlarının şekli değişmesin diye)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def encode_cursor(*values) -> str:
+    """
+    Keyset sayfalama değerlerini opak bir cursor token'ına dönüştürür
+    """
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str, size: int) -> list:
+    """
+    encode_cursor ile üretilmiş token'ı çözer
+
+    Args:
+        cursor: Opak cursor token'ı
+        size: Token'da beklenen değer sayısı
+
+    Returns:
+        list: Cursor değerleri
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+def next_cursor(rows: list, limit: int, *keys: str) -> Optional[str]:
+    """
+    Sayfa doluysa son satırın anahtar kolonlarından bir sonraki cursor'ı üretir
+    """
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(*(getattr(last, key) for key in keys))
+
+def set_next_cursor_header(response: Response, rows: list, limit: int, *keys: str):
+    cursor = next_cursor(rows, limit, *keys)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
+
+def paginate_by_created_at(query, model, cursor: Optional[str], skip: int = 0):
+    """
+    Sorguyu (created_at, id) üzerinden yeniden eskiye sıralar ve sayfalar
+
+    cursor verilirse son görülen satırdan sonrası keyset ile alınır, aksi halde
+    geriye uyumluluk için skip (offset) kullanılır.
+    """
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if not cursor:
+        return query.offset(skip)
+
+    created_at, last_id = decode_cursor(cursor, 2)
+    try:
+        created_at = datetime.fromisoformat(created_at)
+    except (TypeError, ValueError):
+        created_at = None
+    if created_at is None or not isinstance(last_id, int):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return query.filter(tuple_(model.created_at, model.id) < tuple_(created_at, last_id))
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+# Aynı worker'da aynı anda tek profil oturumu çalışır
+profiler_lock = threading.Lock()
+
+# Bu dosyalardaki bir fonksiyonda bekleyen thread'ler boşta sayılır (kilit, kuyruk, select;
+# uvloop'ta boştaki event loop thread'inin son Python çerçevesi runners.py'dedir)
+IDLE_MODULES = ("threading.py", "queue.py", "selectors.py", "selector_events.py", "runners.py")
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(APP_ROOT):
+        filename = os.path.relpath(filename, APP_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    # Collapsed formatta ";" çerçeve ayırıcısıdır
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+def _thread_stack(frame) -> list:
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.reverse()
+    return names
+
+def _await_chain(coro) -> list:
+    # Task.get_stack yalnızca en dıştaki coroutine'i döner; await zinciri elle izlenir
+    names = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        names.append(_frame_name(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return names
+
+def _is_idle(frame) -> bool:
+    return frame.f_code.co_filename.endswith(IDLE_MODULES)
+
+def sample_stacks(seconds: float, interval: float, loop: Optional[asyncio.AbstractEventLoop], include_idle: bool = False) -> Counter:
+    """
+    Verilen süre boyunca worker'daki thread ve asyncio task yığınlarını örnekler
+
+    Profil yalnızca bu fonksiyon çalışırken vardır; boşta hiçbir hook veya thread
+    eklenmez. Çağıran thread örneklere dahil edilmez.
+
+    Args:
+        seconds: Örnekleme süresi
+        interval: İki örnek arasındaki süre (saniye)
+        loop: Task yığınları okunacak event loop (None ise task'lar örneklenmez)
+        include_idle: Kilit, kuyruk veya select'te bekleyen thread'leri de dahil et
+
+    Returns:
+        Counter: Collapsed yığın -> örnek sayısı
+    """
+    own_thread = threading.get_ident()
+    thread_names = {}
+    stacks = Counter()
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_thread or (not include_idle and _is_idle(frame)):
+                continue
+            if thread_id not in thread_names:
+                thread = threading._active.get(thread_id)
+                thread_names[thread_id] = thread.name if thread is not None else str(thread_id)
+            stacks[";".join([f"thread:{thread_names[thread_id]}"] + _thread_stack(frame))] += 1
+        if loop is not None:
+            try:
+                tasks = asyncio.all_tasks(loop)
+            except RuntimeError:
+                # Task kümesi okunurken değişti; bu örnekte task'lar atlanır
+                tasks = ()
+            for task in tasks:
+                chain = _await_chain(task.get_coro())
+                if chain:
+                    stacks[";".join(["task"] + chain)] += 1
+        time.sleep(interval)
+    return stacks
+
+def format_collapsed(stacks: Counter) -> str:
+    """
+    Yığınları flamegraph.pl / speedscope tarafından okunan collapsed formatta yazar
+    """
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
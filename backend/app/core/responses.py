@@ -0,0 +1,27 @@
+import orjson
+from fastapi.responses import ORJSONResponse
+
+# UTC tarihleri pydantic çıktısıyla aynı olsun diye "+00:00" yerine "Z" ile yazılır
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    orjson ile serileştiren varsayılan yanıt sınıfı
+    """
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+def schema_columns(model, schema) -> list:
+    """
+    Şemanın alanlarını aynı sırayla modelin kolonlarına eşler
+
+    Sorgu ORM nesnesi yerine yalnızca bu kolonları seçtiğinde satırlar doğrudan
+    rows_response ile yanıta yazılabilir.
+    """
+    return [getattr(model, field) for field in schema.model_fields]
+
+def rows_response(rows: list) -> FastJSONResponse:
+    """
+    Kolon sorgusu satırlarını response_model doğrulamasına uğratmadan JSON yanıtına çevirir
+    """
+    return FastJSONResponse([row._asdict() for row in rows])
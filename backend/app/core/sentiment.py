@@ -0,0 +1,90 @@
+import math
+from typing import Dict, List, Optional
+from app.core.turkish_text import tokenize
+
+# Kelime kökü -> duygu puanı (-3 çok olumsuz, +3 çok olumlu). Kelimeler en uzun
+# eşleşen kök ile puanlanır; 0 puanlı kayıtlar daha kısa bir kökün yanlış
+# eşleşmesini engeller ("kabak" -> "kaba" değil).
+LEXICON: Dict[str, float] = {
+    # Olumlu
+    "harika": 3, "mükemmel": 3, "muhteşem": 3, "efsane": 3, "şahane": 3, "enfes": 3, "bayıl": 3,
+    "güzel": 2, "lezzet": 2, "leziz": 2, "nefis": 2, "başarılı": 2, "memnun": 2, "beğen": 2,
+    "sev": 2, "tavsiye": 2, "teşekkür": 2, "sıcacık": 2, "taze": 2, "temiz": 2, "hızlı": 2,
+    "güler": 2, "kibar": 2, "ilgili": 2, "nazik": 2, "samimi": 2, "keyif": 2, "huzur": 2,
+    "iyi": 1, "hoş": 1, "uygun": 1, "rahat": 1, "ferah": 1, "bol": 1, "doyurucu": 1, "sıcak": 1,
+    "yeterli": 1, "makul": 1,
+    # Olumsuz
+    "berbat": -3, "rezalet": -3, "iğrenç": -3, "felaket": -3, "skandal": -3, "zehir": -3,
+    "kötü": -2, "soğuk": -2, "yavaş": -2, "kaba": -2, "ilgisiz": -2, "kirli": -2, "pis": -2,
+    "bayat": -2, "yanık": -2, "çiğ": -2, "tuzlu": -1, "yağlı": -1, "pahalı": -1, "gürültü": -1,
+    "beklet": -2, "bekle": -1, "kırıklı": -2, "şikayet": -2, "sorun": -1, "hata": -1, "eksik": -1,
+    "tatsız": -2, "vasat": -1, "pişman": -2, "sinir": -2, "saygısız": -3, "kalabalık": -1,
+    "gecik": -2, "unut": -1, "yanlış": -1,
+    # Yanlış eşleşmeleri engelleyen nötr kökler
+    "kabak": 0, "seviye": 0, "iyice": 0,
+}
+
+# Sonraki kelimenin etkisini artıran kelimeler
+INTENSIFIERS = {"çok": 1.5, "aşırı": 1.7, "gayet": 1.3, "fazla": 1.3, "oldukça": 1.2, "gerçekten": 1.3}
+
+# Önceki kelimenin anlamını tersine çeviren kelimeler ("güzel değil", "ilgi yok")
+NEGATORS = {"değil", "değildi", "değildir", "yok", "yoktu"}
+
+# Fiil kökünden sonra gelen olumsuzluk ekleri ("beğenmedim", "sevmedik")
+NEGATIVE_VERB_SUFFIXES = ("ma", "me")
+NON_NEGATIVE_VERB_SUFFIXES = ("mak", "mek")
+
+# Kökten sonra gelen yokluk ekleri ("lezzetsiz" lezzet köküyle eşleşir ve ters çevrilir)
+PRIVATIVE_SUFFIXES = ("sız", "siz", "suz", "süz")
+
+# Ham toplamı [-1, 1] aralığına getiren normalizasyon sabiti
+NORMALIZATION_ALPHA = 15
+
+MIN_ROOT_LENGTH = 2
+
+def _lookup(word: str) -> Optional[float]:
+    for end in range(len(word), MIN_ROOT_LENGTH - 1, -1):
+        root = word[:end]
+        polarity = LEXICON.get(root)
+        if polarity is None:
+            continue
+        rest = word[end:]
+        if rest.startswith(NEGATIVE_VERB_SUFFIXES) and not rest.startswith(NON_NEGATIVE_VERB_SUFFIXES):
+            polarity = -polarity
+        elif rest.startswith(PRIVATIVE_SUFFIXES):
+            polarity = -polarity
+        return polarity
+    return None
+
+def score_comment(text: str) -> float:
+    """
+    Yorumun duygu puanını sözlük tabanlı olarak hesaplar
+
+    Returns:
+        float: -1 (çok olumsuz) ile 1 (çok olumlu) arası puan, eşleşme yoksa 0
+    """
+    words = tokenize(text)
+    total = 0.0
+    for i, word in enumerate(words):
+        polarity = _lookup(word)
+        if not polarity:
+            continue
+        if i > 0 and words[i - 1] in INTENSIFIERS:
+            polarity *= INTENSIFIERS[words[i - 1]]
+        if i + 1 < len(words) and words[i + 1] in NEGATORS:
+            polarity = -polarity
+        total += polarity
+    return round(total / math.sqrt(total * total + NORMALIZATION_ALPHA), 4)
+
+def score_comments(texts: List[str]) -> List[float]:
+    """
+    Bir parti yorumu puanlar; process pool içinde çalıştırılmak üzere modül seviyesindedir
+    """
+    cache: Dict[str, float] = {}
+    scores = []
+    for text in texts:
+        # Aynı partide tekrar eden yorumlar ("Çok güzel", "Harika") bir kez hesaplanır
+        if text not in cache:
+            cache[text] = score_comment(text)
+        scores.append(cache[text])
+    return scores
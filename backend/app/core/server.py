@@ -0,0 +1,153 @@
+import math
+import os
+import shutil
+import tempfile
+from typing import Optional
+import uvicorn
+from app.core.config import settings
+from app.core.metrics import ARCHIVE_FILE, WORKER_FILE_PREFIX, archive_worker
+
+APP_PATH = "app.main:app"
+WORKER_CLASS = "app.core.worker.MutfakUvicornWorker"
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    # cgroup v2: "max 100000" veya "<kota> <periyot>"; cgroup v1: ayrı kota ve periyot dosyaları
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()
+        return None if quota == "max" else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+    except (OSError, ValueError):
+        return None
+    return quota / period if quota > 0 else None
+
+def available_cpus() -> int:
+    """
+    Process'e ayrılan çekirdek sayısı
+
+    os.cpu_count() host'un tüm çekirdeklerini döner; container'ın CPU kotası
+    (docker --cpus) ve CPU affinity'si (--cpuset-cpus) de hesaba katılır.
+    """
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        count = min(count, max(1, math.ceil(quota)))
+    return count
+
+def worker_count() -> int:
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    # Tek çekirdekte de iki worker: biri CPU'ya bağlı bir işteyken (bcrypt, dashboard hesabı)
+    # veya yenilenirken diğeri istek almaya devam eder
+    return max(2, available_cpus())
+
+def prepare_metrics_dir() -> Optional[str]:
+    """
+    Worker'ların metrikleri birleştireceği dizini hazırlar ve METRICS_DIR'e yazar
+
+    Master'da fork'tan önce çağrılır; worker'lar ayarı master'dan devralır.
+    METRICS_DIR boşsa bellekte (/dev/shm) geçici bir dizin oluşturulur ve
+    sunucu kapanınca silinir. Önceki çalıştırmadan kalan dosyalar temizlenir,
+    aksi halde sayaçlar eski değerlerden devam ederdi.
+    """
+    if not settings.ENABLE_METRICS:
+        return None
+    if not settings.METRICS_DIR:
+        settings.METRICS_DIR = tempfile.mkdtemp(prefix="mutfak-metrics-", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+        return settings.METRICS_DIR
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    for name in os.listdir(settings.METRICS_DIR):
+        if name.startswith(WORKER_FILE_PREFIX) or name.startswith(ARCHIVE_FILE):
+            os.unlink(os.path.join(settings.METRICS_DIR, name))
+    return None
+
+def gunicorn_options() -> dict:
+    options = {
+        "bind": f"{settings.HOST}:{settings.PORT}",
+        "workers": worker_count(),
+        "worker_class": WORKER_CLASS,
+        "backlog": settings.SERVER_BACKLOG,
+        "keepalive": settings.KEEPALIVE_SECONDS,
+        "max_requests": settings.MAX_REQUESTS,
+        "max_requests_jitter": settings.MAX_REQUESTS_JITTER,
+        "timeout": settings.WORKER_TIMEOUT,
+        "graceful_timeout": settings.GRACEFUL_TIMEOUT,
+        "proc_name": "mutfak",
+        # gunicorn access logger'a handler vermezse worker'daki uvicorn.access sessiz kalır;
+        # handler setup_logging'de kaldırılır ve kayıtlar ortak log kuyruğundan yazılır
+        "accesslog": "-" if settings.ACCESS_LOG else None,
+    }
+    # Worker heartbeat dosyası disk yerine bellekte tutulur; Docker'ın overlay diski yavaşken worker'lar öldürülmez
+    if os.path.isdir("/dev/shm"):
+        options["worker_tmp_dir"] = "/dev/shm"
+    if settings.ENABLE_METRICS and settings.METRICS_DIR:
+        metrics_dir = settings.METRICS_DIR
+        # Çıkan (yenilenen, çöken) worker'ın sayaçları arşive eklenir; toplamlar geri gitmez
+        options["child_exit"] = lambda server, worker: archive_worker(metrics_dir, worker.pid)
+    return options
+
+def run(reload: bool = False):
+    """
+    Sunucuyu başlatır
+
+    Üretimde gunicorn, worker_count() kadar MutfakUvicornWorker çalıştırır; worker'lar
+    MAX_REQUESTS istekten sonra yenilenir, SIGTERM'de açık istekler bitirilir ve
+    uygulamanın kapanış işleri çalışır. Uygulama her worker'da ayrı yüklenir
+    (preload yok); veritabanı bağlantıları fork'la paylaşılmaz.
+
+    Metrikler worker'lar arasında birleştirilir: her worker değerlerini METRICS_DIR'e
+    yazar, /metrics isteğini karşılayan worker tüm worker'ların toplamını döner ve
+    master çıkan worker'ların sayaçlarını arşive ekler. Prometheus hangi worker'a
+    düşerse düşsün sunucunun tamamını görür; worker etiketiyle ayrı seriler
+    yerine toplam seçildi, çünkü worker'lar aynı portu paylaşır ve ayrı ayrı
+    kazınamaz. /admin/profile ise isteği karşılayan tek worker'ı profiller
+    (X-Profile-Worker header'ı PID'yi döner).
+
+    reload=True geliştirme içindir: tek process'li uvicorn kaynak değişince yeniden başlar.
+    gunicorn'un çalışmadığı Windows'ta uvicorn'un kendi çoklu process yöneticisi
+    kullanılır (worker yenileme yoktur).
+    """
+    if reload:
+        uvicorn.run(APP_PATH, host=settings.HOST, port=settings.PORT, reload=True, access_log=settings.ACCESS_LOG)
+        return
+
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        uvicorn.run(
+            APP_PATH,
+            host=settings.HOST,
+            port=settings.PORT,
+            workers=worker_count(),
+            backlog=settings.SERVER_BACKLOG,
+            timeout_keep_alive=settings.KEEPALIVE_SECONDS,
+            timeout_graceful_shutdown=settings.GRACEFUL_TIMEOUT,
+            access_log=settings.ACCESS_LOG,
+        )
+        return
+
+    temporary_metrics_dir = prepare_metrics_dir()
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in gunicorn_options().items():
+                self.cfg.set(key, value)
+            if temporary_metrics_dir:
+                # Worker'lar da run() içinden çıktığı için silme try/finally ile değil, yalnızca master'da çalışan hook'la yapılır
+                self.cfg.set("on_exit", lambda server: shutil.rmtree(temporary_metrics_dir, ignore_errors=True))
+
+        def load(self):
+            # Worker process'inde çağrılır
+            from app.main import app
+            return app
+
+    Application().run()
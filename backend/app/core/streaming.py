@@ -0,0 +1,37 @@
+class StreamBuffer:
+    """
+    Yazılan baytları biriktiren ve parça parça boşaltılabilen dosya benzeri nesne
+
+    Akış yanıtlarında zipfile gibi yazıcılara dosya olarak verilir; her yazma
+    adımından sonra drain() ile biriken baytlar istemciye gönderilir. tell()
+    desteklenir ancak seek() desteklenmez, bu yüzden zipfile akış modunda çalışır.
+    close() çağrıldıktan sonra da kalan baytlar drain() ile alınabilir.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
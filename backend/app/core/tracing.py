@@ -0,0 +1,366 @@
+import atexit
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+import orjson
+from sqlalchemy import event
+from app.core.config import settings
+from app.core.metrics import route_template
+from app.db.query_stats import statement_shape
+
+# Logger yapılandırması
+logger = logging.getLogger("tracing")
+
+# OTLP span türleri
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_SERVER = 2
+SPAN_KIND_CLIENT = 3
+
+# OTLP durum kodları
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# Dışa aktarılmayı bekleyen span sayısı bunu aşarsa yeni span'lar atılır
+MAX_PENDING_SPANS = 10000
+
+TRACEPARENT_HEADER = "traceparent"
+
+class Span:
+    """
+    Tek bir işlemin zaman aralığı; bitince dışa aktarma kuyruğuna bırakılır
+    """
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "status", "status_message")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: int, attributes: dict):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.attributes = attributes
+        self.status = STATUS_OK
+        self.status_message = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = STATUS_ERROR
+        self.status_message = str(error)[:500]
+        self.attributes["exception.type"] = type(error).__name__
+
+    def end(self):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        exporter.submit(self)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def tracing_enabled() -> bool:
+    return bool(settings.TRACE_EXPORTER) and settings.TRACE_SAMPLE_RATE > 0
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def _parse_traceparent(value: Optional[str]):
+    # W3C traceparent: 00-<trace-id>-<parent-id>-<flags>
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = int(parts[3], 16) & 1
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(sampled)
+
+def start_root_span(
+    name: str,
+    kind: int = SPAN_KIND_INTERNAL,
+    traceparent: Optional[str] = None,
+    always_sample: bool = False,
+    **attributes,
+) -> Optional[Span]:
+    """
+    Yeni bir trace başlatır (veya gelen traceparent'ı sürdürür); örneklenmezse None döner
+
+    Örnekleme kararı yalnızca kökte verilir; örneklenmeyen isteklerde alt span'lar
+    hiç oluşturulmaz. Gelen traceparent'ın örnekleme bayrağına uyulur. Seyrek
+    çalışan işler always_sample ile TRACE_SAMPLE_RATE'ten bağımsız izlenir.
+    """
+    if not tracing_enabled():
+        return None
+    parent = _parse_traceparent(traceparent)
+    if parent is not None:
+        trace_id, parent_id, sampled = parent
+    else:
+        trace_id, parent_id = None, None
+        sampled = always_sample or random.random() < settings.TRACE_SAMPLE_RATE
+    if not sampled:
+        return None
+    return Span(name, trace_id or os.urandom(16).hex(), parent_id, kind, attributes)
+
+@contextmanager
+def _activate(span: Optional[Span]):
+    if span is None:
+        yield None
+        return
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.end()
+
+def root_span(name: str, kind: int = SPAN_KIND_INTERNAL, always_sample: bool = False, **attributes):
+    """
+    Zamanlanmış işler ve arka plan worker'ları için kök span bloğu
+    """
+    return _activate(start_root_span(name, kind, always_sample=always_sample, **attributes))
+
+def span(name: str, kind: int = SPAN_KIND_INTERNAL, **attributes):
+    """
+    Aktif span'ın altında bir span bloğu açar; aktif span yoksa hiçbir şey yapmaz
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return _activate(None)
+    return _activate(Span(name, parent.trace_id, parent.span_id, kind, attributes))
+
+def _attribute_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _encode(spans: List[Span]) -> bytes:
+    # OTLP/JSON (ExportTraceServiceRequest) gövdesi
+    return orjson.dumps({
+        "resourceSpans": [{
+            "resource": {"attributes": [
+                {"key": "service.name", "value": {"stringValue": settings.TRACE_SERVICE_NAME}},
+                {"key": "service.version", "value": {"stringValue": settings.PROJECT_VERSION}},
+                {"key": "process.pid", "value": {"intValue": str(os.getpid())}},
+            ]},
+            "scopeSpans": [{
+                "scope": {"name": "mutfak"},
+                "spans": [
+                    {
+                        "traceId": s.trace_id,
+                        "spanId": s.span_id,
+                        "parentSpanId": s.parent_id or "",
+                        "name": s.name,
+                        "kind": s.kind,
+                        "startTimeUnixNano": str(s.start_ns),
+                        "endTimeUnixNano": str(s.end_ns),
+                        "attributes": [{"key": k, "value": _attribute_value(v)} for k, v in s.attributes.items()],
+                        "status": {"code": s.status, "message": s.status_message or ""},
+                    }
+                    for s in spans
+                ],
+            }],
+        }],
+    })
+
+class SpanExporter:
+    """
+    Biten span'ları arka plan thread'inde partiler halinde dosyaya veya OTLP collector'a yazar
+
+    "file": her parti TRACE_FILE dosyasına bir satır OTLP/JSON olarak eklenir.
+    "otlp": her parti TRACE_OTLP_ENDPOINT adresine OTLP/HTTP JSON olarak gönderilir.
+    """
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._dropped = 0
+
+    def submit(self, span: Span):
+        if self._queue.qsize() >= MAX_PENDING_SPANS:
+            self._dropped += 1
+            return
+        self._queue.put(span)
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            # Parti TRACE_BATCH_SIZE span'a ulaşınca, ilk span'dan TRACE_EXPORT_INTERVAL_SECONDS
+            # sonra veya flush işareti geldiğinde yazılır
+            batch = []
+            flushes = []
+            item = self._queue.get()
+            deadline = time.monotonic() + settings.TRACE_EXPORT_INTERVAL_SECONDS
+            while True:
+                if isinstance(item, threading.Event):
+                    flushes.append(item)
+                    break
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= settings.TRACE_BATCH_SIZE or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if batch:
+                self._export(batch)
+            for flushed in flushes:
+                flushed.set()
+
+    def flush(self, timeout: float = 5.0):
+        """
+        O ana kadar biten span'lar yazılana kadar bekler
+        """
+        if self._thread is None:
+            return
+        flushed = threading.Event()
+        self._queue.put(flushed)
+        flushed.wait(timeout)
+
+    def _export(self, batch: List[Span]):
+        if self._dropped:
+            logger.warning(f"Kuyruk dolu olduğu için {self._dropped} span atıldı.")
+            self._dropped = 0
+        payload = _encode(batch)
+        try:
+            if settings.TRACE_EXPORTER == "otlp":
+                request = urllib.request.Request(
+                    settings.TRACE_OTLP_ENDPOINT,
+                    data=payload,
+                    headers={"Content-Type": "application/json"},
+                    method="POST",
+                )
+                with urllib.request.urlopen(request, timeout=5):
+                    pass
+            else:
+                with open(settings.TRACE_FILE, "ab") as f:
+                    f.write(payload + b"\n")
+        except Exception as e:
+            logger.error(f"{len(batch)} span dışa aktarılamadı: {str(e)}")
+
+exporter = SpanExporter()
+
+class TracingMiddleware:
+    """
+    Örneklenen her HTTP isteği için bir kök span açan saf ASGI middleware
+
+    Gelen traceparent header'ı sürdürülür ve yanıta isteğin traceparent'ı eklenir.
+    Span yanıt gövdesinin son parçası gönderildiğinde biter; ardından çalışan
+    BackgroundTasks'ın span'ları bu span'ın altında kalır.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracing_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+        span = start_root_span(f"{scope['method']} {scope['path']}", SPAN_KIND_SERVER, traceparent, **{
+            "http.method": scope["method"],
+            "http.target": scope["path"],
+        })
+        if span is None:
+            await self.app(scope, receive, send)
+            return
+
+        def finish():
+            if span.end_ns is not None:
+                return
+            route = route_template(scope)
+            span.name = f"{scope['method']} {route}"
+            span.set_attribute("http.route", route)
+            span.end()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.status = STATUS_ERROR
+                headers = list(message.get("headers", []))
+                headers.append((TRACEPARENT_HEADER.encode("latin-1"), span.traceparent.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        token = _current_span.set(span)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            finish()
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = _current_span.get()
+    if parent is None:
+        return
+    # Parametre değerleri span'a yazılmaz; sorgu şekli yeterlidir
+    conn.info.setdefault("trace_spans", []).append(
+        Span("db.query", parent.trace_id, parent.span_id, SPAN_KIND_CLIENT, {
+            "db.system": "postgresql",
+            "db.statement": statement_shape(statement)[:2000],
+            "db.executemany": executemany,
+        })
+    )
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        spans.pop().end()
+
+def _handle_error(exception_context):
+    spans = exception_context.connection.info.get("trace_spans") if exception_context.connection is not None else None
+    if spans:
+        span_ = spans.pop()
+        span_.record_error(exception_context.original_exception)
+        span_.end()
+
+def instrument_engine_tracing(engine):
+    """
+    Örneklenen trace'lerde her SQL ifadesi için bir alt span oluşturur
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
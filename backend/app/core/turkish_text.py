@@ -0,0 +1,100 @@
+import re
+from typing import List, Tuple
+
+# Konu çıkarımında anlam taşımayan sık kullanılan kelimeler
+STOPWORDS = frozenset("""
+acaba ama ancak artık aslında az bana bazen bazı belki ben beni benim bile bir biraz birçok biri birkaç
+biz bize bizi bizim böyle bu buna bunda bundan bunlar bunları bunu bunun burada bütün çok çünkü da daha
+de değil diye dolayı en fakat falan gayet gene gerçekten gibi göre hala halde hem hep hepsi her herkes
+hiç için ile ilk ise işte kadar kendi kez ki kim mi mı mu mü nasıl ne neden nerede niye o olan olarak
+oldu olduğu olduk oldukça olmak olması olmuş olsa olur on ona onda ondan onlar onları onu onun orada
+öyle önce sadece sanki sen sende senden seni siz size sizi son sonra şey şeyler şimdi şöyle şu şuna
+şunu tabii tam tüm üzere var ve veya ya yani yine yok zaten
+""".split())
+
+# Çekim ekleri; en uzun ek önce denenir
+SUFFIXES = sorted(
+    """
+    lar ler ları leri ların lerin larda lerde lardan lerden lara lere
+    ndan nden dan den tan ten nda nde da de ta te na ne ya ye
+    nın nin nun nün ın in un ün yla yle la le
+    yı yi yu yü nı ni nu nü sı si su sü
+    ımız imiz umuz ümüz ım im um üm
+    ydı ydi ydu ydü dı di du dü tı ti tu tü
+    dır dir dur dür tır tir tur tür mış miş muş müş
+    lı li lu lü
+    """.split(),
+    key=len,
+    reverse=True,
+)
+
+# Tek harfli ekler yalnızca kök yeterince uzunsa atılır ("kötü" -> "köt" olmasın)
+SINGLE_LETTER_SUFFIXES = ("ı", "i", "u", "ü")
+
+MIN_STEM_LENGTH = 3
+MIN_STEM_LENGTH_SINGLE = 5
+
+# Sonda yumuşayan ünsüzler: "yemeği" -> "yemeğ" -> "yemek"
+SOFTENED_CONSONANTS = {"ğ": "k", "b": "p", "c": "ç"}
+
+VOWELS = frozenset("aeıioöuü")
+
+# Ek başındaki kaynaştırma ünsüzleri. "servisi" (servis + i) ile "çorbası" (çorba + sı)
+# sözlüksüz ayırt edilemediği için ünlüden sonra gelen bu harfler kökten de atılır;
+# böylece "servis" ve "servisi" aynı anahtara ("servi") düşer.
+BUFFER_CONSONANTS = frozenset("nsy")
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+def turkish_lower(text: str) -> str:
+    """
+    Türkçe I/İ kurallarına uygun küçük harfe çevirir
+    """
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+def stem(word: str) -> str:
+    """
+    Kelimeden çekim eklerini atan hafif, sözlüksüz bir kök bulucu
+
+    Amaç dilbilgisel olarak doğru kök değil, aynı kelimenin farklı çekimlerini
+    ("soğuk", "soğuktu", "soğuktular") tek bir anahtarda toplamaktır.
+    """
+    for _ in range(3):
+        for suffix in SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+                word = word[: -len(suffix)]
+                break
+        else:
+            if word.endswith(SINGLE_LETTER_SUFFIXES) and len(word) - 1 >= MIN_STEM_LENGTH_SINGLE:
+                word = word[:-1]
+            else:
+                break
+    if word[-1] in SOFTENED_CONSONANTS:
+        word = word[:-1] + SOFTENED_CONSONANTS[word[-1]]
+    if len(word) - 1 >= MIN_STEM_LENGTH and word[-1] in BUFFER_CONSONANTS and word[-2] in VOWELS:
+        word = word[:-1]
+    return word
+
+def tokenize(text: str) -> List[str]:
+    """
+    Metni küçük harfli kelimelere ayırır
+    """
+    return WORD_PATTERN.findall(turkish_lower(text or ""))
+
+def extract_terms(text: str) -> List[Tuple[str, str]]:
+    """
+    Yorumdan konu terimlerini çıkarır
+
+    Durak kelimeler atıldıktan sonra kalan kelimelerin kökleri ve yan yana gelen
+    iki kelimelik ifadeler ("soğuk yemek", "yavaş servis") döner.
+
+    Returns:
+        List[Tuple[str, str]]: (kök, metinde geçtiği hali) çiftleri
+    """
+    words = [word for word in tokenize(text) if len(word) > 1 and word not in STOPWORDS]
+    stems = [stem(word) for word in words]
+
+    terms = list(zip(stems, words))
+    for i in range(len(words) - 1):
+        terms.append((f"{stems[i]} {stems[i + 1]}", f"{words[i]} {words[i + 1]}"))
+    return terms
@@ -0,0 +1,27 @@
+from uvicorn.workers import UvicornWorker
+from app.core.config import settings
+from app.core.logging_setup import setup_logging
+
+# GRACEFUL_TIMEOUT'un bu kadarı kapanış işlerine (zamanlayıcı, span/log boşaltma) ayrılır
+SHUTDOWN_MARGIN_SECONDS = 10
+
+class MutfakUvicornWorker(UvicornWorker):
+    """
+    Gunicorn altında uvloop ve httptools ile çalışan uvicorn worker'ı
+
+    Kapanışta açık bağlantılar en fazla GRACEFUL_TIMEOUT - SHUTDOWN_MARGIN_SECONDS
+    saniye beklenir. Süre sınırı olmadan uzun yaşayan bağlantılar (SSE akışları)
+    gunicorn worker'ı SIGKILL ile öldürene kadar kapanmaz ve uygulamanın kapanış
+    işleri hiç çalışmaz.
+    """
+
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "timeout_graceful_shutdown": max(1, settings.GRACEFUL_TIMEOUT - SHUTDOWN_MARGIN_SECONDS),
+    }
+
+    def init_process(self):
+        # Fork'tan sonra kurulur: log thread'i worker'a aittir ve uygulama yüklenirken yazılanlar da kuyruktan geçer
+        setup_logging()
+        super().init_process()
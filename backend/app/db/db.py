@@ -2,10 +2,16 @@ from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.query_stats import instrument_engine
+from app.core.tracing import instrument_engine_tracing
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Sorgu sayımı, yavaş sorgu logu ve N+1 uyarıları
+instrument_engine(engine)
+# İzlenen isteklerde her SQL ifadesi için span
+instrument_engine_tracing(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
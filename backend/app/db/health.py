@@ -0,0 +1,60 @@
+import os
+from functools import lru_cache
+from typing import Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from app.db.db import engine
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "migrations")
+
+# Veritabanının bu koddaki migrasyonlara ulaştığı bir kez görüldükten sonra tekrar kontrol edilmez
+_migrations_applied = False
+
+@lru_cache(maxsize=1)
+def _migration_revisions() -> Tuple[frozenset, frozenset]:
+    """
+    Koddaki migrasyonların head'lerini ve bilinen tüm revizyonları döner
+
+    alembic yalnızca ilk hazırlık kontrolünde yüklenir.
+    """
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    script = ScriptDirectory.from_config(config)
+    known = frozenset(revision.revision for revision in script.walk_revisions())
+    return frozenset(script.get_heads()), known
+
+def _current_revisions(conn) -> frozenset:
+    if conn.execute(text("SELECT to_regclass('alembic_version')")).scalar() is None:
+        return frozenset()
+    return frozenset(conn.execute(text("SELECT version_num FROM alembic_version")).scalars())
+
+def check_readiness() -> Tuple[bool, dict]:
+    """
+    Worker'ın trafik almaya hazır olup olmadığını kontrol eder
+
+    Havuzdan bir bağlantı alınıp sorgu çalıştırılabilmeli ve veritabanı bu kodun
+    migrasyon head'inde olmalıdır. Veritabanında bu kodun bilmediği bir revizyon
+    varsa (yeni sürümün migrasyonu önceden uygulanmışsa) eski replikalar da hazır
+    sayılır; aksi halde sürüm geçişinde migrasyon çalışınca tüm eski replikalar
+    trafikten çıkarılırdı.
+
+    Returns:
+        Tuple[bool, dict]: Hazır mı ve yanıt gövdesi
+    """
+    global _migrations_applied
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            if _migrations_applied:
+                return True, {"status": "ready"}
+            current = _current_revisions(conn)
+    except SQLAlchemyError as e:
+        return False, {"status": "database_unavailable", "detail": str(e).splitlines()[0]}
+
+    heads, known = _migration_revisions()
+    if current != heads and current <= known:
+        return False, {"status": "migrations_pending", "revision": sorted(current), "head": sorted(heads)}
+    _migrations_applied = True
+    return True, {"status": "ready"}
@@ -0,0 +1,43 @@
+import logging
+import zlib
+from contextlib import contextmanager
+from sqlalchemy import text
+from app.db.db import engine
+
+# Logger yapılandırması
+logger = logging.getLogger("db_locks")
+
+def advisory_lock_key(name: str) -> int:
+    """
+    Kilit adından tüm süreçlerde aynı olan bir advisory lock anahtarı üretir
+    """
+    # Python'un hash() fonksiyonu süreçten sürece değiştiği için crc32 kullanıyoruz
+    return zlib.crc32(name.encode("utf-8"))
+
+@contextmanager
+def advisory_lock(name: str):
+    """
+    Oturum seviyesinde PostgreSQL advisory lock almayı dener
+
+    Kilit alınamazsa beklemez; (bağlantı, False) döner. Kilit bağlantıya bağlı
+    olduğu için süreç ölürse PostgreSQL tarafından otomatik bırakılır.
+
+    Yields:
+        Tuple[Connection, bool]: Kilidi tutan bağlantı ve kilidin alınıp alınmadığı
+    """
+    lock_key = advisory_lock_key(name)
+
+    with engine.connect() as conn:
+        acquired = conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": lock_key}).scalar()
+        conn.commit()
+        try:
+            yield conn, acquired
+        finally:
+            if acquired:
+                try:
+                    conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": lock_key})
+                    conn.commit()
+                except Exception as e:
+                    # Kilit bırakılamazsa bağlantıyı havuza geri vermeden kapat, kilit sunucu tarafında düşer
+                    logger.error(f"'{name}' kilidi bırakılamadı: {str(e)}")
+                    conn.invalidate()
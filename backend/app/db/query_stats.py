@@ -0,0 +1,141 @@
+import logging
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Optional
+from sqlalchemy import event
+from app.core.config import settings
+
+# Logger yapılandırması
+logger = logging.getLogger("db_queries")
+
+# Debug modunda yanıta eklenen header'lar
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Time-Ms"
+
+PARAMETER_PATTERN = re.compile(r"%\([^)]*\)s|%s")
+# IN listeleri ve çoklu VALUES eleman sayısından bağımsız olarak aynı şekle indirgenir
+PARAMETER_LIST_PATTERN = re.compile(r"\?(?:\s*,\s*\?)+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+class QueryStats:
+    """
+    Bir istek veya zamanlanmış iş boyunca çalışan sorguların özeti
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes: Dict[str, int] = {}
+
+    def record(self, statement: str, duration: float):
+        self.count += 1
+        self.total_time += duration
+        shape = statement_shape(statement)
+        repeats = self.shapes.get(shape, 0) + 1
+        self.shapes[shape] = repeats
+        # Aynı şekil eşiği ilk aştığında bir kez uyarılır
+        if repeats == settings.QUERY_REPEAT_WARN_THRESHOLD + 1:
+            logger.warning(
+                f"Olası N+1: {self.label} içinde aynı sorgu {settings.QUERY_REPEAT_WARN_THRESHOLD} "
+                f"kereden fazla çalıştı: {shape}"
+            )
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+@lru_cache(maxsize=1024)
+def statement_shape(statement: str) -> str:
+    """
+    Sorguyu parametre değerlerinden ve liste uzunluklarından bağımsız bir şekle indirger
+    """
+    shape = PARAMETER_PATTERN.sub("?", statement)
+    shape = PARAMETER_LIST_PATTERN.sub("?", shape)
+    return WHITESPACE_PATTERN.sub(" ", shape).strip()
+
+def _redacted_parameters(parameters, executemany: bool) -> str:
+    # Değerler kişisel veri (e-posta, telefon, yorum) içerebildiği için yalnızca adlar loglanır
+    if executemany:
+        return f"{len(parameters)} satır"
+    if isinstance(parameters, dict):
+        return ", ".join(f"{name}=?" for name in parameters)
+    return ", ".join("?" for _ in parameters or ())
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    if duration * 1000 >= settings.SLOW_QUERY_MS:
+        label = stats.label if stats is not None else "-"
+        logger.warning(
+            f"Yavaş sorgu ({duration * 1000:.0f} ms, {label}): {WHITESPACE_PATTERN.sub(' ', statement).strip()} "
+            f"[{_redacted_parameters(parameters, executemany)}]"
+        )
+
+def _handle_error(exception_context):
+    # Hata veren sorguda after_cursor_execute çalışmaz; başlangıç zamanı yığında kalırsa sonraki sorgular yanlış ölçülür
+    start_times = exception_context.connection.info.get("query_start_time") if exception_context.connection is not None else None
+    if start_times:
+        start_times.pop()
+
+def instrument_engine(engine):
+    """
+    Engine'e sorgu sayımı, yavaş sorgu logu ve N+1 tespiti için cursor event'lerini ekler
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+@contextmanager
+def track_queries(label: str):
+    """
+    Blok içinde çalışan sorguları sayar
+
+    Context değişkeni kullanıldığı için thread havuzunda çalışan endpoint'ler ve
+    bağımlılıklar da isteğin sayacına yazar.
+
+    Yields:
+        QueryStats: Blok boyunca güncellenen özet
+    """
+    stats = QueryStats(label)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+class QueryStatsMiddleware:
+    """
+    Her HTTP isteğinin sorgularını sayan saf ASGI middleware
+
+    Debug modunda sorgu sayısı ve toplam veritabanı süresi yanıt header'larına eklenir.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(f"{scope['method']} {scope['path']}") as stats:
+            if not settings.DEBUG:
+                await self.app(scope, receive, send)
+                return
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERY_COUNT_HEADER.lower().encode("latin-1"), str(stats.count).encode("latin-1")))
+                    headers.append((QUERY_TIME_HEADER.lower().encode("latin-1"), f"{stats.total_time * 1000:.1f}".encode("latin-1")))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
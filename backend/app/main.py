@@ -1,28 +1,50 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi import FastAPI, Depends, HTTPException, status, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from datetime import timedelta
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.interval import IntervalTrigger
 import logging
+import threading
 
 from app.core.config import settings
-from app.db.db import get_db, engine, Base
+from app.core.logging_setup import setup_logging
+from app.core.tracing import TracingMiddleware, exporter
+from app.core.metrics import MetricsMiddleware, PROMETHEUS_CONTENT_TYPE, register_pool_metrics, registry
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.responses import FastJSONResponse
+from app.db.db import get_db, engine, SessionLocal
+from app.db.health import check_readiness
+from app.db.query_stats import QUERY_COUNT_HEADER, QUERY_TIME_HEADER, QueryStatsMiddleware
 from app.models.models import User, UserRole
 from app.schemas.schemas import Token, Login
 from app.core.auth import authenticate_user, create_access_token, get_password_hash
 from app.api.api import api_router
 from app.services.email_service import process_all_low_ratings
+from app.services.scheduler_service import add_exclusive_job, get_scheduler, shutdown_scheduler
+from app.services.tenant_deletion_service import resume_restaurant_deletions
+from app.services.archive_service import archive_old_rows
+from app.services.topic_service import extract_comment_topics
+from app.services.sentiment_service import score_comment_sentiments
+from app.services.export_service import parquet_available
+from app.services.event_service import event_hub
+from app.services.version_service import restaurant_changes
 
-# Logger yapılandırması
+# Logger yapılandırması startup_event'te (gunicorn altında worker açılışında) yapılır; import yan etkisizdir
 logger = logging.getLogger("api")
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+# Şema yalnızca Alembic ile yönetilir (alembic upgrade head); import sırasında veritabanına bağlanılmaz
+
+# Veritabanı hazır olana kadar açılış işleri artan aralıklarla (saniye) tekrar denenir
+STARTUP_RETRY_INITIAL_SECONDS = 1
+STARTUP_RETRY_MAX_SECONDS = 30
+
+# Kapanışta açılış işlerinin tekrar denemelerini durdurur
+startup_cancelled = threading.Event()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
+    default_response_class=FastJSONResponse,
 )
 
 # CORS middleware
@@ -32,58 +54,131 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, QUERY_COUNT_HEADER, QUERY_TIME_HEADER],
 )
 
+# İstek başına sorgu sayımı ve N+1 uyarıları
+app.add_middleware(QueryStatsMiddleware)
+
+# Örneklenen istekler için trace span'ları
+app.add_middleware(TracingMiddleware)
+
+# İstek metrikleri (en dışta; CORS dahil tüm süreyi ölçer)
+if settings.ENABLE_METRICS:
+    app.add_middleware(MetricsMiddleware)
+    register_pool_metrics(engine)
+
 # Ana API router'ı uygulamaya ekle
 app.include_router(api_router, prefix="/api")
 
 # Background task to process low ratings
+# Hatalar run_exclusive tarafından loglanır ve iş durumu tablosuna kaydedilir
 def process_low_ratings_task():
+    db = SessionLocal()
     try:
-        db = next(get_db())
         processed_count = process_all_low_ratings(db, hours=24)
         logger.info(f"Scheduled task: {processed_count} düşük puanlı yorum işlendi.")
-    except Exception as e:
-        logger.error(f"Scheduled task error: {str(e)}")
-
-# Initialize scheduler
-scheduler = BackgroundScheduler()
+    finally:
+        db.close()
 
-@app.on_event("startup")
-async def startup_db_client():
-    # Create admin user if not exists
-    db = next(get_db())
-    admin_user = db.query(User).filter(User.email == settings.ADMIN_EMAIL).first()
-    if not admin_user:
-        admin_user = User(
+def ensure_admin_user():
+    """
+    Admin kullanıcısı yoksa oluşturur
+    """
+    db = SessionLocal()
+    try:
+        if db.query(User.id).filter(User.email == settings.ADMIN_EMAIL).first() is not None:
+            return
+        db.add(User(
             email=settings.ADMIN_EMAIL,
             hashed_password=get_password_hash(settings.ADMIN_PASSWORD),
             role=UserRole.ADMIN,
-        )
-        db.add(admin_user)
+        ))
         db.commit()
-        db.refresh(admin_user)
-    
-    # Start scheduler for low rating notifications
-    if settings.ENABLE_EMAIL_NOTIFICATIONS:
+        logger.info("Admin kullanıcısı oluşturuldu.")
+    except IntegrityError:
+        # Başka bir worker aynı anda oluşturdu
+        db.rollback()
+    finally:
+        db.close()
+
+def wait_for_database() -> bool:
+    """
+    Veritabanı hazır olana (/readyz'deki kontrol geçene) ve admin kullanıcısı hazırlanana kadar bekler
+
+    Veritabanı açılmamışken veya migrasyonlar henüz uygulanmamışken worker'ın açılışı
+    tek denemede vazgeçmez; deneme aralığı STARTUP_RETRY_MAX_SECONDS'a kadar ikiye
+    katlanır. Kapanış başlarsa False döner.
+    """
+    delay = STARTUP_RETRY_INITIAL_SECONDS
+    while True:
         try:
-            scheduler.add_job(
-                process_low_ratings_task,
-                IntervalTrigger(hours=1),  # Her saat çalıştır
-                id="process_low_ratings",
-                replace_existing=True
-            )
-            scheduler.start()
-            logger.info("Düşük puanlı yorum işleme zamanlayıcısı başlatıldı.")
+            ready, body = check_readiness()
+            if ready:
+                ensure_admin_user()
+                return True
+            reason = body["status"]
         except Exception as e:
-            logger.error(f"Zamanlayıcı başlatılırken hata oluştu: {str(e)}")
+            reason = str(e)
+        logger.warning(f"Veritabanı hazır değil ({reason}), açılış işleri {delay} sn sonra tekrar denenecek.")
+        if startup_cancelled.wait(delay):
+            return False
+        delay = min(delay * 2, STARTUP_RETRY_MAX_SECONDS)
+
+def start_background_services():
+    """
+    Veritabanı hazır olunca admin kullanıcısını hazırlar ve zamanlayıcıyı başlatır
+
+    Açılışı bekletmemek için ayrı bir thread'de çalışır; veritabanı yavaşsa veya
+    henüz hazır değilse worker yine istek almaya başlar (hazır olup olmadığı
+    /readyz ile izlenir).
+    """
+    if not wait_for_database():
+        return
+
+    try:
+        # Her iş çoklu worker'da yalnızca birinde çalışır
+        if settings.ENABLE_EMAIL_NOTIFICATIONS:
+            add_exclusive_job(process_low_ratings_task, "process_low_ratings", timedelta(hours=1))
+        # Yarıda kalan restoran silme işlerini devam ettir
+        add_exclusive_job(resume_restaurant_deletions, "resume_restaurant_deletions", timedelta(minutes=5))
+        # Yeni yorumlardan konu sayılarını güncelle
+        add_exclusive_job(extract_comment_topics, "extract_comment_topics", timedelta(minutes=5))
+        # Yeni yorumların duygu puanlarını hesapla
+        add_exclusive_job(score_comment_sentiments, "score_comment_sentiments", timedelta(minutes=1))
+        # Eski geri bildirimleri ve tıklamaları Parquet arşivine taşı
+        if settings.ENABLE_ARCHIVE:
+            if parquet_available():
+                add_exclusive_job(archive_old_rows, "archive_old_rows", timedelta(days=1))
+            else:
+                logger.warning("ENABLE_ARCHIVE açık fakat pyarrow kurulu değil, arşivleme devre dışı.")
+        get_scheduler().start()
+        logger.info("Zamanlayıcı başlatıldı.")
+    except Exception as e:
+        logger.error(f"Zamanlayıcı başlatılırken hata oluştu: {str(e)}")
+
+@app.on_event("startup")
+async def startup_event():
+    # Gunicorn worker'ında zaten kurulmuştur; uvicorn ile doğrudan çalıştırıldığında burada kurulur
+    setup_logging()
+    # Gunicorn altında metrikler diğer worker'larla birleştirilir (bkz. app/core/server.py)
+    if settings.ENABLE_METRICS and settings.METRICS_DIR:
+        registry.share_across_workers(settings.METRICS_DIR, settings.METRICS_SYNC_INTERVAL_SECONDS)
+    threading.Thread(target=start_background_services, name="startup", daemon=True).start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    # Shutdown scheduler
-    if scheduler.running:
-        scheduler.shutdown()
+    startup_cancelled.set()
+    if shutdown_scheduler():
         logger.info("Zamanlayıcı durduruldu.")
+    # Canlı olay akışının LISTEN bağlantısını kapat
+    event_hub.close()
+    # Bekleyen sürüm artışlarını ve span'ları yaz, havuzdaki veritabanı bağlantılarını kapat
+    restaurant_changes.flush()
+    exporter.flush()
+    engine.dispose()
+    # Son metrik değerleri master'ın arşivine eklenmek üzere yazılır
+    registry.write_snapshot()
 
 @app.post("/token", response_model=Token)
 async def login_for_access_token(login: Login, db: Session = Depends(get_db)):
@@ -106,6 +201,30 @@ async def login_for_access_token(login: Login, db: Session = Depends(get_db)):
         "restaurant_id": user.restaurant_id,
     }
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Sunucu metriklerini Prometheus metin formatında döner (gunicorn altında tüm worker'ların toplamı)
+    """
+    if not settings.ENABLE_METRICS:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    return Response(content=registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    """
+    Liveness: süreç ayakta ve istek karşılıyor (veritabanına bakılmaz)
+    """
+    return {"status": "ok"}
+
+@app.get("/readyz", include_in_schema=False)
+def readyz():
+    """
+    Readiness: veritabanı havuzundan bağlantı alınabiliyor ve migrasyonlar head'de
+    """
+    ready, body = check_readiness()
+    return FastJSONResponse(body, status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE)
+
 @app.get("/")
 async def root():
     return {"message": "Mutfak Yazılım API'ye Hoş Geldiniz"}
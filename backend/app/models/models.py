@@ -1,5 +1,6 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, Text, DateTime, Enum
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, Computed, ForeignKey, Integer, String, Float, Text, DateTime, Date, Enum, Index, JSON, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql import func
 import enum
 from datetime import datetime
@@ -17,7 +18,7 @@ class User(Base):
     hashed_password = Column(String)
     role = Column(String, default=UserRole.RESTAURANT_OWNER)
     is_active = Column(Boolean, default=True)
-    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=True)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), nullable=True, index=True)
     
     restaurant = relationship("Restaurant", back_populates="owner")
 
@@ -29,6 +30,7 @@ class Restaurant(Base):
     subdomain = Column(String, unique=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    deleted_at = Column(DateTime(timezone=True), nullable=True)  # Silme işi başladığında dolar, public endpoint'ler artık göstermez
     
     owner = relationship("User", back_populates="restaurant")
     feedbacks = relationship("Feedback", back_populates="restaurant")
@@ -39,6 +41,15 @@ class Restaurant(Base):
 
 class Feedback(Base):
     __tablename__ = "feedbacks"
+    # Sayfalı listelemeler için keyset indeksi: (restaurant_id, created_at, id), yorum araması için GIN indeksi
+    __table_args__ = (
+        Index("ix_feedbacks_restaurant_created_at_id", "restaurant_id", "created_at", "id"),
+        Index("ix_feedbacks_search_vector", "search_vector", postgresql_using="gin"),
+        # Duygu puanı henüz hesaplanmamış yorumları bulmak için kısmi indeks
+        Index("ix_feedbacks_unscored", "id", postgresql_where=text("sentiment_score IS NULL AND comment IS NOT NULL")),
+        # Dashboard ve analizlerdeki puan/duygu toplamları için kapsayan indeks (index-only scan)
+        Index("ix_feedbacks_restaurant_rating", "restaurant_id", "average_rating", postgresql_include=["sentiment_score", "id"]),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
@@ -49,6 +60,9 @@ class Feedback(Base):
     atmosphere_rating = Column(Integer)
     average_rating = Column(Float)
     comment = Column(Text, nullable=True)
+    # Yorum üzerinde tam metin arama; PostgreSQL tarafından hesaplanır, varsayılan olarak yüklenmez
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('turkish', coalesce(comment, ''))", persisted=True)))
+    sentiment_score = Column(Float, nullable=True)  # -1 (olumsuz) ile 1 (olumlu) arası; arka planda hesaplanır
     restaurant_id = Column(Integer, ForeignKey("restaurants.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -56,6 +70,15 @@ class Feedback(Base):
 
 class Complaint(Base):
     __tablename__ = "complaints"
+    # Sayfalı listelemeler için keyset indeksi: (restaurant_id, created_at, id), yorum araması için GIN indeksi
+    __table_args__ = (
+        Index("ix_complaints_restaurant_created_at_id", "restaurant_id", "created_at", "id"),
+        Index("ix_complaints_search_vector", "search_vector", postgresql_using="gin"),
+        # Duygu puanı henüz hesaplanmamış yorumları bulmak için kısmi indeks
+        Index("ix_complaints_unscored", "id", postgresql_where=text("sentiment_score IS NULL AND comment IS NOT NULL")),
+        # Dashboard ve analizlerdeki puan/duygu toplamları için kapsayan indeks (index-only scan)
+        Index("ix_complaints_restaurant_rating", "restaurant_id", "average_rating", postgresql_include=["sentiment_score", "id"]),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
@@ -66,6 +89,9 @@ class Complaint(Base):
     atmosphere_rating = Column(Integer)
     average_rating = Column(Float)
     comment = Column(Text)
+    # Yorum üzerinde tam metin arama; PostgreSQL tarafından hesaplanır, varsayılan olarak yüklenmez
+    search_vector = deferred(Column(TSVECTOR, Computed("to_tsvector('turkish', coalesce(comment, ''))", persisted=True)))
+    sentiment_score = Column(Float, nullable=True)  # -1 (olumsuz) ile 1 (olumlu) arası; arka planda hesaplanır
     restaurant_id = Column(Integer, ForeignKey("restaurants.id"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
@@ -116,10 +142,86 @@ class Waitlist(Base):
 
 class StarClick(Base):
     __tablename__ = "star_clicks"
+    # Yıldız sayımları için kapsayan indeks; restaurant_id ile yapılan aramaları da karşılar
+    __table_args__ = (
+        Index("ix_star_clicks_restaurant_star", "restaurant_id", "star_value", postgresql_include=["id"]),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     restaurant_id = Column(Integer, ForeignKey("restaurants.id"))
     star_value = Column(Integer)  # Tıklanan yıldız değeri (1-5)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
-    restaurant = relationship("Restaurant", backref="star_clicks") 
\ No newline at end of file
+    restaurant = relationship("Restaurant", backref="star_clicks") 
+
+class ScheduledJobStatus(Base):
+    __tablename__ = "scheduled_job_status"
+
+    job_id = Column(String, primary_key=True)
+    last_started_at = Column(DateTime(timezone=True), nullable=True)
+    last_finished_at = Column(DateTime(timezone=True), nullable=True)
+    last_success_at = Column(DateTime(timezone=True), nullable=True)
+    last_duration_ms = Column(Float, nullable=True)
+    last_status = Column(String, nullable=True)  # running, success, failed
+    last_error = Column(Text, nullable=True)
+    last_worker = Column(String, nullable=True)  # hostname:pid
+    run_count = Column(Integer, default=0)
+    failure_count = Column(Integer, default=0)
+
+class RestaurantDeletionJob(Base):
+    __tablename__ = "restaurant_deletion_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    restaurant_id = Column(Integer, index=True)  # Restoran silindikten sonra da kayıt kalsın diye FK yok
+    status = Column(String, default="pending")  # pending, running, completed, failed
+    progress = Column(JSON, default=dict)  # Tablo başına silinen satır sayısı
+    current_table = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+class ArchiveRollup(Base):
+    __tablename__ = "archive_rollups"
+    # Arşivlenen satırların özetleri; aynı kova tekrar arşivlenirse sayılar üzerine eklenir
+    __table_args__ = (
+        UniqueConstraint("restaurant_id", "source", "month", "value", name="uq_archive_rollups_bucket"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"))
+    source = Column(String)  # feedbacks, complaints, star_clicks
+    month = Column(Date)
+    value = Column(Float, nullable=True)  # Geri bildirimlerde average_rating, yıldız tıklamalarında star_value
+    count = Column(Integer, default=0)
+    latest_created_at = Column(DateTime(timezone=True))
+
+class ProcessingWatermark(Base):
+    __tablename__ = "processing_watermarks"
+
+    name = Column(String, primary_key=True)  # ör. topics:feedbacks
+    last_id = Column(Integer, default=0)  # İşlenmiş son satırın ID'si
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class CommentTermFrequency(Base):
+    __tablename__ = "comment_term_frequencies"
+    # Günlük terim sayıları; yeni yorumlar işlendikçe sayıların üzerine eklenir
+    __table_args__ = (
+        UniqueConstraint("restaurant_id", "source", "day", "term", name="uq_comment_term_frequencies_bucket"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"))
+    source = Column(String)  # feedbacks, complaints
+    day = Column(Date)
+    term = Column(String)  # Kök hali, ör. "soğuk yemek"
+    label = Column(String)  # Yorumlarda geçtiği hali, ör. "soğuk yemekler"
+    count = Column(Integer, default=0)
+
+class RestaurantVersion(Base):
+    __tablename__ = "restaurant_versions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    restaurant_id = Column(Integer, ForeignKey("restaurants.id"), unique=True)
+    version = Column(Integer, default=0)  # Restoranın yanıtlarını etkileyen her yazmada artar, ETag'ler bundan türetilir
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
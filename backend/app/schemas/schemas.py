@@ -14,6 +14,11 @@ class TokenData(BaseModel):
     email: Optional[str] = None
     role: Optional[str] = None
     restaurant_id: Optional[int] = None
+    scope: Optional[str] = None
+
+class StreamTicket(BaseModel):
+    ticket: str
+    expires_in: int
 
 # User schemas
 class UserBase(BaseModel):
@@ -47,6 +52,22 @@ class RestaurantCreate(RestaurantBase):
     owner_email: EmailStr
     owner_password: str
 
+class RestaurantBulkCreate(BaseModel):
+    restaurants: List[RestaurantCreate] = Field(..., min_length=1, max_length=1000)
+
+class RestaurantBulkItemResult(BaseModel):
+    index: int
+    subdomain: str
+    owner_email: str
+    success: bool
+    restaurant_id: Optional[int] = None
+    detail: Optional[str] = None
+
+class RestaurantBulkResult(BaseModel):
+    created: int
+    failed: int
+    results: List[RestaurantBulkItemResult]
+
 class RestaurantUpdate(BaseModel):
     name: Optional[str] = None
     subdomain: Optional[str] = None
@@ -91,6 +112,7 @@ class Feedback(FeedbackBase):
     average_rating: float
     restaurant_id: int
     created_at: datetime
+    sentiment_score: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -113,6 +135,31 @@ class Complaint(ComplaintBase):
     average_rating: float
     restaurant_id: int
     created_at: datetime
+    sentiment_score: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+class FeedbackSearchResult(BaseModel):
+    kind: Literal["feedback", "complaint"]
+    id: int
+    name: Optional[str] = None
+    food_rating: Optional[int] = None
+    service_rating: Optional[int] = None
+    atmosphere_rating: Optional[int] = None
+    average_rating: Optional[float] = None
+    comment: Optional[str] = None
+    created_at: datetime
+    rank: float
+    highlight: str  # HTML olarak kaçırılmış, eşleşen kelimeleri <mark>...</mark> ile işaretlenmiş yorum parçaları
+
+    class Config:
+        from_attributes = True
+
+class TopicCount(BaseModel):
+    term: str  # Kök hali
+    label: str  # Yorumlarda geçtiği hali
+    count: int  # Konunun geçtiği yorum sayısı
 
     class Config:
         from_attributes = True
@@ -149,6 +196,7 @@ class DashboardData(BaseModel):
     rating_distribution: dict
     satisfaction_data: dict
     recent_comments: List[dict]  # Feedback ve Complaint karışık olduğu için dict kullanıyoruz
+    average_sentiment: Optional[float] = None  # Puanlanmış yorumların ortalama duygu puanı
 
 # Stats schemas
 class FeedbackStats(BaseModel):
@@ -211,4 +259,36 @@ class StarClickStats(BaseModel):
     percentages: dict
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+
+# Scheduler schemas
+class ScheduledJobStatus(BaseModel):
+    job_id: str
+    last_started_at: Optional[datetime] = None
+    last_finished_at: Optional[datetime] = None
+    last_success_at: Optional[datetime] = None
+    last_duration_ms: Optional[float] = None
+    last_status: Optional[str] = None
+    last_error: Optional[str] = None
+    last_worker: Optional[str] = None
+    run_count: int = 0
+    failure_count: int = 0
+
+    class Config:
+        from_attributes = True
+
+
+# Restaurant deletion schemas
+class RestaurantDeletionJob(BaseModel):
+    id: int
+    restaurant_id: int
+    status: str
+    progress: Optional[dict] = None
+    current_table: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,278 @@
+import logging
+import os
+import shutil
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import delete, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.db import SessionLocal
+from app.models.models import ArchiveRollup, Complaint, Feedback, Restaurant, StarClick
+from app.services.export_service import EXPORT_BATCH_SIZE, parquet_schema, write_parquet_batches
+from app.services.version_service import bump_restaurant_version
+
+# Logger yapılandırması
+logger = logging.getLogger("archive")
+
+FEEDBACK_COLUMN_TYPES = {
+    "id": "int",
+    "restaurant_id": "int",
+    "name": "str",
+    "email": "str",
+    "phone": "str",
+    "food_rating": "int",
+    "service_rating": "int",
+    "atmosphere_rating": "int",
+    "average_rating": "float",
+    "sentiment_score": "float",
+    "comment": "str",
+    "created_at": "datetime",
+}
+
+STAR_CLICK_COLUMN_TYPES = {
+    "id": "int",
+    "restaurant_id": "int",
+    "star_value": "int",
+    "created_at": "datetime",
+}
+
+# Arşivlenen tablolar: (model, Parquet kolonları, rollup'ta kova olarak kullanılan kolon)
+ARCHIVE_SOURCES = {
+    "feedbacks": (Feedback, FEEDBACK_COLUMN_TYPES, "average_rating"),
+    "complaints": (Complaint, FEEDBACK_COLUMN_TYPES, "average_rating"),
+    "star_clicks": (StarClick, STAR_CLICK_COLUMN_TYPES, "star_value"),
+}
+
+def archive_cutoff(now: Optional[datetime] = None) -> datetime:
+    """
+    Arşivlenecek satırlar için üst sınırı döner
+
+    Sınır ARCHIVE_AFTER_DAYS öncesinin ayının başına yuvarlanır; böylece bir ay
+    yalnızca tamamen eskidiğinde ve tek seferde arşivlenir.
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+    return datetime(cutoff.year, cutoff.month, 1, tzinfo=timezone.utc)
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+def _month_start(month: date) -> datetime:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+
+def _partition_dir(source: str, restaurant_id: int, month: date) -> str:
+    return os.path.join(
+        settings.ARCHIVE_DIR,
+        source,
+        f"restaurant_id={restaurant_id}",
+        f"month={month:%Y-%m}",
+    )
+
+def _partition_filter(model, restaurant_id: int, month: date):
+    return (
+        model.restaurant_id == restaurant_id,
+        model.created_at >= _month_start(month),
+        model.created_at < _month_start(_next_month(month)),
+    )
+
+def _archive_partition(db: Session, source: str, restaurant_id: int, month: date) -> int:
+    model, column_types, value_column = ARCHIVE_SOURCES[source]
+    conditions = _partition_filter(model, restaurant_id, month)
+    columns = list(column_types)
+
+    directory = _partition_dir(source, restaurant_id, month)
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}.tmp")
+
+    ids = []
+
+    def tracked(rows):
+        for row in rows:
+            ids.append(row.id)
+            yield row
+
+    rows = (
+        db.query(*[getattr(model, column) for column in columns])
+        .filter(*conditions)
+        .order_by(model.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    try:
+        for _ in write_parquet_batches(tracked(rows), columns, column_types, tmp_path):
+            pass
+        if not ids:
+            os.remove(tmp_path)
+            return 0
+        # Dosya adı içerikten türetilir; yarıda kalan bir çalışma tekrarlanırsa aynı dosyanın üzerine yazılır
+        os.replace(tmp_path, os.path.join(directory, f"part-{ids[0]}-{ids[-1]}.parquet"))
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    # Rollup'lar ve silme aynı transaction'da; ikisi birlikte uygulanır ya da hiçbiri uygulanmaz
+    value = getattr(model, value_column)
+    buckets = (
+        select(
+            model.restaurant_id,
+            literal(source),
+            literal(month),
+            value,
+            func.count(model.id),
+            func.max(model.created_at),
+        )
+        .where(*conditions, model.id <= ids[-1])
+        .group_by(model.restaurant_id, value)
+    )
+    stmt = insert(ArchiveRollup).from_select(
+        ["restaurant_id", "source", "month", "value", "count", "latest_created_at"],
+        buckets,
+    )
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_archive_rollups_bucket",
+        set_={
+            "count": ArchiveRollup.count + stmt.excluded.count,
+            "latest_created_at": func.greatest(ArchiveRollup.latest_created_at, stmt.excluded.latest_created_at),
+        },
+    )
+    db.execute(stmt)
+    db.execute(
+        delete(model).where(*conditions, model.id <= ids[-1]),
+        execution_options={"synchronize_session": False},
+    )
+    # Dashboard'daki son yorumlar ve tarihler değişebileceği için önbellekler geçersizlenir
+    bump_restaurant_version(db, restaurant_id)
+    db.commit()
+    return len(ids)
+
+def archive_old_rows():
+    """
+    ARCHIVE_AFTER_DAYS'ten eski satırları restoran ve ay bazında Parquet dosyalarına taşır
+
+    Dosyalar ARCHIVE_DIR/<tablo>/restaurant_id=<id>/month=<YYYY-MM>/ altına zstd ile
+    sıkıştırılarak yazılır. Taşınan satırların sayıları archive_rollups tablosuna
+    eklenir, böylece dashboard ve analiz toplamları arşivlemeden etkilenmez.
+    """
+    cutoff = archive_cutoff()
+    db = SessionLocal()
+    try:
+        for source, (model, _, _) in ARCHIVE_SOURCES.items():
+            month = func.date_trunc("month", func.timezone("UTC", model.created_at))
+            partitions = (
+                db.query(model.restaurant_id, month.label("month"))
+                .join(Restaurant, Restaurant.id == model.restaurant_id)
+                # Silinmekte olan restoranların satırları silme işine bırakılır
+                .filter(model.created_at < cutoff, Restaurant.deleted_at.is_(None))
+                .distinct()
+                .order_by(model.restaurant_id, month)
+                .all()
+            )
+            db.commit()
+
+            archived = 0
+            for restaurant_id, partition_month in partitions:
+                try:
+                    archived += _archive_partition(db, source, restaurant_id, partition_month.date())
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"{source} arşivlenirken hata oluştu (restoran {restaurant_id}, {partition_month:%Y-%m}): {str(e)}")
+            logger.info(f"{source}: {len(partitions)} bölümde {archived} satır arşivlendi.")
+    finally:
+        db.close()
+
+def remove_restaurant_archive(restaurant_id: int):
+    """
+    Silinen bir restoranın arşiv dosyalarını kaldırır
+    """
+    for source in ARCHIVE_SOURCES:
+        shutil.rmtree(os.path.join(settings.ARCHIVE_DIR, source, f"restaurant_id={restaurant_id}"), ignore_errors=True)
+
+def read_archive(
+    source: str,
+    restaurant_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    columns: Optional[List[str]] = None,
+):
+    """
+    Bir restoranın arşivlenmiş satırlarını pyarrow tablosu olarak okur
+
+    Tarih aralığı dışında kalan ay dizinleri hiç açılmaz; dosyalar memory map ile
+    okunduğu için büyük aralıklarda da veriler işletim sisteminin sayfa önbelleğinden gelir.
+
+    Args:
+        source: "feedbacks", "complaints" veya "star_clicks"
+        restaurant_id: Restoran ID'si
+        start: Bu tarih ve sonrası (dahil)
+        end: Bu tarihten öncesi (hariç)
+        columns: Okunacak kolonlar (verilmezse tümü)
+
+    Returns:
+        pyarrow.Table: created_at sırasına göre arşiv satırları
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    _, column_types, _ = ARCHIVE_SOURCES[source]
+    columns = columns or list(column_types)
+    read_columns = list(dict.fromkeys(columns + ["created_at"]))
+
+    tables = []
+    base = os.path.join(settings.ARCHIVE_DIR, source, f"restaurant_id={restaurant_id}")
+    if os.path.isdir(base):
+        for partition in sorted(os.listdir(base)):
+            month = datetime.strptime(partition.split("=", 1)[1], "%Y-%m").date()
+            if end is not None and _month_start(month) >= end:
+                continue
+            if start is not None and _month_start(_next_month(month)) <= start:
+                continue
+            directory = os.path.join(base, partition)
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".parquet"):
+                    tables.append(pq.read_table(os.path.join(directory, name), columns=read_columns, memory_map=True))
+
+    if not tables:
+        return parquet_schema(columns, column_types).empty_table()
+
+    table = pa.concat_tables(tables)
+    if start is not None:
+        table = table.filter(pc.greater_equal(table["created_at"], pa.scalar(start, type=table.schema.field("created_at").type)))
+    if end is not None:
+        table = table.filter(pc.less(table["created_at"], pa.scalar(end, type=table.schema.field("created_at").type)))
+    return table.sort_by("created_at").select(columns)
+
+def archived_count(db: Session, source: str, restaurant_id: Optional[int] = None, *conditions) -> int:
+    """
+    Arşive taşınmış satır sayısını döner
+
+    Args:
+        db: Veritabanı oturumu
+        source: "feedbacks", "complaints" veya "star_clicks"
+        restaurant_id: Verilirse yalnızca bu restoranın satırları sayılır
+        conditions: ArchiveRollup.value üzerinde ek filtreler (ör. ArchiveRollup.value >= 4)
+    """
+    query = db.query(func.coalesce(func.sum(ArchiveRollup.count), 0)).filter(ArchiveRollup.source == source, *conditions)
+    if restaurant_id is not None:
+        query = query.filter(ArchiveRollup.restaurant_id == restaurant_id)
+    return query.scalar()
+
+def archived_rating_sum(db: Session, source: str, restaurant_id: int) -> float:
+    """
+    Arşive taşınmış satırların puan toplamını döner (ortalamaları birleştirmek için)
+    """
+    return db.query(func.coalesce(func.sum(ArchiveRollup.value * ArchiveRollup.count), 0)).filter(
+        ArchiveRollup.source == source,
+        ArchiveRollup.restaurant_id == restaurant_id,
+    ).scalar()
+
+def archived_latest(db: Session, source: str, restaurant_id: int) -> Optional[datetime]:
+    """
+    Arşive taşınmış en yeni satırın tarihini döner
+    """
+    return db.query(func.max(ArchiveRollup.latest_created_at)).filter(
+        ArchiveRollup.source == source,
+        ArchiveRollup.restaurant_id == restaurant_id,
+    ).scalar()
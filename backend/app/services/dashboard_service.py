@@ -0,0 +1,156 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.models import ArchiveRollup, Complaint, Feedback
+from app.services.archive_service import archived_count, archived_latest, archived_rating_sum
+
+def dashboard_data(db: Session, restaurant_id: int) -> dict:
+    """
+    Restoran sahibinin dashboard verilerini hesaplar
+
+    Hem GET /restaurant/dashboard hem de canlı olay akışındaki dashboard güncellemeleri
+    bu fonksiyonu kullanır.
+
+    Args:
+        db: Veritabanı oturumu
+        restaurant_id: Restoran ID'si
+
+    Returns:
+        dict: DashboardData şemasındaki alanlar
+    """
+    # Get total feedbacks (including complaints and archived rows)
+    feedbacks_count = (db.query(func.count(Feedback.id)).filter(Feedback.restaurant_id == restaurant_id).scalar() or 0) + archived_count(db, "feedbacks", restaurant_id)
+    complaints_count = (db.query(func.count(Complaint.id)).filter(Complaint.restaurant_id == restaurant_id).scalar() or 0) + archived_count(db, "complaints", restaurant_id)
+    total_feedbacks = feedbacks_count + complaints_count
+    
+    # Get rating sums (including complaints and archived rows)
+    feedback_rating_sum = (db.query(func.sum(Feedback.average_rating)).filter(Feedback.restaurant_id == restaurant_id).scalar() or 0) + archived_rating_sum(db, "feedbacks", restaurant_id)
+    complaint_rating_sum = (db.query(func.sum(Complaint.average_rating)).filter(Complaint.restaurant_id == restaurant_id).scalar() or 0) + archived_rating_sum(db, "complaints", restaurant_id)
+    
+    # Calculate weighted average
+    if feedbacks_count + complaints_count > 0:
+        avg_rating = (feedback_rating_sum + complaint_rating_sum) / (feedbacks_count + complaints_count)
+    else:
+        avg_rating = 0
+    
+    # Get average sentiment of scored comments (including complaints)
+    sentiment_sum = 0
+    sentiment_count = 0
+    for model in (Feedback, Complaint):
+        model_sum, model_count = db.query(func.sum(model.sentiment_score), func.count(model.sentiment_score)).filter(model.restaurant_id == restaurant_id).one()
+        sentiment_sum += model_sum or 0
+        sentiment_count += model_count
+    average_sentiment = round(sentiment_sum / sentiment_count, 2) if sentiment_count else None
+    
+    # Get latest feedback date (including complaints)
+    latest_feedback = db.query(Feedback).filter(Feedback.restaurant_id == restaurant_id).order_by(Feedback.created_at.desc()).first()
+    latest_complaint = db.query(Complaint).filter(Complaint.restaurant_id == restaurant_id).order_by(Complaint.created_at.desc()).first()
+    
+    latest_dates = [item.created_at for item in (latest_feedback, latest_complaint) if item]
+    if not latest_dates:
+        # Tüm satırlar arşive taşınmışsa tarih rollup'lardan gelir
+        latest_dates = [created_at for created_at in (archived_latest(db, "feedbacks", restaurant_id), archived_latest(db, "complaints", restaurant_id)) if created_at]
+    latest_feedback_date = max(latest_dates) if latest_dates else None
+    
+    # Get rating distribution (including complaints)
+    rating_distribution = {}
+    for i in range(1, 6):
+        feedback_count = db.query(func.count(Feedback.id)).filter(
+            Feedback.restaurant_id == restaurant_id,
+            func.round(Feedback.average_rating) == i
+        ).scalar() or 0
+        
+        complaint_count = db.query(func.count(Complaint.id)).filter(
+            Complaint.restaurant_id == restaurant_id,
+            func.round(Complaint.average_rating) == i
+        ).scalar() or 0
+        
+        archived = archived_count(db, "feedbacks", restaurant_id, func.round(ArchiveRollup.value) == i) + archived_count(db, "complaints", restaurant_id, func.round(ArchiveRollup.value) == i)
+        
+        rating_distribution[f"{i} Yıldız"] = feedback_count + complaint_count + archived
+    
+    # Get satisfaction data (including complaints)
+    satisfaction_data = {
+        "Memnun (4-5)": (
+            db.query(func.count(Feedback.id)).filter(
+                Feedback.restaurant_id == restaurant_id,
+                Feedback.average_rating >= 4
+            ).scalar() or 0
+        ) + (
+            db.query(func.count(Complaint.id)).filter(
+                Complaint.restaurant_id == restaurant_id,
+                Complaint.average_rating >= 4
+            ).scalar() or 0
+        ) + (
+            archived_count(db, "feedbacks", restaurant_id, ArchiveRollup.value >= 4)
+            + archived_count(db, "complaints", restaurant_id, ArchiveRollup.value >= 4)
+        ),
+        "Orta (3)": (
+            db.query(func.count(Feedback.id)).filter(
+                Feedback.restaurant_id == restaurant_id,
+                Feedback.average_rating >= 3,
+                Feedback.average_rating < 4
+            ).scalar() or 0
+        ) + (
+            db.query(func.count(Complaint.id)).filter(
+                Complaint.restaurant_id == restaurant_id,
+                Complaint.average_rating >= 3,
+                Complaint.average_rating < 4
+            ).scalar() or 0
+        ) + (
+            archived_count(db, "feedbacks", restaurant_id, ArchiveRollup.value >= 3, ArchiveRollup.value < 4)
+            + archived_count(db, "complaints", restaurant_id, ArchiveRollup.value >= 3, ArchiveRollup.value < 4)
+        ),
+        "Memnun Değil (1-2)": (
+            db.query(func.count(Feedback.id)).filter(
+                Feedback.restaurant_id == restaurant_id,
+                Feedback.average_rating < 3
+            ).scalar() or 0
+        ) + (
+            db.query(func.count(Complaint.id)).filter(
+                Complaint.restaurant_id == restaurant_id,
+                Complaint.average_rating < 3
+            ).scalar() or 0
+        ) + (
+            archived_count(db, "feedbacks", restaurant_id, ArchiveRollup.value < 3)
+            + archived_count(db, "complaints", restaurant_id, ArchiveRollup.value < 3)
+        ),
+    }
+    
+    # Get recent comments (including complaints)
+    recent_feedbacks = db.query(Feedback).filter(Feedback.restaurant_id == restaurant_id).order_by(Feedback.created_at.desc()).limit(5).all()
+    recent_complaints = db.query(Complaint).filter(Complaint.restaurant_id == restaurant_id).order_by(Complaint.created_at.desc()).limit(5).all()
+    
+    # Combine and sort recent comments
+    recent_comments = []
+    for feedback in recent_feedbacks:
+        recent_comments.append({
+            "id": feedback.id,
+            "name": feedback.name,
+            "email": feedback.email,
+            "average_rating": feedback.average_rating,
+            "comment": feedback.comment,
+            "created_at": feedback.created_at
+        })
+    
+    for complaint in recent_complaints:
+        recent_comments.append({
+            "id": complaint.id,
+            "name": complaint.name,
+            "email": complaint.email,
+            "average_rating": complaint.average_rating,
+            "comment": complaint.comment,
+            "created_at": complaint.created_at
+        })
+    
+    # Sort by created_at and limit to 5
+    recent_comments = sorted(recent_comments, key=lambda x: x["created_at"], reverse=True)[:5]
+    
+    return {
+        "total_feedbacks": total_feedbacks,
+        "average_rating": round(avg_rating, 1) if avg_rating else 0,
+        "average_sentiment": average_sentiment,
+        "latest_feedback_date": latest_feedback_date,
+        "rating_distribution": rating_distribution,
+        "satisfaction_data": satisfaction_data,
+        "recent_comments": recent_comments,
+    }
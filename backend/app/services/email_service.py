@@ -3,13 +3,13 @@ from sqlalchemy.orm import Session
 from app.models.models import Feedback, Complaint, Restaurant, User
 from app.core.email import send_low_rating_notification
 from app.core.config import settings
-from datetime import datetime
+from datetime import datetime, timedelta
 from sqlalchemy import func
 
 # Logger yapılandırması
 logger = logging.getLogger("email_service")
 
-def process_low_rating_feedback(db: Session, feedback_id: int, feedback_type: str = "feedback"):
+def process_low_rating_feedback(db: Session, feedback_id: int, feedback_type: str = "feedback", trigger: str = "rating"):
     """
     Düşük puanlı yorumu işler ve bildirim e-postası gönderir
     
@@ -17,6 +17,7 @@ def process_low_rating_feedback(db: Session, feedback_id: int, feedback_type: st
         db: Veritabanı oturumu
         feedback_id: Yorum ID'si
         feedback_type: Yorum tipi ("feedback" veya "complaint")
+        trigger: Bildirimin nedeni; "rating" düşük puan, "sentiment" olumsuz yorum metni
     
     Returns:
         bool: İşlem başarılı ise True, değilse False
@@ -37,13 +38,13 @@ def process_low_rating_feedback(db: Session, feedback_id: int, feedback_type: st
             logger.error(f"{feedback_type.capitalize()} ID {feedback_id} bulunamadı.")
             return False
         
-        # Puan eşiğini kontrol et - Şikayetler için eşik kontrolü yapma, her zaman bildir
-        if feedback_type == "feedback" and feedback.average_rating > settings.LOW_RATING_THRESHOLD:
+        # Puan eşiğini kontrol et - Şikayetler ve olumsuz yorum metinleri için eşik kontrolü yapma, her zaman bildir
+        if feedback_type == "feedback" and trigger == "rating" and feedback.average_rating > settings.LOW_RATING_THRESHOLD:
             logger.info(f"{feedback_type.capitalize()} ID {feedback_id} düşük puanlı değil. Puan: {feedback.average_rating}")
             return False
         
         # Restoranı al
-        restaurant = db.query(Restaurant).filter(Restaurant.id == feedback.restaurant_id).first()
+        restaurant = db.query(Restaurant).filter(Restaurant.id == feedback.restaurant_id, Restaurant.deleted_at.is_(None)).first()
         if not restaurant:
             logger.error(f"Restoran ID {feedback.restaurant_id} bulunamadı.")
             return False
@@ -72,7 +73,9 @@ def process_low_rating_feedback(db: Session, feedback_id: int, feedback_type: st
             "created_at": feedback.created_at.strftime("%d.%m.%Y %H:%M") if feedback.created_at else "",
             "restaurant_id": feedback.restaurant_id,
             "restaurant_name": restaurant.name,
-            "type": feedback_type
+            "type": feedback_type,
+            "trigger": trigger,
+            "sentiment_score": feedback.sentiment_score
         }
         
         # AWS SES için doğrulanmış e-posta kullan
@@ -137,7 +140,7 @@ def process_all_low_ratings(db: Session, hours: int = 24):
     """
     try:
         # Son X saat içindeki düşük puanlı yorumları al
-        time_threshold = datetime.utcnow() - datetime.timedelta(hours=hours)
+        time_threshold = datetime.utcnow() - timedelta(hours=hours)
         
         # Feedbacks tablosundan düşük puanlı yorumları al
         low_rated_feedbacks = db.query(Feedback).filter(
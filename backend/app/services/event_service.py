@@ -0,0 +1,229 @@
+import asyncio
+import contextvars
+import json
+import logging
+from typing import Dict, Optional, Set
+import orjson
+from app.core.responses import ORJSON_OPTIONS
+from app.core.tracing import root_span
+from app.db.db import SessionLocal, engine
+from app.models.models import Complaint, Feedback
+from app.services.dashboard_service import dashboard_data
+from app.services.version_service import EVENTS_CHANNEL
+
+# Logger yapılandırması
+logger = logging.getLogger("events")
+
+# Art arda gelen değişiklikler tek bir dashboard hesaplamasında birleştirilir (saniye)
+DASHBOARD_REFRESH_DELAY = 1.0
+
+# LISTEN bağlantısı koparsa yeniden bağlanmadan önce beklenen süre (saniye)
+RECONNECT_DELAY = 5.0
+
+# Olay olmadığında proxy'lerin bağlantıyı kapatmaması için gönderilen yorum satırının aralığı (saniye)
+KEEPALIVE_INTERVAL = 15.0
+
+# Yavaş bir istemci için biriktirilen en fazla olay sayısı; dolunca yeni olaylar o istemciye atlanır
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Olaylardaki yorumlar bu uzunlukta kısaltılır; tam metin dashboard'dan okunur
+EVENT_COMMENT_MAX_LENGTH = 500
+
+COMMENT_MODELS = {"feedback": Feedback, "complaint": Complaint}
+
+def format_event(event: str, data) -> bytes:
+    """
+    Olayı Server-Sent Events biçiminde kodlar
+    """
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + orjson.dumps(data, option=ORJSON_OPTIONS) + b"\n\n"
+
+def load_dashboard(restaurant_id: int) -> dict:
+    """
+    Dashboard verisini kendi oturumuyla hesaplar (thread havuzunda çalıştırılır)
+    """
+    db = SessionLocal()
+    try:
+        return dashboard_data(db, restaurant_id)
+    finally:
+        db.close()
+
+def comment_event_data(item) -> dict:
+    """
+    Yeni geri bildirim veya şikayeti dashboard'daki son yorumlarla aynı şekilde olay verisine çevirir
+    """
+    comment = item.comment
+    if comment and len(comment) > EVENT_COMMENT_MAX_LENGTH:
+        comment = comment[:EVENT_COMMENT_MAX_LENGTH]
+    return {
+        "id": item.id,
+        "name": item.name,
+        "email": item.email,
+        "average_rating": item.average_rating,
+        "comment": comment,
+        "created_at": item.created_at.isoformat() if item.created_at else None,
+    }
+
+def load_comment_event(kind: str, item_id: int) -> Optional[dict]:
+    """
+    Olayı bildirilen geri bildirim veya şikayeti kendi oturumuyla okur (thread havuzunda çalıştırılır)
+    """
+    db = SessionLocal()
+    try:
+        item = db.get(COMMENT_MODELS[kind], item_id)
+        return comment_event_data(item) if item is not None else None
+    finally:
+        db.close()
+
+class EventHub:
+    """
+    Worker başına tek LISTEN bağlantısı açar ve gelen bildirimleri restoranın abonelerine dağıtır
+
+    Bağlantı ilk abone geldiğinde açılır ve event loop'a okuyucu olarak eklenir;
+    bildirim başına thread kullanılmaz. Yeni yorum olayları yalnızca ID taşır; yorum
+    yalnızca abonesi olan restoranlar için okunup iletilir. "changed" olaylarında
+    dashboard, restoranın o worker'daki tüm sekmeleri için bir kez hesaplanır.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = {}
+        self._refresh_tasks: Dict[int, asyncio.Task] = {}
+        self._connection = None
+        self._connect_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, restaurant_id: int) -> asyncio.Queue:
+        self._ensure_listening()
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(restaurant_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, restaurant_id: int, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(restaurant_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[restaurant_id]
+
+    def publish(self, restaurant_id: int, event: str, data):
+        for queue in self._subscribers.get(restaurant_id, ()):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                logger.warning(f"Restoran {restaurant_id} için olay kuyruğu dolu, {event} olayı atlandı.")
+
+    def close(self):
+        if self._connect_task is not None:
+            self._connect_task.cancel()
+            self._connect_task = None
+        for task in self._refresh_tasks.values():
+            task.cancel()
+        self._refresh_tasks.clear()
+        self._disconnect()
+
+    def _ensure_listening(self):
+        if self._connection is not None or self._connect_task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._connect_task = self._loop.create_task(self._connect())
+
+    def _open_connection(self):
+        pooled = engine.raw_connection()
+        connection = pooled.driver_connection
+        # Havuzdan ayrılır; bağlantı worker boyunca yalnızca LISTEN için kullanılır
+        pooled.detach()
+        connection.autocommit = True
+        with connection.cursor() as cursor:
+            cursor.execute(f"LISTEN {EVENTS_CHANNEL}")
+        return connection
+
+    async def _connect(self):
+        while True:
+            try:
+                connection = await self._loop.run_in_executor(None, self._open_connection)
+                break
+            except Exception as e:
+                logger.error(f"LISTEN bağlantısı açılamadı: {str(e)}")
+                await asyncio.sleep(RECONNECT_DELAY)
+        self._connection = connection
+        self._connect_task = None
+        self._loop.add_reader(connection.fileno(), self._on_readable)
+        logger.info(f"{EVENTS_CHANNEL} kanalı dinleniyor.")
+        # Bağlantı yokken kaçırılmış olabilecek değişiklikler için dashboard'lar yenilenir
+        for restaurant_id in list(self._subscribers):
+            self._schedule_refresh(restaurant_id)
+
+    def _disconnect(self):
+        if self._connection is None:
+            return
+        try:
+            self._loop.remove_reader(self._connection.fileno())
+        except Exception:
+            pass
+        try:
+            self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+
+    def _on_readable(self):
+        connection = self._connection
+        try:
+            connection.poll()
+        except Exception as e:
+            logger.error(f"LISTEN bağlantısı koptu: {str(e)}")
+            self._disconnect()
+            if self._subscribers:
+                self._ensure_listening()
+            return
+        while connection.notifies:
+            self._dispatch(connection.notifies.pop(0).payload)
+
+    def _dispatch(self, payload: str):
+        try:
+            message = json.loads(payload)
+            restaurant_id = message["restaurant_id"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Geçersiz olay yükü: {payload[:200]}")
+            return
+        if restaurant_id not in self._subscribers:
+            return
+        event = message.get("event")
+        if event == "changed":
+            self._schedule_refresh(restaurant_id)
+        elif event in COMMENT_MODELS and isinstance(message.get("data", {}).get("id"), int):
+            self._loop.create_task(self._publish_comment(restaurant_id, event, message["data"]["id"]))
+        else:
+            self.publish(restaurant_id, event, message.get("data"))
+
+    async def _publish_comment(self, restaurant_id: int, kind: str, item_id: int):
+        try:
+            data = await self._loop.run_in_executor(None, load_comment_event, kind, item_id)
+        except Exception as e:
+            logger.error(f"Restoran {restaurant_id} için {kind} {item_id} okunurken hata oluştu: {str(e)}")
+            return
+        if data is not None:
+            self.publish(restaurant_id, kind, data)
+
+    def _schedule_refresh(self, restaurant_id: int):
+        if restaurant_id in self._refresh_tasks:
+            return
+        self._refresh_tasks[restaurant_id] = self._loop.create_task(self._refresh(restaurant_id))
+
+    async def _refresh(self, restaurant_id: int):
+        await asyncio.sleep(DASHBOARD_REFRESH_DELAY)
+        # Hesaplama sırasında gelen değişiklikler yeni bir yenileme planlayabilsin diye önce kayıttan çıkarılır
+        self._refresh_tasks.pop(restaurant_id, None)
+        if restaurant_id not in self._subscribers:
+            return
+        try:
+            with root_span("dashboard.refresh", **{"restaurant.id": restaurant_id, "dashboard.subscribers": len(self._subscribers.get(restaurant_id, ()))}):
+                # run_in_executor context'i taşımaz; SQL span'ları bu span'ın altında kalsın diye kopyalanır
+                context = contextvars.copy_context()
+                data = await self._loop.run_in_executor(None, context.run, load_dashboard, restaurant_id)
+        except Exception as e:
+            logger.error(f"Restoran {restaurant_id} için dashboard hesaplanırken hata oluştu: {str(e)}")
+            return
+        self.publish(restaurant_id, "dashboard", data)
+
+event_hub = EventHub()
@@ -0,0 +1,145 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from sqlalchemy.orm import Query, Session
+from app.core.streaming import StreamBuffer
+from app.db.db import SessionLocal
+
+# Sunucu tarafı cursor'dan tek seferde çekilen ve istemciye tek parça olarak gönderilen satır sayısı
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+def parquet_available() -> bool:
+    """
+    Parquet çıktısı için gereken pyarrow paketinin kurulu olup olmadığını döner
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+def _csv_chunks(rows: Iterable, columns: List[str]) -> Iterator[bytes]:
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow([getattr(row, column) for column in columns])
+        count += 1
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield output.getvalue().encode("utf-8")
+            output.seek(0)
+            output.truncate(0)
+    yield output.getvalue().encode("utf-8")
+
+def _ndjson_chunks(rows: Iterable, columns: List[str]) -> Iterator[bytes]:
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({column: getattr(row, column) for column in columns}, default=_json_default, ensure_ascii=False))
+        if len(lines) == EXPORT_BATCH_SIZE:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+def parquet_schema(columns: List[str], column_types: Dict[str, str]):
+    """
+    Kolon tiplerinden ("int", "float", "str", "datetime") pyarrow şeması oluşturur
+    """
+    import pyarrow as pa
+
+    arrow_types = {
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "str": pa.string(),
+        "datetime": pa.timestamp("us", tz="UTC"),
+    }
+    return pa.schema([(column, arrow_types[column_types[column]]) for column in columns])
+
+def write_parquet_batches(rows: Iterable, columns: List[str], column_types: Dict[str, str], sink) -> Iterator[int]:
+    """
+    Satırları EXPORT_BATCH_SIZE'lık row group'lar halinde Parquet olarak yazar
+
+    Her row group yazıldıktan sonra yazılan satır sayısını yield eder; çağıran taraf
+    bu noktada hedefteki baytları gönderebilir. Dosyanın footer'ı yazıcı kapatılırken,
+    son yield'den sonra yazılır.
+
+    Args:
+        rows: Kolonları attribute olarak taşıyan satırlar
+        columns: Yazılacak kolonlar
+        column_types: Kolon tipleri
+        sink: Dosya yolu veya yazılabilir dosya benzeri nesne
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = parquet_schema(columns, column_types)
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+
+        def write_batch(batch):
+            writer.write_table(pa.Table.from_pydict(
+                {column: [getattr(row, column) for row in batch] for column in columns},
+                schema=schema,
+            ))
+
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == EXPORT_BATCH_SIZE:
+                write_batch(batch)
+                yield len(batch)
+                batch = []
+        if batch:
+            write_batch(batch)
+            yield len(batch)
+
+def _parquet_chunks(rows: Iterable, columns: List[str], column_types: Dict[str, str]) -> Iterator[bytes]:
+    buffer = StreamBuffer()
+    # Her row group ayrı bir parça olarak hemen gönderilir
+    for _ in write_parquet_batches(rows, columns, column_types, buffer):
+        yield buffer.drain()
+    yield buffer.drain()
+
+def stream_query(
+    build_query: Callable[[Session], Query],
+    columns: List[str],
+    export_format: str = "csv",
+    column_types: Optional[Dict[str, str]] = None,
+) -> Iterator[bytes]:
+    """
+    Sorgu sonucunu sabit bellekle CSV, NDJSON veya Parquet olarak parça parça üretir
+
+    Satırlar yield_per ile sunucu tarafı cursor üzerinden okunur, tüm sonuç hiçbir
+    zaman belleğe alınmaz. Yanıt akarken istek oturumu kapanmış olacağı için
+    kendi oturumunu açar.
+
+    Args:
+        build_query: Verilen oturumla dışa aktarılacak sorguyu oluşturan fonksiyon
+        columns: Çıktıya yazılacak kolonlar (sorgudaki etiketlerle aynı)
+        export_format: "csv", "ndjson" veya "parquet"
+        column_types: Parquet şeması için kolon tipleri ("int", "float", "str", "datetime")
+    """
+    db = SessionLocal()
+    try:
+        rows = build_query(db).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        if export_format == "csv":
+            yield from _csv_chunks(rows, columns)
+        elif export_format == "parquet":
+            yield from _parquet_chunks(rows, columns, column_types)
+        else:
+            yield from _ndjson_chunks(rows, columns)
+    finally:
+        db.close()
@@ -0,0 +1,156 @@
+import hashlib
+import io
+import threading
+import zipfile
+from collections import OrderedDict
+from typing import Iterator, Optional, Tuple
+from app.core.config import settings
+from app.core.streaming import StreamBuffer
+from app.db.db import SessionLocal
+from app.models.models import Restaurant
+
+QR_BORDER = 4
+
+MEDIA_TYPES = {
+    "png": "image/png",
+    "svg": "image/svg+xml",
+}
+
+class QRCodeCache:
+    """
+    Render edilmiş QR kodlarını bellekte tutan, toplam boyutu sınırlı LRU önbellek
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+            return item
+
+    def put(self, key: str, etag: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                return
+            self._items[key] = (etag, data)
+            self._size += len(data)
+            # En uzun süredir kullanılmayan kayıtları at
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self._size -= len(evicted)
+
+qrcode_cache = QRCodeCache(settings.QRCODE_CACHE_MAX_BYTES)
+
+def feedback_url(restaurant_id: int) -> str:
+    """
+    Restoranın QR kodunda kullanılan geri bildirim adresini döner
+    """
+    return f"{settings.FRONTEND_URL}/user-feedback?restaurant={restaurant_id}"
+
+def _svg(modules: list, size: int) -> bytes:
+    # viewBox modül biriminde olduğu için kod, kenar boşluğu dahil tam olarak size piksele ölçeklenir
+    count = len(modules) + 2 * QR_BORDER
+    path = []
+    for y, row in enumerate(modules):
+        x = 0
+        while x < len(row):
+            if not row[x]:
+                x += 1
+                continue
+            # Yan yana koyu modüller tek dikdörtgen olarak yazılır
+            run = 1
+            while x + run < len(row) and row[x + run]:
+                run += 1
+            path.append(f"M{x + QR_BORDER},{y + QR_BORDER}h{run}v1h-{run}z")
+            x += run
+    return (
+        "<?xml version='1.0' encoding='UTF-8'?>\n"
+        f'<svg width="{size}px" height="{size}px" version="1.1" viewBox="0 0 {count} {count}" '
+        f'shape-rendering="crispEdges" xmlns="http://www.w3.org/2000/svg">'
+        f'<path d="{"".join(path)}" fill="#000000"/></svg>'
+    ).encode("utf-8")
+
+def _render(url: str, size: int, image_format: str) -> bytes:
+    # qrcode ve Pillow uygulamanın açılışını yavaşlatmasın diye ilk render'da yüklenir
+    import qrcode
+    from PIL import Image
+
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_M, border=QR_BORDER)
+    qr.add_data(url)
+    qr.make(fit=True)
+    if image_format == "svg":
+        return _svg(qr.modules, size)
+
+    # Modüller eşit genişlikte kalsın diye tam sayı kutu boyutu kullanılır; artan pikseller
+    # kenar boşluğuna eklenir ve kod ortalanır
+    qr.box_size = max(1, size // (qr.modules_count + 2 * QR_BORDER))
+    code = qr.make_image().get_image().convert("L")
+    if code.size[0] > size:
+        # Kod 1 piksellik modüllerle bile sığmıyorsa küçültülür
+        code = code.resize((size, size), Image.NEAREST)
+    image = Image.new("L", (size, size), 255)
+    offset = (size - code.size[0]) // 2
+    image.paste(code, (offset, offset))
+
+    output = io.BytesIO()
+    image.save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+def render_qrcode(url: str, size: int, image_format: str = "png") -> Tuple[str, bytes]:
+    """
+    URL için QR kod görselini üretir, önbellekte varsa tekrar render etmez
+
+    Args:
+        url: QR koda yazılacak adres
+        size: Piksel cinsinden kenar uzunluğu
+        image_format: "png" veya "svg"
+
+    Returns:
+        Tuple[str, bytes]: Görselin içeriğinden türetilmiş güçlü ETag ve görsel baytları
+    """
+    key = hashlib.sha256(f"{image_format}:{size}:{url}".encode("utf-8")).hexdigest()
+    cached = qrcode_cache.get(key)
+    if cached is not None:
+        return cached
+
+    data = _render(url, size, image_format)
+    etag = f'"{hashlib.sha256(data).hexdigest()}"'
+    qrcode_cache.put(key, etag, data)
+    return etag, data
+
+def stream_qrcode_zip(size: int, image_format: str = "png") -> Iterator[bytes]:
+    """
+    Tüm restoranların QR kodlarını içeren ZIP arşivini parça parça üretir
+
+    Arşiv bellekte tutulmaz; her dosya yazıldıktan sonra biriken baytlar gönderilir.
+    Yanıt akarken istek oturumu kapanmış olacağı için kendi oturumunu açar.
+    """
+    buffer = StreamBuffer()
+    # PNG zaten sıkıştırılmış olduğu için tekrar sıkıştırmaya gerek yok
+    compression = zipfile.ZIP_STORED if image_format == "png" else zipfile.ZIP_DEFLATED
+
+    db = SessionLocal()
+    try:
+        restaurants = (
+            db.query(Restaurant.id, Restaurant.subdomain)
+            .filter(Restaurant.deleted_at.is_(None))
+            .order_by(Restaurant.id)
+            .execution_options(yield_per=500)
+        )
+        with zipfile.ZipFile(buffer, mode="w", compression=compression) as archive:
+            for restaurant in restaurants:
+                _, data = render_qrcode(feedback_url(restaurant.id), size, image_format)
+                archive.writestr(f"{restaurant.id}-{restaurant.subdomain}.{image_format}", data)
+                yield buffer.drain()
+        # Merkezi dizin kayıtları arşiv kapatılırken yazılır
+        yield buffer.drain()
+    finally:
+        db.close()
@@ -0,0 +1,148 @@
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from app.core.metrics import record_job
+from app.core.tracing import root_span
+from app.db.locks import advisory_lock
+from app.db.query_stats import track_queries
+from app.models.models import ScheduledJobStatus
+
+# Logger yapılandırması
+logger = logging.getLogger("scheduler")
+
+# Her worker süreci için benzersiz kimlik (kayıtlarda hangi worker'ın çalıştığını gösterir)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+# Zamanlayıcı tetiklemeleri arasındaki küçük kaymaları tolere etmek için pay
+RUN_INTERVAL_GRACE = timedelta(minutes=1)
+
+_scheduler = None
+
+def get_scheduler():
+    """
+    Worker'ın zamanlayıcısını ilk kullanımda oluşturur
+
+    apscheduler import'u uygulamanın açılışını yavaşlatmasın diye burada yapılır.
+    """
+    global _scheduler
+    if _scheduler is None:
+        from apscheduler.schedulers.background import BackgroundScheduler
+        _scheduler = BackgroundScheduler()
+    return _scheduler
+
+def shutdown_scheduler() -> bool:
+    """
+    Zamanlayıcı başlatıldıysa durdurur; durdurulduysa True döner
+    """
+    if _scheduler is None or not _scheduler.running:
+        return False
+    _scheduler.shutdown()
+    return True
+
+def _upsert_status(conn, job_id: str, values: dict, update: dict):
+    stmt = insert(ScheduledJobStatus).values(job_id=job_id, **values)
+    stmt = stmt.on_conflict_do_update(index_elements=[ScheduledJobStatus.job_id], set_=update)
+    conn.execute(stmt)
+    conn.commit()
+
+def _ran_recently(conn, job_id: str, min_interval: timedelta) -> bool:
+    last_started_at = conn.execute(
+        text("SELECT last_started_at FROM scheduled_job_status WHERE job_id = :job_id"),
+        {"job_id": job_id},
+    ).scalar()
+    conn.commit()
+    if last_started_at is None:
+        return False
+    return datetime.now(timezone.utc) - last_started_at < min_interval - RUN_INTERVAL_GRACE
+
+def run_exclusive(job_id: str, func: Callable[[], None], min_interval: Optional[timedelta] = None) -> bool:
+    """
+    Zamanlanmış bir işi küme genelinde yalnızca tek bir worker'da çalıştırır
+
+    Her worker kendi zamanlayıcısını çalıştırır; iş tetiklendiğinde pg_try_advisory_lock
+    ile iş başına kilit alınmaya çalışılır. Kilidi alamayan worker işi atlar. Kilit
+    oturum seviyesinde olduğu için worker ölürse bağlantıyla birlikte PostgreSQL
+    tarafından bırakılır ve bir sonraki tetiklemede başka bir worker işi devralır.
+
+    Args:
+        job_id: İş kimliği
+        func: Çalıştırılacak fonksiyon
+        min_interval: Verilirse, iş bu süre içinde başka bir worker'da başlatıldıysa atlanır
+
+    Returns:
+        bool: İş bu worker'da çalıştırıldıysa True, değilse False
+    """
+    with advisory_lock(f"scheduler:{job_id}") as (conn, acquired):
+        if not acquired:
+            logger.info(f"'{job_id}' işi başka bir worker'da çalışıyor, atlanıyor.")
+            return False
+
+        if min_interval is not None and _ran_recently(conn, job_id, min_interval):
+            logger.info(f"'{job_id}' işi yakın zamanda çalıştırıldı, atlanıyor.")
+            return False
+
+        started_at = datetime.now(timezone.utc)
+        _upsert_status(
+            conn,
+            job_id,
+            values={"last_started_at": started_at, "last_status": "running", "last_worker": WORKER_ID, "run_count": 1, "failure_count": 0},
+            update={
+                "last_started_at": started_at,
+                "last_status": "running",
+                "last_worker": WORKER_ID,
+                "run_count": ScheduledJobStatus.run_count + 1,
+            },
+        )
+
+        start = time.perf_counter()
+        error = None
+        try:
+            # Seyrek çalıştıkları için işler örnekleme oranından bağımsız izlenir
+            with root_span(f"job {job_id}", always_sample=True, **{"job.id": job_id, "job.worker": WORKER_ID}), track_queries(f"job:{job_id}"):
+                func()
+        except Exception as e:
+            error = str(e)
+            logger.error(f"'{job_id}' işi çalışırken hata oluştu: {error}")
+        duration_ms = (time.perf_counter() - start) * 1000
+        finished_at = datetime.now(timezone.utc)
+
+        if error is None:
+            update = {
+                "last_finished_at": finished_at,
+                "last_success_at": finished_at,
+                "last_duration_ms": duration_ms,
+                "last_status": "success",
+                "last_error": None,
+            }
+        else:
+            update = {
+                "last_finished_at": finished_at,
+                "last_duration_ms": duration_ms,
+                "last_status": "failed",
+                "last_error": error,
+                "failure_count": ScheduledJobStatus.failure_count + 1,
+            }
+        _upsert_status(conn, job_id, values={}, update=update)
+        record_job(job_id, update["last_status"], duration_ms / 1000)
+        logger.info(f"'{job_id}' işi {duration_ms:.0f} ms içinde tamamlandı ({update['last_status']}).")
+        return True
+
+def add_exclusive_job(func: Callable[[], None], job_id: str, interval: timedelta):
+    """
+    Zamanlayıcıya küme genelinde tek worker'da çalışacak periyodik bir iş ekler
+    """
+    from apscheduler.triggers.interval import IntervalTrigger
+    get_scheduler().add_job(
+        run_exclusive,
+        IntervalTrigger(seconds=interval.total_seconds()),
+        args=[job_id, func, interval],
+        id=job_id,
+        replace_existing=True,
+        coalesce=True,
+        max_instances=1,
+    )
@@ -0,0 +1,132 @@
+from datetime import datetime
+from typing import List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import Float, cast, func, literal, select, tuple_, union_all
+from sqlalchemy.orm import Session
+from app.core.pagination import decode_cursor
+from app.models.models import Complaint, Feedback
+
+# search_vector kolonlarını üreten metin arama yapılandırması ile aynı olmalı
+SEARCH_CONFIG = "turkish"
+
+# ts_headline eşleşmeleri önce yorumlarda bulunmayan kontrol karakterleriyle işaretler;
+# yorum HTML olarak kaçırıldıktan sonra bunlar <mark> etiketlerine çevrilir
+MARK_START = "\x02"
+MARK_STOP = "\x03"
+HEADLINE_OPTIONS = f"StartSel={MARK_START}, StopSel={MARK_STOP}, MaxFragments=2, MaxWords=20, MinWords=5"
+
+# & ilk sırada olmalı; sonraki değişimlerin ürettiği & karakterleri tekrar kaçırılmaz
+HTML_ESCAPES = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"), ('"', "&quot;"), ("'", "&#x27;"))
+
+SEARCH_SOURCES = {
+    "feedbacks": [(Feedback, "feedback")],
+    "complaints": [(Complaint, "complaint")],
+    "all": [(Feedback, "feedback"), (Complaint, "complaint")],
+}
+
+def _search_select(model, kind: str, restaurant_id: int, tsquery, start, end, min_rating, max_rating):
+    # ts_rank real döner; cursor'da birebir geri okunabilsin diye double'a çevrilir
+    rank = cast(func.ts_rank(model.search_vector, tsquery), Float)
+    stmt = select(
+        literal(kind).label("kind"),
+        model.id.label("id"),
+        model.name.label("name"),
+        model.food_rating.label("food_rating"),
+        model.service_rating.label("service_rating"),
+        model.atmosphere_rating.label("atmosphere_rating"),
+        model.average_rating.label("average_rating"),
+        model.comment.label("comment"),
+        model.created_at.label("created_at"),
+        rank.label("rank"),
+    ).where(
+        model.restaurant_id == restaurant_id,
+        model.search_vector.op("@@")(tsquery),
+    )
+    if start is not None:
+        stmt = stmt.where(model.created_at >= start)
+    if end is not None:
+        stmt = stmt.where(model.created_at < end)
+    if min_rating is not None:
+        stmt = stmt.where(model.average_rating >= min_rating)
+    if max_rating is not None:
+        stmt = stmt.where(model.average_rating <= max_rating)
+    return stmt
+
+def _highlight(comment, tsquery):
+    """
+    Yorumun eşleşen parçalarını HTML olarak kaçırıp eşleşmeleri <mark> ile işaretler
+
+    Yorumlar herkese açık formlardan gelir; ham metin HTML olarak render edilirse
+    XSS'e yol açar. Yorumda geçebilecek işaret karakterleri önce silinir.
+    """
+    text = func.translate(func.coalesce(comment, ""), MARK_START + MARK_STOP, "")
+    headline = func.ts_headline(SEARCH_CONFIG, text, tsquery, HEADLINE_OPTIONS)
+    for char, entity in HTML_ESCAPES:
+        headline = func.replace(headline, char, entity)
+    return func.replace(func.replace(headline, MARK_START, "<mark>"), MARK_STOP, "</mark>")
+
+def search_feedbacks(
+    db: Session,
+    restaurant_id: int,
+    q: str,
+    source: str = "all",
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    min_rating: Optional[float] = None,
+    max_rating: Optional[float] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+) -> List:
+    """
+    Restoranın geri bildirim ve şikayet yorumlarında tam metin arama yapar
+
+    Sorgu websearch_to_tsquery ile ayrıştırılır (tırnak, OR ve -kelime desteklenir),
+    eşleşmeler GIN indeksli search_vector kolonundan bulunur. Sonuçlar ilgiye, sonra
+    tarihe göre sıralanır; eşleşen kelimeler ts_headline ile işaretlenir
+    (highlight HTML olarak kaçırılmıştır, yalnızca <mark> etiketi içerir).
+
+    Args:
+        db: Veritabanı oturumu
+        restaurant_id: Restoran ID'si
+        q: Arama ifadesi
+        source: "feedbacks", "complaints" veya "all"
+        start: Bu tarih ve sonrası (dahil)
+        end: Bu tarihten öncesi (hariç)
+        min_rating: En düşük ortalama puan
+        max_rating: En yüksek ortalama puan
+        cursor: Önceki sayfanın son satırından üretilmiş cursor
+        limit: Sayfa boyutu
+
+    Returns:
+        List: kind, id, puanlar, comment, created_at, rank ve highlight alanlarını taşıyan satırlar
+    """
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    selects = [
+        _search_select(model, kind, restaurant_id, tsquery, start, end, min_rating, max_rating)
+        for model, kind in SEARCH_SOURCES[source]
+    ]
+    matches = (union_all(*selects) if len(selects) > 1 else selects[0]).subquery("matches")
+
+    # Vurgulama pahalı olduğu için yalnızca sayfadaki satırlar için hesaplanır
+    stmt = select(matches, _highlight(matches.c.comment, tsquery).label("highlight"))
+
+    if cursor:
+        rank, created_at, kind, last_id = decode_cursor(cursor, 4)
+        try:
+            created_at = datetime.fromisoformat(created_at)
+        except (TypeError, ValueError):
+            created_at = None
+        if created_at is None or not isinstance(rank, (int, float)) or not isinstance(kind, str) or not isinstance(last_id, int):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        stmt = stmt.where(
+            tuple_(matches.c.rank, matches.c.created_at, matches.c.kind, matches.c.id)
+            < tuple_(float(rank), created_at, kind, last_id)
+        )
+
+    stmt = stmt.order_by(
+        matches.c.rank.desc(),
+        matches.c.created_at.desc(),
+        matches.c.kind.desc(),
+        matches.c.id.desc(),
+    ).limit(limit)
+    return db.execute(stmt).all()
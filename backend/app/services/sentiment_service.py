@@ -0,0 +1,112 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.sentiment import score_comments
+from app.core.tracing import span
+from app.db.db import SessionLocal
+from app.models.models import Complaint, Feedback
+from app.services.email_service import process_low_rating_feedback
+from app.services.version_service import bump_restaurant_version
+
+# Logger yapılandırması
+logger = logging.getLogger("sentiment")
+
+# Tek transaction'da puanlanan yorum sayısı
+SENTIMENT_BATCH_SIZE = 2000
+
+# Process pool'a tek seferde gönderilen yorum sayısı
+SENTIMENT_CHUNK_SIZE = 250
+
+# Geriye dönük puanlamada eski yorumlar için bildirim gönderilmez
+SENTIMENT_ALERT_WINDOW = timedelta(hours=24)
+
+SENTIMENT_SOURCES = {
+    "feedback": Feedback,
+    "complaint": Complaint,
+}
+
+def _score(texts, executor):
+    chunks = [texts[i:i + SENTIMENT_CHUNK_SIZE] for i in range(0, len(texts), SENTIMENT_CHUNK_SIZE)]
+    if executor is None or len(chunks) == 1:
+        return score_comments(texts)
+    return [score for scores in executor.map(score_comments, chunks) for score in scores]
+
+def _process_batch(db: Session, feedback_type: str, last_id: int, executor) -> list:
+    model = SENTIMENT_SOURCES[feedback_type]
+    # ix_<tablo>_unscored kısmi indeksi yalnızca puanlanmamış yorumları içerir
+    rows = (
+        db.query(model.id, model.restaurant_id, model.comment, model.average_rating, model.created_at)
+        .filter(model.sentiment_score.is_(None), model.comment.isnot(None), model.id > last_id)
+        .order_by(model.id)
+        .limit(SENTIMENT_BATCH_SIZE)
+        .all()
+    )
+    if not rows:
+        return rows
+
+    with span("sentiment.score", **{"sentiment.source": feedback_type, "sentiment.comments": len(rows)}):
+        scores = _score([row.comment for row in rows], executor)
+    db.execute(
+        update(model),
+        [{"id": row.id, "sentiment_score": score} for row, score in zip(rows, scores)],
+    )
+    # Ortalama duygu puanı dashboard ve analizlerde gösterildiği için sürümler artırılır
+    for restaurant_id in sorted({row.restaurant_id for row in rows if row.restaurant_id is not None}):
+        bump_restaurant_version(db, restaurant_id)
+    db.commit()
+
+    # Şikayetler zaten her zaman bildirilir; puanı düşük olmayan fakat yorumu olumsuz geri bildirimler ayrıca bildirilir
+    if feedback_type == "feedback":
+        alert_since = datetime.now(timezone.utc) - SENTIMENT_ALERT_WINDOW
+        for row, score in zip(rows, scores):
+            # Dışarıdan (toplu) yüklenmiş satırlarda puan veya tarih boş olabilir; bunlar bildirilmez
+            if (
+                score <= settings.SENTIMENT_ALERT_THRESHOLD
+                and row.average_rating is not None
+                and row.average_rating > settings.LOW_RATING_THRESHOLD
+                and row.created_at is not None
+                and row.created_at >= alert_since
+            ):
+                process_low_rating_feedback(db, row.id, feedback_type, trigger="sentiment")
+    return rows
+
+def score_comment_sentiments():
+    """
+    Henüz puanlanmamış geri bildirim ve şikayet yorumlarının duygu puanını hesaplar
+
+    Yorumlar istek sırasında değil bu iş tarafından partiler halinde puanlanır; böylece
+    geri bildirim kaydı gecikmez. Birden fazla parça içeren partiler (ör. ilk kurulumdaki
+    geriye dönük puanlama) SENTIMENT_WORKERS süreçli bir havuza dağıtılır.
+    """
+    db = SessionLocal()
+    executor = None
+    try:
+        if settings.SENTIMENT_WORKERS > 1:
+            # Havuz yalnızca büyük partilerde kullanılır; spawn, çatallanan süreçlere
+            # veritabanı bağlantılarının kopyalanmasını engeller
+            executor = ProcessPoolExecutor(
+                max_workers=settings.SENTIMENT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        for feedback_type in SENTIMENT_SOURCES:
+            last_id = 0
+            scored = 0
+            while True:
+                rows = _process_batch(db, feedback_type, last_id, executor)
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                scored += len(rows)
+            if scored:
+                logger.info(f"{feedback_type}: {scored} yorumun duygu puanı hesaplandı.")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        db.close()
@@ -0,0 +1,146 @@
+import logging
+import time
+from datetime import datetime, timezone
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.db import SessionLocal
+from app.db.locks import advisory_lock
+from app.services.archive_service import remove_restaurant_archive
+from app.models.models import (
+    ArchiveRollup,
+    CommentTermFrequency,
+    Restaurant,
+    RestaurantDeletionJob,
+    RestaurantVersion,
+    User,
+    Feedback,
+    Complaint,
+    Platform,
+    RatingStatistics,
+    StarClick,
+    StarClickStatistics,
+)
+
+# Logger yapılandırması
+logger = logging.getLogger("tenant_deletion")
+
+# Restorana bağlı tablolar; restoran satırından önce bu sırayla temizlenir
+DEPENDENT_MODELS = [
+    StarClick,
+    StarClickStatistics,
+    RatingStatistics,
+    ArchiveRollup,
+    CommentTermFrequency,
+    RestaurantVersion,
+    Platform,
+    Feedback,
+    Complaint,
+    User,
+]
+
+def start_restaurant_deletion(db: Session, restaurant: Restaurant) -> RestaurantDeletionJob:
+    """
+    Restoranı hemen devre dışı bırakır ve silme işini kaydeder
+
+    deleted_at dolduğu anda public endpoint'ler restoranı göstermez, sahiplerin
+    hesapları pasife alınır. Bağlı verilerin silinmesi run_restaurant_deletion ile yapılır.
+    """
+    restaurant.deleted_at = datetime.now(timezone.utc)
+    db.query(User).filter(User.restaurant_id == restaurant.id).update({User.is_active: False}, synchronize_session=False)
+
+    job = RestaurantDeletionJob(restaurant_id=restaurant.id, status="pending", progress={})
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+def _delete_chunk(db: Session, model, restaurant_id: int, chunk_size: int) -> int:
+    ids = select(model.id).where(model.restaurant_id == restaurant_id).limit(chunk_size).scalar_subquery()
+    result = db.execute(
+        delete(model).where(model.id.in_(ids)),
+        execution_options={"synchronize_session": False},
+    )
+    return result.rowcount
+
+def run_restaurant_deletion(job_id: int) -> bool:
+    """
+    Restorana bağlı satırları tablo tablo, sınırlı boyutta parçalar halinde siler
+
+    Her parça ve ilerleme bilgisi kısa bir transaction'da commit edilir, böylece ortak
+    tablolarda uzun süreli kilit tutulmaz. Aynı iş iki worker'da aynı anda çalışmasın
+    diye advisory lock kullanılır; yarıda kalan iş kaldığı yerden devam eder.
+
+    Args:
+        job_id: Silme işinin ID'si
+
+    Returns:
+        bool: İş bu çağrıda tamamlandıysa True, değilse False
+    """
+    with advisory_lock(f"tenant_deletion:{job_id}") as (_, acquired):
+        if not acquired:
+            logger.info(f"Silme işi {job_id} başka bir worker'da çalışıyor.")
+            return False
+
+        db = SessionLocal()
+        try:
+            job = db.get(RestaurantDeletionJob, job_id)
+            if job is None or job.status == "completed":
+                return False
+
+            job.status = "running"
+            job.error = None
+            db.commit()
+
+            chunk_size = settings.TENANT_DELETE_CHUNK_SIZE
+            progress = dict(job.progress or {})
+            for model in DEPENDENT_MODELS:
+                table = model.__tablename__
+                while True:
+                    deleted = _delete_chunk(db, model, job.restaurant_id, chunk_size)
+                    progress[table] = progress.get(table, 0) + deleted
+                    job.progress = dict(progress)
+                    job.current_table = table
+                    db.commit()
+                    if deleted < chunk_size:
+                        break
+                    # Diğer sorgulara nefes aldırmak için parçalar arasında kısa bekle
+                    time.sleep(settings.TENANT_DELETE_CHUNK_PAUSE_SECONDS)
+
+            remove_restaurant_archive(job.restaurant_id)
+            db.query(Restaurant).filter(Restaurant.id == job.restaurant_id).delete(synchronize_session=False)
+            job.status = "completed"
+            job.current_table = None
+            job.finished_at = datetime.now(timezone.utc)
+            db.commit()
+            logger.info(f"Restoran {job.restaurant_id} silindi: {progress}")
+            return True
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Silme işi {job_id} sırasında hata oluştu: {str(e)}")
+            job = db.get(RestaurantDeletionJob, job_id)
+            if job is not None:
+                job.status = "failed"
+                job.error = str(e)
+                db.commit()
+            return False
+        finally:
+            db.close()
+
+def resume_restaurant_deletions():
+    """
+    Tamamlanmamış silme işlerini devam ettirir (örneğin işi yürüten worker ölmüşse)
+    """
+    db = SessionLocal()
+    try:
+        job_ids = [
+            job_id for (job_id,) in db.query(RestaurantDeletionJob.id).filter(
+                RestaurantDeletionJob.status.in_(["pending", "running", "failed"])
+            )
+        ]
+    finally:
+        db.close()
+
+    for job_id in job_ids:
+        run_restaurant_deletion(job_id)
@@ -0,0 +1,148 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.turkish_text import extract_terms
+from app.db.db import SessionLocal
+from app.models.models import CommentTermFrequency, Complaint, Feedback, ProcessingWatermark
+
+# Logger yapılandırması
+logger = logging.getLogger("topics")
+
+# Tek transaction'da işlenen yorum sayısı
+TOPIC_BATCH_SIZE = 500
+
+# Id'si alınmış fakat henüz commit edilmemiş satırları atlamamak için en yeni satırlar bir sonraki çalışmaya bırakılır
+TOPIC_LAG = timedelta(seconds=30)
+
+TOPIC_SOURCES = {
+    "feedbacks": Feedback,
+    "complaints": Complaint,
+}
+
+def _watermark(db: Session, name: str) -> int:
+    last_id = db.query(ProcessingWatermark.last_id).filter(ProcessingWatermark.name == name).scalar()
+    return last_id or 0
+
+def _set_watermark(db: Session, name: str, last_id: int):
+    stmt = insert(ProcessingWatermark).values(name=name, last_id=last_id)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ProcessingWatermark.name],
+        set_={"last_id": last_id, "updated_at": func.now()},
+    )
+    db.execute(stmt)
+
+def _process_batch(db: Session, source: str, last_id: int, until: datetime) -> Optional[int]:
+    model = TOPIC_SOURCES[source]
+    rows = (
+        db.query(model.id, model.restaurant_id, model.comment, model.created_at)
+        .filter(model.id > last_id, model.created_at < until)
+        .order_by(model.id)
+        .limit(TOPIC_BATCH_SIZE)
+        .all()
+    )
+    if not rows:
+        return None
+
+    counts = Counter()
+    labels = {}
+    for row in rows:
+        if row.restaurant_id is None or not row.comment:
+            continue
+        day = row.created_at.astimezone(timezone.utc).date()
+        # Aynı yorumda tekrar eden terim bir kez sayılır
+        for term, label in dict(extract_terms(row.comment)).items():
+            key = (row.restaurant_id, day, term)
+            counts[key] += 1
+            labels[key] = min(labels.get(key, label), label)
+
+    if counts:
+        values = [
+            {"restaurant_id": restaurant_id, "source": source, "day": day, "term": term, "label": labels[(restaurant_id, day, term)], "count": count}
+            for (restaurant_id, day, term), count in counts.items()
+        ]
+        stmt = insert(CommentTermFrequency).values(values)
+        stmt = stmt.on_conflict_do_update(
+            constraint="uq_comment_term_frequencies_bucket",
+            set_={
+                "count": CommentTermFrequency.count + stmt.excluded.count,
+                "label": func.least(CommentTermFrequency.label, stmt.excluded.label),
+            },
+        )
+        db.execute(stmt)
+
+    # Sayılar ve watermark aynı transaction'da; bir parti ya tamamen işlenir ya hiç işlenmez
+    _set_watermark(db, f"topics:{source}", rows[-1].id)
+    db.commit()
+    return rows[-1].id
+
+def extract_comment_topics():
+    """
+    Son çalışmadan bu yana eklenen yorumlardan günlük terim sayılarını günceller
+
+    Her tablo için işlenen son satırın ID'si processing_watermarks tablosunda tutulur;
+    yalnızca bu ID'den sonraki yorumlar partiler halinde okunur, köklerine ayrılır
+    ve comment_term_frequencies tablosundaki sayıların üzerine eklenir.
+    """
+    db = SessionLocal()
+    try:
+        until = datetime.now(timezone.utc) - TOPIC_LAG
+        for source in TOPIC_SOURCES:
+            last_id = _watermark(db, f"topics:{source}")
+            processed = 0
+            while True:
+                next_id = _process_batch(db, source, last_id, until)
+                if next_id is None:
+                    break
+                last_id = next_id
+                processed += 1
+            if processed:
+                logger.info(f"{source}: {processed} parti yorum işlendi, son ID {last_id}.")
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def top_topics(
+    db: Session,
+    restaurant_id: int,
+    days: int = 7,
+    source: str = "complaints",
+    ngram: Optional[int] = None,
+    limit: int = 10,
+) -> List:
+    """
+    Restoranın son günlerdeki en sık geçen konularını döner
+
+    Args:
+        db: Veritabanı oturumu
+        restaurant_id: Restoran ID'si
+        days: Bugün dahil kaç günlük pencere
+        source: "feedbacks", "complaints" veya "all"
+        ngram: 1 ise tek kelimeler, 2 ise iki kelimelik ifadeler, None ise ikisi birden
+        limit: Dönecek konu sayısı
+
+    Returns:
+        List: term, label ve count alanlarını taşıyan satırlar
+    """
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    sources = list(TOPIC_SOURCES) if source == "all" else [source]
+    total = func.sum(CommentTermFrequency.count)
+    query = db.query(
+        CommentTermFrequency.term,
+        func.min(CommentTermFrequency.label).label("label"),
+        total.label("count"),
+    ).filter(
+        CommentTermFrequency.restaurant_id == restaurant_id,
+        CommentTermFrequency.source.in_(sources),
+        CommentTermFrequency.day >= since,
+    )
+    if ngram == 1:
+        query = query.filter(~CommentTermFrequency.term.contains(" "))
+    elif ngram == 2:
+        query = query.filter(CommentTermFrequency.term.contains(" "))
+    return query.group_by(CommentTermFrequency.term).order_by(total.desc(), CommentTermFrequency.term).limit(limit).all()
@@ -0,0 +1,180 @@
+import atexit
+import hashlib
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Iterable, Optional
+from sqlalchemy import func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.db import SessionLocal
+from app.models.models import Restaurant, RestaurantVersion
+
+# Logger yapılandırması
+logger = logging.getLogger("versions")
+
+# Public restoran endpoint'leri CDN ve tarayıcı önbelleğinde kısa süre tutulabilir
+PUBLIC_CACHE_CONTROL = f"public, max-age={settings.PUBLIC_CACHE_MAX_AGE}"
+
+# Sahip paneli her istekte yeniden doğrular; değişiklik yoksa 304 döner
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+# Restoran olaylarının yayınlandığı NOTIFY kanalı
+EVENTS_CHANNEL = "restaurant_events"
+
+def notify_restaurant_event(db: Session, restaurant_id: int, event: str, data: Optional[dict] = None):
+    """
+    Restoran olayını NOTIFY ile yayınlar
+
+    Yazma işlemiyle aynı transaction'da çağrılmalıdır; PostgreSQL bildirimi yalnızca
+    commit edildiğinde dinleyicilere iletir, rollback olursa olay hiç görünmez.
+    Payload 8000 baytla sınırlıdır; olaylar yalnızca kimlik ve sayı taşır, kullanıcı
+    girdisi taşımaz.
+    """
+    payload = json.dumps({"restaurant_id": restaurant_id, "event": event, "data": data or {}}, ensure_ascii=False)
+    db.execute(select(func.pg_notify(EVENTS_CHANNEL, payload)))
+
+def _increment_versions(db: Session, restaurant_ids: Iterable[int]):
+    """
+    Restoranların sürüm sayaçlarını tek ifadeyle artırır ve "changed" olaylarını yayınlar
+
+    Satırlar restoran ID sırasıyla kilitlenir; aynı anda çalışan worker'lar kilitleri
+    aynı sırada aldığı için birbirini kilitlemez. Silinmiş restoranlar atlanır.
+    """
+    stmt = insert(RestaurantVersion).from_select(
+        ["restaurant_id", "version"],
+        select(Restaurant.id, literal(1)).where(Restaurant.id.in_(list(restaurant_ids))).order_by(Restaurant.id),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RestaurantVersion.restaurant_id],
+        set_={"version": RestaurantVersion.version + 1, "updated_at": func.now()},
+    ).returning(RestaurantVersion.restaurant_id, RestaurantVersion.version)
+    for restaurant_id, version in db.execute(stmt).all():
+        notify_restaurant_event(db, restaurant_id, "changed", {"version": version})
+
+def bump_restaurant_version(db: Session, restaurant_id: int):
+    """
+    Restoranın sürüm sayacını artırır
+
+    Yazma işlemiyle aynı transaction'da çağrılmalıdır; commit çağırana bırakılır.
+    Böylece yeni sürüm ve canlı dashboard'lara giden "changed" olayı yalnızca veri
+    değişikliğiyle birlikte görünür olur. Sahip ve admin işlemleri ile arka plan
+    işleri içindir; müşterilerin sık yazmaları restaurant_changes kullanır.
+    """
+    _increment_versions(db, [restaurant_id])
+
+class RestaurantChangePublisher:
+    """
+    Müşteri yazmalarından sonra restoran sürümlerini ve olaylarını arka plan thread'inde partiler halinde yayınlar
+
+    Geri bildirim, şikayet ve yıldız tıklamaları restoran başına tek sürüm satırını
+    istek içinde güncellerse yoğun bir restoranın yazmaları o satırın kilidinde
+    sıraya girer. Bunun yerine istek commit'ten sonra restoran ID'sini (yeni yorum
+    için ayrıca yorumun ID'sini) kuyruğa bırakır; VERSION_FLUSH_INTERVAL_SECONDS
+    içinde birikenler tek transaction'da yayınlanır. Sürüm veri commit edildikten
+    sonra arttığı için ETag hiçbir zaman eski veriyle yeni sürümü eşleştirmez; en
+    fazla bu süre kadar geç değişir. Yayınlama hatası müşterinin yazmasını geri almaz.
+    """
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    def restaurant_changed(self, restaurant_id: int):
+        self._put(restaurant_id)
+
+    def comment_added(self, restaurant_id: int, kind: str, item_id: int):
+        """
+        Yeni geri bildirim ("feedback") veya şikayeti ("complaint") canlı dashboard'lara bildirir
+
+        Olay yalnızca ID taşır; yorumu abonesi olan worker'lar okur.
+        """
+        self._put((restaurant_id, kind, item_id))
+
+    def _put(self, item):
+        self._queue.put(item)
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="restaurant-versions", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            restaurant_ids = set()
+            comments = []
+            flushes = []
+            item = self._queue.get()
+            deadline = time.monotonic() + settings.VERSION_FLUSH_INTERVAL_SECONDS
+            while True:
+                if isinstance(item, threading.Event):
+                    flushes.append(item)
+                    break
+                if isinstance(item, tuple):
+                    comments.append(item)
+                    restaurant_ids.add(item[0])
+                else:
+                    restaurant_ids.add(item)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if restaurant_ids:
+                self._publish(restaurant_ids, comments)
+            for flushed in flushes:
+                flushed.set()
+
+    def flush(self, timeout: float = 5.0):
+        """
+        O ana kadar kuyruğa bırakılan değişiklikler yayınlanana kadar bekler
+        """
+        if self._thread is None:
+            return
+        flushed = threading.Event()
+        self._queue.put(flushed)
+        flushed.wait(timeout)
+
+    def _publish(self, restaurant_ids: set, comments: list):
+        db = SessionLocal()
+        try:
+            # Yorum olayları, ardından gelecek dashboard yenilemesinden önce iletilir
+            for restaurant_id, kind, item_id in comments:
+                notify_restaurant_event(db, restaurant_id, kind, {"id": item_id})
+            _increment_versions(db, sorted(restaurant_ids))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"{len(restaurant_ids)} restoranın sürümü artırılamadı: {str(e)}")
+        finally:
+            db.close()
+
+restaurant_changes = RestaurantChangePublisher()
+
+def restaurant_etag(db: Session, restaurant_id: int, scope: str) -> str:
+    """
+    Restoranın güncel sürümünden bir endpoint için ETag üretir
+
+    Args:
+        db: Veritabanı oturumu
+        restaurant_id: Restoran ID'si
+        scope: Endpoint'i ayırt eden ad (ör. "dashboard"); aynı sürümün farklı yanıtları karışmasın diye
+
+    Returns:
+        str: Tırnak içinde ETag değeri
+    """
+    version = db.query(RestaurantVersion.version).filter(RestaurantVersion.restaurant_id == restaurant_id).scalar() or 0
+    # Sürüm numarası doğrudan gösterilmez; uygulama sürümü değişince yanıt şekli de değişebileceği için dahil edilir
+    key = f"{settings.PROJECT_VERSION}:{scope}:{restaurant_id}:{version}"
+    return f'"{hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]}"'
@@ -0,0 +1,85 @@
+"""
+Kimlik doğrulama yolunun mikro benchmark'ı: JWT üretme/çözme ve bcrypt hash/doğrulama
+
+create_access_token, decode_access_token (get_current_user'ın token çözme adımı),
+get_password_hash ve verify_password mevcut ayarlarla ölçülür. bcrypt doğrulaması
+ayrıca --rounds ile verilen maliyetlerde ve --threads eşzamanlılıkta çalıştırılır;
+BCRYPT_ROUNDS seçiminin giriş gecikmesine ve bir worker'ın saniyede doğrulayabileceği
+giriş sayısına etkisi görülür (bcrypt hesaplarken GIL'i bırakır).
+
+Veritabanı gerektirmez.
+
+Kullanım (backend dizininden):
+    python -m benchmarks.auth [--repeat 5000] [--bcrypt-repeat 10] [--rounds 10,11,12,13] [--threads 1,4]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List
+from app.core.auth import create_access_token, decode_access_token, get_password_hash, get_pwd_context, verify_password
+from app.core.config import settings
+
+PASSWORD = "benchmark-sifre-123"
+
+def _timings(func: Callable, repeat: int) -> List[float]:
+    func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+def _print_row(name: str, timings: List[float]):
+    mean = sum(timings) / len(timings)
+    print(
+        f"{name:<34}{len(timings):>8}{mean:>10.3f}{_percentile(timings, 50):>10.3f}"
+        f"{_percentile(timings, 95):>10.3f}{1000 / mean:>12,.0f}"
+    )
+
+def _throughput(func: Callable, calls: int, threads: int) -> float:
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        start = time.perf_counter()
+        list(executor.map(lambda _: func(), range(calls)))
+        return calls / (time.perf_counter() - start)
+
+def run(repeat: int, bcrypt_repeat: int, rounds: List[int], threads: List[int]):
+    token = create_access_token(data={"sub": "sahip@example.com", "role": "restaurant_owner", "restaurant_id": 1})
+    hashed = get_password_hash(PASSWORD)
+
+    print(f"Mevcut ayarlar: {settings.ALGORITHM}, BCRYPT_ROUNDS={settings.BCRYPT_ROUNDS}, {os.cpu_count()} çekirdek (ms / çağrı)")
+    print(f"{'işlem':<34}{'tekrar':>8}{'ort':>10}{'p50':>10}{'p95':>10}{'çağrı/sn':>12}")
+    _print_row("create_access_token", _timings(
+        lambda: create_access_token(data={"sub": "sahip@example.com", "role": "restaurant_owner", "restaurant_id": 1}),
+        repeat,
+    ))
+    _print_row("decode_access_token", _timings(lambda: decode_access_token(token), repeat))
+    _print_row("get_password_hash", _timings(lambda: get_password_hash(PASSWORD), bcrypt_repeat))
+    _print_row("verify_password", _timings(lambda: verify_password(PASSWORD, hashed), bcrypt_repeat))
+
+    print("\nbcrypt doğrulama maliyeti (ms / doğrulama ve thread sayısına göre doğrulama/sn)")
+    print(f"{'rounds':<10}{'ort ms':>10}" + "".join(f"{f'{count} thread':>14}" for count in threads))
+    for cost in rounds:
+        context = get_pwd_context().copy(bcrypt__default_rounds=cost, bcrypt__min_rounds=cost, bcrypt__max_rounds=cost)
+        cost_hash = context.hash(PASSWORD)
+        verify = lambda: context.verify(PASSWORD, cost_hash)
+        timings = _timings(verify, bcrypt_repeat)
+        rates = [_throughput(verify, bcrypt_repeat * count, count) for count in threads]
+        print(f"{cost:<10}{sum(timings) / len(timings):>10.1f}" + "".join(f"{rate:>14.1f}" for rate in rates))
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",")]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5000, help="JWT işlemleri için tekrar sayısı")
+    parser.add_argument("--bcrypt-repeat", type=int, default=10, help="bcrypt işlemleri için tekrar sayısı")
+    parser.add_argument("--rounds", type=_int_list, default=[10, 11, 12, 13])
+    parser.add_argument("--threads", type=_int_list, default=sorted({1, os.cpu_count() or 1}))
+    args = parser.parse_args()
+    run(args.repeat, args.bcrypt_repeat, args.rounds, args.threads)
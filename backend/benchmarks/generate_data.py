@@ -0,0 +1,279 @@
+"""
+Ölçek testleri için restoran, geri bildirim, şikayet ve yıldız tıklaması verisini COPY ile toplu yükler
+
+Kayıtlar restoranlara Zipf dağılımıyla paylaştırılır: birkaç çok büyük restoran
+ve uzun bir küçük restoran kuyruğu oluşur (--skew üssü büyüdükçe dağılım daha
+çarpık olur). Satırlar parçalar halinde CSV olarak üretilip COPY ... FROM STDIN
+ile yazılır; ORM ve tek tek INSERT kullanılmaz. Yükleme sonunda VACUUM ANALYZE çalışır.
+
+Yorumlar sabit bir ifade havuzundan üretilir ve duygu puanları yüklemede yazılır;
+arka plandaki puanlama işinde birikme oluşmaz. Yıldız tıklama istatistikleri de
+üretilen tıklamalarla tutarlı doldurulur. Kayıt tarihleri son --days güne,
+yakın tarihlere yoğunlaşacak şekilde dağılır.
+
+Her restoran için owner-<sıra>@<önek>.example.com adresli ve --owner-password şifreli bir
+sahip oluşturulur; sıra 1 en büyük restorandır. Alt alan adları <önek>-<sıra>
+biçimindedir; aynı önekle tekrar çalıştırmak hata verir.
+
+Kullanım (backend dizininden):
+    python -m benchmarks.generate_data --restaurants 1000 --feedbacks 2000000 --complaints 200000 --star-clicks 5000000
+    python -m benchmarks.generate_data --restaurants 50 --feedbacks 100000 --skew 1.3 --prefix small
+"""
+import argparse
+import csv
+import io
+import itertools
+import random
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, List
+from app.core.auth import get_password_hash
+from app.core.sentiment import score_comments
+from app.db.db import engine
+from app.models.models import UserRole
+
+# Tek COPY parçasındaki satır sayısı
+DEFAULT_CHUNK_ROWS = 100_000
+
+# search_vector üretilmiş kolondur ve id sequence'ten gelir; COPY listesinde yer almaz
+FEEDBACK_COLUMNS = (
+    "name", "email", "phone", "food_rating", "service_rating", "atmosphere_rating",
+    "average_rating", "comment", "sentiment_score", "restaurant_id", "created_at",
+)
+
+POSITIVE_PHRASES = [
+    "Yemekler çok lezzetliydi", "Servis hızlıydı", "Garsonlar çok ilgiliydi", "Ortam çok güzeldi",
+    "Tatlılar harikaydı", "Porsiyonlar doyurucuydu", "Fiyatlar uygundu", "Kahvaltı mükemmeldi",
+    "Izgara tam kıvamındaydı", "Mekan tertemizdi",
+]
+NEGATIVE_PHRASES = [
+    "Yemek soğuk geldi", "Servis çok yavaştı", "Garson ilgisizdi", "Siparişimiz unutuldu",
+    "Masa kirliydi", "Fiyatlar çok pahalıydı", "Et çiğ kalmıştı", "Yarım saat bekledik",
+    "Hesap yanlış geldi", "Ortam çok gürültülüydü",
+]
+CLOSINGS = ["", " Teşekkürler!", " Tekrar geleceğiz.", " Bir daha gelmeyiz.", " Tavsiye ederim."]
+
+FIRST_NAMES = ["Ahmet", "Ayşe", "Mehmet", "Fatma", "Mustafa", "Zeynep", "Emre", "Elif", "Can", "Selin"]
+LAST_NAMES = ["Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Aydın", "Öztürk", "Arslan", "Doğan"]
+
+# Yıldız tıklamaları çoğunlukla 5 yıldıza yığılır
+STAR_WEIGHTS = (6, 4, 8, 22, 60)
+
+class CommentPool:
+    """
+    Ruh haline göre gruplanmış yorumlar ve önceden hesaplanmış duygu puanları
+    """
+
+    def __init__(self):
+        positive = [f"{a}, {b.lower()}.{c}" for a, b, c in itertools.product(POSITIVE_PHRASES, POSITIVE_PHRASES, CLOSINGS) if a != b]
+        negative = [f"{a}, {b.lower()}.{c}" for a, b, c in itertools.product(NEGATIVE_PHRASES, NEGATIVE_PHRASES, CLOSINGS) if a != b]
+        mixed = [f"{a}, ama {b.lower()}.{c}" for a, b, c in itertools.product(POSITIVE_PHRASES, NEGATIVE_PHRASES, CLOSINGS)]
+        self.groups = {"positive": positive, "negative": negative, "mixed": mixed}
+        all_comments = positive + negative + mixed
+        self.scores = dict(zip(all_comments, score_comments(all_comments)))
+
+    def pick(self, rng: random.Random, base_rating: int) -> str:
+        if base_rating >= 4:
+            group = self.groups["positive"]
+        elif base_rating == 3:
+            group = self.groups["mixed"]
+        else:
+            group = self.groups["negative"]
+        return rng.choice(group)
+
+class DataGenerator:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.now = datetime.now(timezone.utc)
+        self.span_seconds = args.days * 86400
+        self.restaurant_ids: List[int] = []
+        self.cum_weights: List[float] = []
+        self.comments = CommentPool()
+
+    def _timestamp(self) -> str:
+        # Karesi alınan uniform değer kayıtları yakın tarihlere yoğunlaştırır
+        seconds = self.span_seconds * self.rng.random() ** 2
+        return (self.now - timedelta(seconds=seconds)).isoformat()
+
+    def _tenants(self, count: int) -> List[int]:
+        return self.rng.choices(self.restaurant_ids, cum_weights=self.cum_weights, k=count)
+
+    def _copy(self, conn, table: str, columns, rows: Iterator[tuple], total: int) -> float:
+        """
+        Satırları parçalar halinde CSV'ye yazıp COPY ile yükler; geçen süreyi döner
+        """
+        started = time.perf_counter()
+        sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+        written = 0
+        cursor = conn.cursor()
+        while written < total:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            # csv modülü None'ı boş alana yazar; COPY csv biçiminde tırnaksız boş alan NULL'dur
+            writer.writerows(itertools.islice(rows, self.args.chunk_rows))
+            size = min(self.args.chunk_rows, total - written)
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            written += size
+            print(f"  {table}: {written}/{total}", end="\r", flush=True)
+        cursor.close()
+        conn.commit()
+        elapsed = time.perf_counter() - started
+        print(f"  {table}: {total} satır, {elapsed:.1f} sn ({total / elapsed if elapsed else 0:,.0f} satır/sn)")
+        return elapsed
+
+    def load_restaurants(self, conn):
+        count = self.args.restaurants
+        prefix = self.args.prefix
+        created_at = self.now - timedelta(days=self.args.days)
+        self._copy(
+            conn, "restaurants", ("name", "subdomain", "created_at"),
+            ((f"Restoran {prefix} {rank}", f"{prefix}-{rank}", created_at.isoformat()) for rank in range(1, count + 1)),
+            count,
+        )
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT id, subdomain FROM restaurants WHERE subdomain LIKE %s", (f"{prefix}-%",))
+        ids_by_rank = {int(subdomain.rsplit("-", 1)[1]): restaurant_id for restaurant_id, subdomain in cursor.fetchall()}
+        cursor.close()
+        self.restaurant_ids = [ids_by_rank[rank] for rank in range(1, count + 1)]
+        # Zipf: rank sıradaki restoranın ağırlığı 1 / rank^skew
+        self.cum_weights = list(itertools.accumulate(1 / rank ** self.args.skew for rank in range(1, count + 1)))
+
+        # Tüm sahipler aynı şifreyi paylaştığı için bcrypt bir kez çalışır
+        hashed_password = get_password_hash(self.args.owner_password)
+        self._copy(
+            conn, "users", ("email", "hashed_password", "role", "is_active", "restaurant_id"),
+            (
+                (f"owner-{rank}@{prefix}.example.com", hashed_password, UserRole.RESTAURANT_OWNER.value, True, restaurant_id)
+                for rank, restaurant_id in enumerate(self.restaurant_ids, start=1)
+            ),
+            count,
+        )
+
+    def _rating_rows(self, total: int, base_weights: tuple, comment_rate: float) -> Iterator[tuple]:
+        rng = self.rng
+        scores = self.comments.scores
+        produced = 0
+        while produced < total:
+            size = min(self.args.chunk_rows, total - produced)
+            tenants = self._tenants(size)
+            bases = rng.choices((1, 2, 3, 4, 5), weights=base_weights, k=size)
+            for restaurant_id, base in zip(tenants, bases):
+                ratings = [min(5, max(1, base + rng.choice((-1, 0, 0, 1)))) for _ in range(3)]
+                name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+                comment = self.comments.pick(rng, base) if rng.random() < comment_rate else None
+                yield (
+                    name,
+                    f"musteri{rng.randrange(1_000_000)}@example.com",
+                    f"05{rng.randrange(10**9):09d}",
+                    ratings[0],
+                    ratings[1],
+                    ratings[2],
+                    round(sum(ratings) / 3, 1),
+                    comment,
+                    scores[comment] if comment is not None else None,
+                    restaurant_id,
+                    self._timestamp(),
+                )
+            produced += size
+
+    def load_feedbacks(self, conn):
+        if self.args.feedbacks:
+            rows = self._rating_rows(self.args.feedbacks, (8, 6, 12, 30, 44), comment_rate=0.6)
+            self._copy(conn, "feedbacks", FEEDBACK_COLUMNS, rows, self.args.feedbacks)
+        if self.args.complaints:
+            # Şikayetlerde yorum zorunludur ve puanlar düşüğe yığılır
+            rows = self._rating_rows(self.args.complaints, (45, 30, 15, 7, 3), comment_rate=1.0)
+            self._copy(conn, "complaints", FEEDBACK_COLUMNS, rows, self.args.complaints)
+
+    def load_star_clicks(self, conn):
+        total = self.args.star_clicks
+        if not total:
+            return
+        counts = Counter()
+
+        def rows() -> Iterator[tuple]:
+            produced = 0
+            while produced < total:
+                size = min(self.args.chunk_rows, total - produced)
+                stars = self.rng.choices((1, 2, 3, 4, 5), weights=STAR_WEIGHTS, k=size)
+                for restaurant_id, star_value in zip(self._tenants(size), stars):
+                    counts[(restaurant_id, star_value)] += 1
+                    yield restaurant_id, star_value, self._timestamp()
+                produced += size
+
+        self._copy(conn, "star_clicks", ("restaurant_id", "star_value", "created_at"), rows(), total)
+        now = self.now.isoformat()
+        self._copy(
+            conn, "star_click_statistics", ("restaurant_id", "star_value", "count", "created_at", "updated_at"),
+            ((restaurant_id, star_value, count, now, now) for (restaurant_id, star_value), count in sorted(counts.items())),
+            len(counts),
+        )
+
+    def analyze(self, conn):
+        # VACUUM görünürlük haritasını da doldurur; index-only scan'ler yeni yüklenen tablolarda da seçilebilir.
+        # VACUUM transaction içinde çalışamaz
+        conn.driver_connection.autocommit = True
+        cursor = conn.cursor()
+        for table in ("restaurants", "users", "feedbacks", "complaints", "star_clicks", "star_click_statistics"):
+            cursor.execute(f"VACUUM ANALYZE {table}")
+        cursor.close()
+        conn.driver_connection.autocommit = False
+
+    def summary(self, conn):
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT r.subdomain, count(f.id) FROM restaurants r LEFT JOIN feedbacks f ON f.restaurant_id = r.id "
+            "WHERE r.subdomain LIKE %s GROUP BY r.id, r.subdomain ORDER BY count(f.id) DESC",
+            (f"{self.args.prefix}-%",),
+        )
+        counts = cursor.fetchall()
+        cursor.close()
+        if not counts or not self.args.feedbacks:
+            return
+        top = sum(count for _, count in counts[:max(1, len(counts) // 100)])
+        print(
+            f"\nGeri bildirim dağılımı: en büyük {counts[0][0]} ({counts[0][1]}), "
+            f"medyan {counts[len(counts) // 2][1]}, en küçük {counts[-1][1]}; "
+            f"restoranların ilk %1'i toplamın %{top * 100 / self.args.feedbacks:.1f}'ini tutuyor"
+        )
+
+def _run(steps: List[Callable]):
+    conn = engine.raw_connection()
+    try:
+        for step in steps:
+            step(conn)
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--restaurants", type=int, default=1000)
+    parser.add_argument("--feedbacks", type=int, default=1_000_000)
+    parser.add_argument("--complaints", type=int, default=100_000)
+    parser.add_argument("--star-clicks", type=int, default=2_000_000)
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf üssü; 0 eşit dağılım, büyüdükçe daha çarpık")
+    parser.add_argument("--days", type=int, default=365, help="Kayıtların yayıldığı gün sayısı")
+    parser.add_argument("--prefix", default="scale", help="Alt alan adı ve sahip e-postası öneki")
+    parser.add_argument("--owner-password", default="scale-test")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Tek COPY parçasındaki satır sayısı")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    generator = DataGenerator(args)
+    print(f"{args.restaurants} restoran, {args.feedbacks} geri bildirim, {args.complaints} şikayet, {args.star_clicks} yıldız tıklaması yükleniyor")
+    _run([
+        generator.load_restaurants,
+        generator.load_feedbacks,
+        generator.load_star_clicks,
+        generator.analyze,
+        generator.summary,
+    ])
+    print(f"Toplam süre: {time.perf_counter() - started:.1f} sn")
+
+if __name__ == "__main__":
+    main()
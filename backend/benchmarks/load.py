@@ -0,0 +1,345 @@
+"""
+Public, restoran sahibi ve admin endpoint'leri için tekrarlanabilir yük testi
+
+Gerçekçi bir karışım çalıştırılır: müşterilerin geri bildirim / şikayet / yıldız
+tıklama patlamaları, restoran sahiplerinin dashboard ve analizleri ETag ile
+yoklaması ve admin restoran listesi. Her senaryo için throughput, p50/p95/p99
+gecikme, hata sayısı ve istek başına sorgu sayısı raporlanır; sonuçlar JSON
+olarak kaydedilir ve önceki bir çalıştırmayla karşılaştırılabilir.
+
+Sorgu sayıları sunucunun DEBUG modunda döndüğü X-DB-Query-Count / X-DB-Time-Ms
+header'larından okunur; --boot ile başlatılan sunucuda DEBUG açıktır.
+
+Test veritabanına yeni restoranlar ve yorumlar yazar; üretim veritabanında
+çalıştırmayın.
+
+Kullanım (backend dizininden):
+    python -m benchmarks.load --boot --duration 30 --concurrency 20 --output results/load.json
+    python -m benchmarks.load --base-url http://localhost:8000 --baseline results/load.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import httpx
+from app.core.config import settings
+
+DEFAULT_MIX = {
+    "create_feedback": 20,
+    "create_complaint": 5,
+    "track_star_click": 30,
+    "owner_dashboard": 25,
+    "restaurant_analytics": 15,
+    "admin_restaurants": 5,
+}
+
+COMMENTS = [
+    "Yemekler çok lezzetliydi, servis hızlıydı.",
+    "Garson ilgisizdi, yemek soğuk geldi.",
+    "Fiyatlar biraz pahalı ama ortam güzel.",
+    "Harika bir akşam yemeğiydi, teşekkürler!",
+    "Siparişimiz unutuldu, 40 dakika bekledik.",
+    None,
+]
+
+class ScenarioStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.query_counts: List[int] = []
+        self.db_times: List[float] = []
+        self.statuses: Dict[int, int] = {}
+        self.errors = 0
+
+    def record(self, latency: float, response: Optional[httpx.Response]):
+        self.latencies.append(latency)
+        if response is None:
+            self.errors += 1
+            return
+        self.statuses[response.status_code] = self.statuses.get(response.status_code, 0) + 1
+        if response.status_code >= 400:
+            self.errors += 1
+        query_count = response.headers.get("x-db-query-count")
+        if query_count is not None:
+            self.query_counts.append(int(query_count))
+            self.db_times.append(float(response.headers.get("x-db-time-ms", 0)))
+
+    def summary(self, duration: float) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "throughput_rps": round(len(latencies) / duration, 2),
+            "latency_ms": {
+                "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else None,
+                "p50": _percentile(latencies, 50),
+                "p95": _percentile(latencies, 95),
+                "p99": _percentile(latencies, 99),
+                "max": round(latencies[-1] * 1000, 2) if latencies else None,
+            },
+            "status_codes": {str(code): count for code, count in sorted(self.statuses.items())},
+            "queries_per_request": round(sum(self.query_counts) / len(self.query_counts), 2) if self.query_counts else None,
+            "max_queries_per_request": max(self.query_counts) if self.query_counts else None,
+            "db_time_ms_per_request": round(sum(self.db_times) / len(self.db_times), 2) if self.db_times else None,
+        }
+
+def _percentile(sorted_values: List[float], percentile: float) -> Optional[float]:
+    # En yakın sıra yöntemi
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, math.ceil(percentile / 100 * len(sorted_values)) - 1))
+    return round(sorted_values[index] * 1000, 2)
+
+class LoadTest:
+    def __init__(self, base_url: str, restaurants: int, mix: Dict[str, int], seed: int):
+        self.base_url = base_url.rstrip("/")
+        self.restaurant_count = restaurants
+        self.mix = mix
+        self.seed = seed
+        self.run_id = f"{int(time.time())}-{seed}"
+        self.admin_headers: Dict[str, str] = {}
+        self.restaurants: List[int] = []
+        self.owner_headers: Dict[int, Dict[str, str]] = {}
+        # Restoran sahibi başına son ETag (tarayıcının If-None-Match davranışı)
+        self.etags: Dict[str, str] = {}
+        self.stats = {name: ScenarioStats() for name in mix}
+
+    async def setup(self, client: httpx.AsyncClient):
+        response = await client.post("/token", json={"email": settings.ADMIN_EMAIL, "password": settings.ADMIN_PASSWORD})
+        response.raise_for_status()
+        self.admin_headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        password = f"bench-{self.run_id}"
+        payload = {"restaurants": [
+            {
+                "name": f"Benchmark Restoran {i}",
+                "subdomain": f"bench-{self.run_id}-{i}",
+                "owner_email": f"owner-{self.run_id}-{i}@mutfak-bench.com",
+                "owner_password": password,
+            }
+            for i in range(self.restaurant_count)
+        ]}
+        response = await client.post("/api/admin/restaurants/bulk", json=payload, headers=self.admin_headers, timeout=120)
+        response.raise_for_status()
+        results = [item for item in response.json()["results"] if item["success"]]
+        self.restaurants = [item["restaurant_id"] for item in results]
+
+        for item in results:
+            response = await client.post("/api/restaurant/login", json={"email": item["owner_email"], "password": password})
+            response.raise_for_status()
+            self.owner_headers[item["restaurant_id"]] = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def _comment_payload(self, rng: random.Random, restaurant_id: int, low: bool, comment_required: bool = False) -> dict:
+        ratings = [rng.randint(1, 2) if low else rng.randint(3, 5) for _ in range(3)]
+        return {
+            "name": f"Müşteri {rng.randint(1, 10000)}",
+            "email": f"musteri{rng.randint(1, 10000)}@mutfak-bench.com",
+            "phone": "05551234567",
+            "food_rating": ratings[0],
+            "service_rating": ratings[1],
+            "atmosphere_rating": ratings[2],
+            "comment": rng.choice([c for c in COMMENTS if c] if comment_required else COMMENTS),
+            "restaurant_id": restaurant_id,
+        }
+
+    async def _conditional_get(self, client: httpx.AsyncClient, key: str, url: str, headers: dict) -> httpx.Response:
+        headers = dict(headers)
+        if key in self.etags:
+            headers["If-None-Match"] = self.etags[key]
+        response = await client.get(url, headers=headers)
+        if "etag" in response.headers:
+            self.etags[key] = response.headers["etag"]
+        return response
+
+    async def _request(self, client: httpx.AsyncClient, scenario: str, rng: random.Random) -> httpx.Response:
+        restaurant_id = rng.choice(self.restaurants)
+        if scenario == "create_feedback":
+            return await client.post("/api/customer/feedbacks", json=self._comment_payload(rng, restaurant_id, rng.random() < 0.2))
+        if scenario == "create_complaint":
+            return await client.post("/api/customer/complaints", json=self._comment_payload(rng, restaurant_id, True, comment_required=True))
+        if scenario == "track_star_click":
+            return await client.post(f"/api/customer/restaurants/{restaurant_id}/star-click", params={"star_value": rng.randint(1, 5)})
+        if scenario == "owner_dashboard":
+            return await self._conditional_get(client, f"dashboard:{restaurant_id}", "/api/restaurant/dashboard", self.owner_headers[restaurant_id])
+        if scenario == "restaurant_analytics":
+            return await self._conditional_get(client, f"analytics:{restaurant_id}", f"/api/customer/{restaurant_id}/analytics", {})
+        if scenario == "admin_restaurants":
+            return await client.get("/api/admin/restaurants", params={"limit": 100}, headers=self.admin_headers)
+        raise ValueError(f"Bilinmeyen senaryo: {scenario}")
+
+    async def _worker(self, client: httpx.AsyncClient, worker_id: int, deadline: float):
+        rng = random.Random(self.seed * 1000 + worker_id)
+        scenarios = list(self.mix)
+        weights = [self.mix[name] for name in scenarios]
+        while time.monotonic() < deadline:
+            scenario = rng.choices(scenarios, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await self._request(client, scenario, rng)
+            except httpx.HTTPError:
+                response = None
+            self.stats[scenario].record(time.perf_counter() - start, response)
+
+    async def run(self, duration: float, concurrency: int, warmup: float) -> dict:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=30) as client:
+            await self.setup(client)
+            if warmup > 0:
+                deadline = time.monotonic() + warmup
+                await asyncio.gather(*(self._worker(client, i, deadline) for i in range(concurrency)))
+                self.stats = {name: ScenarioStats() for name in self.mix}
+            start = time.monotonic()
+            deadline = start + duration
+            await asyncio.gather(*(self._worker(client, i, deadline) for i in range(concurrency)))
+            elapsed = time.monotonic() - start
+
+        total = ScenarioStats()
+        for stats in self.stats.values():
+            total.latencies.extend(stats.latencies)
+            total.query_counts.extend(stats.query_counts)
+            total.db_times.extend(stats.db_times)
+            total.errors += stats.errors
+            for code, count in stats.statuses.items():
+                total.statuses[code] = total.statuses.get(code, 0) + count
+        return {
+            "scenarios": {name: stats.summary(elapsed) for name, stats in self.stats.items()},
+            "total": total.summary(elapsed),
+        }
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _boot_server(port: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, DEBUG="true", ENABLE_EMAIL_NOTIFICATIONS="false", LOG_LEVEL="WARNING")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--workers", str(workers), "--no-access-log"],
+        env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("Sunucu başlatılamadı")
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/readyz", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    process.terminate()
+    raise SystemExit("Sunucu 60 saniye içinde hazır olmadı")
+
+def _print_report(result: dict):
+    print(f"{'senaryo':<22}{'istek':>8}{'hata':>6}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'sorgu':>7}{'db ms':>8}")
+    rows = list(result["scenarios"].items()) + [("TOPLAM", result["total"])]
+    for name, summary in rows:
+        latency = summary["latency_ms"]
+        queries = summary["queries_per_request"]
+        db_time = summary["db_time_ms_per_request"]
+        print(
+            f"{name:<22}{summary['requests']:>8}{summary['errors']:>6}{summary['throughput_rps']:>9.1f}"
+            f"{latency['p50'] or 0:>9.1f}{latency['p95'] or 0:>9.1f}{latency['p99'] or 0:>9.1f}"
+            f"{queries if queries is not None else '-':>7}{db_time if db_time is not None else '-':>8}"
+        )
+
+def _compare(result: dict, baseline: dict, max_regression: float) -> List[str]:
+    """
+    p95 gecikmesi veya throughput'u izin verilen orandan fazla kötüleşen senaryoları döner
+    """
+    regressions = []
+    print(f"\n{'senaryo':<22}{'p95 önce':>10}{'p95 sonra':>11}{'rps önce':>10}{'rps sonra':>11}")
+    for name, summary in result["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if not previous or not summary["requests"] or not previous["requests"]:
+            continue
+        p95, previous_p95 = summary["latency_ms"]["p95"], previous["latency_ms"]["p95"]
+        rps, previous_rps = summary["throughput_rps"], previous["throughput_rps"]
+        print(f"{name:<22}{previous_p95:>10.1f}{p95:>11.1f}{previous_rps:>10.1f}{rps:>11.1f}")
+        if p95 > previous_p95 * (1 + max_regression):
+            regressions.append(f"{name}: p95 {previous_p95:.1f} ms -> {p95:.1f} ms")
+        if rps < previous_rps * (1 - max_regression):
+            regressions.append(f"{name}: throughput {previous_rps:.1f} -> {rps:.1f} rps")
+    return regressions
+
+def _parse_mix(value: str) -> Dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Bilinmeyen senaryo: {name}")
+        mix[name] = int(weight)
+    return mix
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--boot", action="store_true", help="uvicorn'u DEBUG modunda bu script başlatsın")
+    parser.add_argument("--port", type=int, default=8765, help="--boot ile başlatılan sunucunun portu")
+    parser.add_argument("--workers", type=int, default=1, help="--boot ile başlatılan uvicorn worker sayısı")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=5)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--restaurants", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--mix", type=_parse_mix, default=DEFAULT_MIX, help="ör. create_feedback=50,owner_dashboard=50")
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--baseline", help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="İzin verilen p95/throughput kötüleşme oranı")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if args.boot:
+        server = _boot_server(args.port, args.workers)
+        base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        load_test = LoadTest(base_url, args.restaurants, args.mix, args.seed)
+        result = asyncio.run(load_test.run(args.duration, args.concurrency, args.warmup))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    result["meta"] = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "base_url": base_url,
+        "duration": args.duration,
+        "warmup": args.warmup,
+        "concurrency": args.concurrency,
+        "restaurants": args.restaurants,
+        "seed": args.seed,
+        "mix": args.mix,
+        "workers": args.workers if args.boot else None,
+    }
+    _print_report(result)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\nSonuçlar {args.output} dosyasına yazıldı.")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = _compare(result, baseline, args.max_regression)
+        if regressions:
+            print("\nGerileme tespit edildi:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nGerileme yok.")
+
+if __name__ == "__main__":
+    main()
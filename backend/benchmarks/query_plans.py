@@ -0,0 +1,330 @@
+"""
+Sıcak endpoint'lerin sorgu planlarını EXPLAIN (ANALYZE, BUFFERS) ile yakalar ve gerilemeleri tespit eder
+
+Her endpoint en büyük restoran ve kuyruktaki (medyan) bir restoran için uygulama
+içinden (TestClient) çağrılır; çalışan SELECT sorguları yakalanıp aynı
+parametrelerle EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) altında tekrar çalıştırılır.
+Şu durumlarda betik 1 ile çıkar:
+
+- Bir plan --seq-scan-min-rows satırdan büyük bir tabloda Seq Scan içeriyorsa
+- Bir sorgunun tahmini toplam maliyeti endpoint'in bütçesini aşıyorsa
+  (COST_BUDGETS; --budgets ile JSON dosyasından ezilebilir)
+- --baseline verildiyse, bir sorgunun maliyeti önceki çalıştırmaya göre
+  --max-cost-increase oranından fazla arttıysa
+
+Anlamlı sonuç için önce benchmarks.generate_data ile ölçekli veri yükleyin. EXPLAIN
+ANALYZE sorguları gerçekten çalıştırır; yalnızca SELECT'ler açıklanır ve her biri
+geri alınan bir transaction içinde çalışır.
+
+Kullanım (backend dizininden):
+    python -m benchmarks.query_plans --output results/plans.json
+    python -m benchmarks.query_plans --baseline results/plans.json --budgets budgets.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+from fastapi.testclient import TestClient
+from sqlalchemy import event, text
+from app.core.auth import create_access_token
+from app.db.db import engine
+from app.db.query_stats import statement_shape
+from app.main import app
+from app.models.models import UserRole
+
+# (ad, kimlik, yol); yollar {restaurant_id} alabilir. Admin endpoint'leri restorandan bağımsızdır
+CASES = [
+    ("owner_dashboard", UserRole.RESTAURANT_OWNER, "/api/restaurant/dashboard"),
+    ("owner_feedbacks", UserRole.RESTAURANT_OWNER, "/api/restaurant/feedbacks?limit=50"),
+    ("owner_feedbacks_next_page", UserRole.RESTAURANT_OWNER, "/api/restaurant/feedbacks?limit=50&cursor={cursor}"),
+    ("owner_complaints", UserRole.RESTAURANT_OWNER, "/api/restaurant/complaints?limit=50"),
+    ("owner_search", UserRole.RESTAURANT_OWNER, "/api/restaurant/search?q=servis"),
+    ("owner_topics", UserRole.RESTAURANT_OWNER, "/api/restaurant/analytics/topics?days=30&source=all"),
+    ("public_analytics", None, "/api/customer/{restaurant_id}/analytics"),
+    ("public_feedbacks", None, "/api/customer/{restaurant_id}/feedbacks?limit=50"),
+    ("public_star_clicks", None, "/api/customer/restaurants/{restaurant_id}/star-clicks"),
+    ("restaurant_star_clicks", None, "/api/restaurant/{restaurant_id}/star-clicks"),
+    ("admin_restaurants", UserRole.ADMIN, "/api/admin/restaurants?limit=100"),
+    ("admin_restaurants_next_page", UserRole.ADMIN, "/api/admin/restaurants?limit=100&cursor={cursor}"),
+]
+
+# Endpoint başına tek bir sorgunun aşmaması gereken tahmini plan maliyeti; generate_data'nın
+# varsayılan ölçeğine (1000 restoran, 1M geri bildirim, 2M yıldız tıklaması) göre ayarlanmıştır.
+# Toplama yapan endpoint'ler büyük restoranın tüm satırlarını okuduğu için bütçeleri daha yüksektir
+DEFAULT_COST_BUDGET = 5_000
+COST_BUDGETS = {
+    "owner_dashboard": 15_000,
+    "public_analytics": 15_000,
+    "restaurant_star_clicks": 20_000,
+    "owner_search": 60_000,
+}
+
+class PlanCheck:
+    """
+    Tek bir sorgunun EXPLAIN çıktısı ve ondan çıkarılan özet
+    """
+
+    def __init__(self, case: str, tenant: str, statement: str, explain: dict):
+        plan = explain["Plan"]
+        self.case = case
+        self.tenant = tenant
+        self.shape = statement_shape(statement)
+        self.plan = plan
+        self.total_cost = plan["Total Cost"]
+        self.execution_ms = explain.get("Execution Time")
+        self.shared_hit = plan.get("Shared Hit Blocks", 0)
+        self.shared_read = plan.get("Shared Read Blocks", 0)
+        self.seq_scans = sorted({node["Relation Name"] for node in _walk(plan) if node["Node Type"] == "Seq Scan"})
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}[{self.tenant}] {self.shape}"
+
+    def to_dict(self) -> dict:
+        return {
+            "case": self.case,
+            "tenant": self.tenant,
+            "shape": self.shape,
+            "total_cost": self.total_cost,
+            "execution_ms": self.execution_ms,
+            "shared_hit_blocks": self.shared_hit,
+            "shared_read_blocks": self.shared_read,
+            "seq_scans": self.seq_scans,
+            "plan": self.plan,
+        }
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("Plans", ()):
+        yield from _walk(child)
+
+def _format_plan(node: dict, depth: int = 0) -> List[str]:
+    label = node["Node Type"]
+    if node.get("Index Name"):
+        label += f" using {node['Index Name']}"
+    if node.get("Relation Name"):
+        label += f" on {node['Relation Name']}"
+    line = (
+        f"{'  ' * depth}-> {label} (cost={node['Total Cost']:.0f} rows={node['Plan Rows']}"
+        f" actual rows={node.get('Actual Rows', '-')} time={node.get('Actual Total Time', '-')} ms)"
+    )
+    lines = [line]
+    for child in node.get("Plans", ()):
+        lines.extend(_format_plan(child, depth + 1))
+    return lines
+
+def _pick_tenants() -> Dict[str, int]:
+    """
+    En çok geri bildirimi olan restoranı ve geri bildirim sayısı medyanda olan restoranı seçer
+    """
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT r.id, count(f.id) AS total FROM restaurants r "
+            "JOIN users u ON u.restaurant_id = r.id AND u.role = :role "
+            "LEFT JOIN feedbacks f ON f.restaurant_id = r.id "
+            "WHERE r.deleted_at IS NULL GROUP BY r.id ORDER BY total DESC, r.id"
+        ), {"role": UserRole.RESTAURANT_OWNER.value}).all()
+    if not rows:
+        return {}
+    return {"large": rows[0].id, "tail": rows[len(rows) // 2].id}
+
+def _tokens(restaurant_ids: List[int]) -> Dict[Optional[int], str]:
+    # Şifre gerekmemesi için token'lar doğrudan üretilir
+    with engine.connect() as conn:
+        owners = conn.execute(text(
+            "SELECT DISTINCT ON (restaurant_id) email, restaurant_id FROM users "
+            "WHERE role = :role AND restaurant_id = ANY(:ids) ORDER BY restaurant_id, id"
+        ), {"role": UserRole.RESTAURANT_OWNER.value, "ids": restaurant_ids}).all()
+        admin = conn.execute(text("SELECT email FROM users WHERE role = :role ORDER BY id LIMIT 1"), {"role": UserRole.ADMIN.value}).first()
+    tokens = {
+        owner.restaurant_id: create_access_token(
+            data={"sub": owner.email, "role": UserRole.RESTAURANT_OWNER.value, "restaurant_id": owner.restaurant_id}
+        )
+        for owner in owners
+    }
+    if admin is not None:
+        tokens[None] = create_access_token(data={"sub": admin.email, "role": UserRole.ADMIN.value})
+    return tokens
+
+class QueryCapture:
+    """
+    Blok içinde uygulamanın çalıştırdığı SELECT sorgularını parametreleriyle toplar
+    """
+
+    def __init__(self):
+        self.statements = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            self.statements.append((statement, parameters))
+
+    def __enter__(self):
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+
+def _explain(statement: str, parameters) -> dict:
+    with engine.connect() as conn:
+        transaction = conn.begin()
+        try:
+            result = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters or ())
+            return result.scalar()[0]
+        finally:
+            transaction.rollback()
+
+def _run_case(client: TestClient, case: str, role, path: str, restaurant_id: Optional[int], tokens: dict) -> Optional[List[tuple]]:
+    token_owner = None if role == UserRole.ADMIN else restaurant_id
+    headers = {}
+    if role is not None:
+        if token_owner not in tokens:
+            return None
+        headers["Authorization"] = f"Bearer {tokens[token_owner]}"
+
+    if "{cursor}" in path:
+        # Sonraki sayfa: ilk sayfanın X-Next-Cursor değeriyle istenir
+        first = client.get(path.split("&cursor=")[0].format(restaurant_id=restaurant_id), headers=headers)
+        cursor = first.headers.get("X-Next-Cursor")
+        if not cursor:
+            return None
+        path = path.replace("{cursor}", cursor)
+
+    with QueryCapture() as capture:
+        response = client.get(path.format(restaurant_id=restaurant_id), headers=headers)
+    if response.status_code != 200:
+        raise RuntimeError(f"{case}: {path} -> {response.status_code} {response.text[:200]}")
+
+    unique = {}
+    for statement, parameters in capture.statements:
+        unique.setdefault(statement_shape(statement), (statement, parameters))
+    return list(unique.values())
+
+def _large_tables(min_rows: int) -> set:
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace AND reltuples >= :rows"
+        ), {"rows": min_rows}).all()
+    return {row.relname for row in rows}
+
+def _violations(checks: List[PlanCheck], large_tables: set, budgets: Dict[str, float]) -> List[str]:
+    violations = []
+    for check in checks:
+        scanned = [table for table in check.seq_scans if table in large_tables]
+        if scanned:
+            violations.append(f"{check.key}: Seq Scan on {', '.join(scanned)}")
+        budget = budgets.get(check.case, DEFAULT_COST_BUDGET)
+        if check.total_cost > budget:
+            violations.append(f"{check.key}: maliyet {check.total_cost:.0f} > bütçe {budget:.0f}")
+    return violations
+
+def _compare(checks: List[PlanCheck], baseline: dict, max_increase: float) -> List[str]:
+    """
+    Maliyeti önceki çalıştırmaya göre izin verilen orandan fazla artan sorguları döner
+    """
+    regressions = []
+    previous_checks = baseline.get("checks", {})
+    for check in checks:
+        previous = previous_checks.get(check.key)
+        if previous is None:
+            continue
+        if check.total_cost > previous["total_cost"] * (1 + max_increase):
+            regressions.append(f"{check.key}: maliyet {previous['total_cost']:.0f} -> {check.total_cost:.0f}")
+        new_scans = sorted(set(check.seq_scans) - set(previous["seq_scans"]))
+        if new_scans:
+            regressions.append(f"{check.key}: yeni Seq Scan on {', '.join(new_scans)}")
+    return regressions
+
+def _print_report(checks: List[PlanCheck]):
+    print(f"{'endpoint':<30}{'restoran':<10}{'maliyet':>10}{'ms':>9}{'hit':>9}{'read':>8}  seq scan")
+    for check in checks:
+        print(
+            f"{check.case:<30}{check.tenant:<10}{check.total_cost:>10.0f}{check.execution_ms or 0:>9.2f}"
+            f"{check.shared_hit:>9}{check.shared_read:>8}  {', '.join(check.seq_scans) or '-'}"
+        )
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seq-scan-min-rows", type=int, default=10_000, help="Bu kadar satırdan büyük tablolarda Seq Scan gerileme sayılır")
+    parser.add_argument("--budgets", help="Endpoint adı -> azami maliyet eşlemesi içeren JSON dosyası")
+    parser.add_argument("--output", help="Planların yazılacağı JSON dosyası")
+    parser.add_argument("--baseline", help="Karşılaştırılacak önceki plan dosyası")
+    parser.add_argument("--max-cost-increase", type=float, default=0.5, help="İzin verilen maliyet artış oranı")
+    parser.add_argument("--verbose", action="store_true", help="İhlal eden planları ağaç olarak yazdır")
+    args = parser.parse_args()
+    # TestClient her isteği INFO seviyesinde loglar
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    budgets = dict(COST_BUDGETS)
+    if args.budgets:
+        with open(args.budgets, encoding="utf-8") as f:
+            budgets.update(json.load(f))
+
+    tenants = _pick_tenants()
+    if not tenants:
+        print("Sahibi olan restoran yok; önce benchmarks.generate_data ile veri yükleyin.")
+        sys.exit(1)
+    tokens = _tokens(list(tenants.values()))
+
+    checks: List[PlanCheck] = []
+    client = TestClient(app)
+    for case, role, path in CASES:
+        case_tenants = {"-": None} if role == UserRole.ADMIN else tenants
+        for tenant, restaurant_id in case_tenants.items():
+            statements = _run_case(client, case, role, path, restaurant_id, tokens)
+            if statements is None:
+                print(f"{case}[{tenant}] atlandı (token veya sonraki sayfa yok)")
+                continue
+            for statement, parameters in statements:
+                checks.append(PlanCheck(case, tenant, statement, _explain(statement, parameters)))
+
+    _print_report(checks)
+    violations = _violations(checks, _large_tables(args.seq_scan_min_rows), budgets)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        result = {
+            "meta": {
+                "started_at": datetime.now(timezone.utc).isoformat(),
+                "git_commit": _git_commit(),
+                "python": platform.python_version(),
+                "tenants": tenants,
+                "budgets": budgets,
+            },
+            "checks": {check.key: check.to_dict() for check in checks},
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\nPlanlar {args.output} dosyasına yazıldı.")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            violations.extend(_compare(checks, json.load(f), args.max_cost_increase))
+
+    if violations:
+        print("\nPlan gerilemesi tespit edildi:")
+        for line in violations:
+            print(f"  {line}")
+        if args.verbose:
+            failing = {line.split(": ", 1)[0] for line in violations}
+            for check in checks:
+                if check.key in failing:
+                    print(f"\n{check.key}")
+                    print("\n".join(_format_plan(check.plan)))
+        sys.exit(1)
+    print("\nPlan gerilemesi yok.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Liste yanıtlarının serileştirme maliyetini eski ve yeni yol için karşılaştırır
+
+Eski yol: ORM nesneleri response_model ile doğrulanır, JSON moduna dökülür ve
+stdlib json ile yazılır (FastAPI'nin response_model + JSONResponse akışı).
+Yeni yol: kolon sorgusu satırları doğrudan orjson ile yazılır (rows_response).
+
+Veritabanı gerektirmez; satırlar bellekte üretilir. İki yolun çıktısının aynı
+olduğu da kontrol edilir.
+
+Kullanım (backend dizininden):
+    python -m benchmarks.serialization [--rows 100] [--repeat 200]
+"""
+import argparse
+import json
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from typing import List
+from pydantic import TypeAdapter
+from app.core.responses import FastJSONResponse, rows_response
+from app.models.models import Feedback
+from app.schemas.schemas import Feedback as FeedbackSchema, RestaurantWithOwner
+
+def _feedback_values(count: int) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "name": f"Müşteri {i}",
+            "email": f"musteri{i}@example.com",
+            "phone": "05551234567",
+            "food_rating": i % 5 + 1,
+            "service_rating": (i + 1) % 5 + 1,
+            "atmosphere_rating": (i + 2) % 5 + 1,
+            "comment": "Yemekler güzeldi ama servis biraz yavaştı." if i % 3 else None,
+            "id": i + 1,
+            "average_rating": round(((i % 5) + ((i + 1) % 5) + ((i + 2) % 5) + 3) / 3, 1),
+            "restaurant_id": 1,
+            "created_at": now - timedelta(minutes=i),
+            "sentiment_score": -0.35 if i % 2 else None,
+        }
+        for i in range(count)
+    ]
+
+def _restaurant_values(count: int) -> List[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "name": f"Restoran {i}",
+            "subdomain": f"restoran-{i}",
+            "id": i + 1,
+            "created_at": now - timedelta(days=i),
+            "updated_at": None,
+            "owner": {
+                "email": f"sahip{i}@example.com",
+                "id": i + 100,
+                "role": "restaurant_owner",
+                "is_active": True,
+                "restaurant_id": i + 1,
+            },
+        }
+        for i in range(count)
+    ]
+
+def _stdlib_render(content) -> bytes:
+    # starlette.responses.JSONResponse.render ile aynı ayarlar
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+def _measure(func, repeat: int) -> float:
+    func()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def run(rows: int, repeat: int):
+    feedback_values = _feedback_values(rows)
+    feedback_objects = [Feedback(**values) for values in feedback_values]
+    FeedbackRow = namedtuple("FeedbackRow", list(FeedbackSchema.model_fields))
+    feedback_rows = [FeedbackRow(**values) for values in feedback_values]
+    feedback_adapter = TypeAdapter(List[FeedbackSchema])
+
+    restaurant_values = _restaurant_values(rows)
+    restaurant_adapter = TypeAdapter(List[RestaurantWithOwner])
+
+    def feedbacks_before() -> bytes:
+        validated = feedback_adapter.validate_python(feedback_objects, from_attributes=True)
+        return _stdlib_render(feedback_adapter.dump_python(validated, mode="json"))
+
+    def feedbacks_after() -> bytes:
+        return rows_response(feedback_rows).body
+
+    def restaurants_before() -> bytes:
+        validated = restaurant_adapter.validate_python(restaurant_values)
+        return _stdlib_render(restaurant_adapter.dump_python(validated, mode="json"))
+
+    def restaurants_after() -> bytes:
+        return FastJSONResponse(restaurant_values).body
+
+    cases = [
+        ("GET /restaurant/feedbacks", feedbacks_before, feedbacks_after),
+        ("GET /admin/restaurants", restaurants_before, restaurants_after),
+    ]
+    print(f"{rows} satır, {repeat} tekrar (ms / yanıt)")
+    print(f"{'endpoint':<28}{'önce':>10}{'sonra':>10}{'hızlanma':>10}")
+    for name, before, after in cases:
+        if json.loads(before()) != json.loads(after()):
+            raise SystemExit(f"{name}: iki yolun çıktısı farklı")
+        before_ms = _measure(before, repeat)
+        after_ms = _measure(after, repeat)
+        print(f"{name:<28}{before_ms:>10.3f}{after_ms:>10.3f}{before_ms / after_ms:>9.1f}x")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
@@ -1,10 +1,17 @@
-import uvicorn
-from app.api.api import app
+"""
+Backend sunucusunu başlatır
+
+Ayarlar ortam değişkenlerinden okunur (HOST, PORT, WEB_CONCURRENCY, MAX_REQUESTS, ...).
+
+Kullanım (backend dizininden):
+    python main.py            # üretim: gunicorn + uvicorn worker'ları
+    python main.py --reload   # geliştirme: kaynak değişince yeniden başlayan tek process
+"""
+import argparse
+from app.core.server import run
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.api.api:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-    ) 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reload", action="store_true", help="Geliştirme modu: tek process, dosya izleyici açık")
+    args = parser.parse_args()
+    run(reload=args.reload)
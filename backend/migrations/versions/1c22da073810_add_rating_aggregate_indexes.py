@@ -0,0 +1,35 @@
+"""add_rating_aggregate_indexes
+
+Revision ID: 1c22da073810
+Revises: b274bf154155
+Create Date: 2026-10-19 18:42:10.518230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c22da073810'
+down_revision = 'b274bf154155'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Büyük restoranlarda puan/duygu toplamları ve yıldız sayımları index-only scan ile okunur;
+    # aksi halde planlayıcı tablonun tamamını tarar
+    with op.get_context().autocommit_block():
+        op.create_index('ix_feedbacks_restaurant_rating', 'feedbacks', ['restaurant_id', 'average_rating'], unique=False, postgresql_include=['sentiment_score', 'id'], postgresql_concurrently=True)
+        op.create_index('ix_complaints_restaurant_rating', 'complaints', ['restaurant_id', 'average_rating'], unique=False, postgresql_include=['sentiment_score', 'id'], postgresql_concurrently=True)
+        op.create_index('ix_star_clicks_restaurant_star', 'star_clicks', ['restaurant_id', 'star_value'], unique=False, postgresql_include=['id'], postgresql_concurrently=True)
+        # Yeni indeks restaurant_id ile başladığı için tek kolonlu indeks gereksizleşir
+        op.drop_index('ix_star_clicks_restaurant_id', table_name='star_clicks', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_star_clicks_restaurant_id', 'star_clicks', ['restaurant_id'], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_star_clicks_restaurant_star', table_name='star_clicks', postgresql_concurrently=True)
+        op.drop_index('ix_complaints_restaurant_rating', table_name='complaints', postgresql_concurrently=True)
+        op.drop_index('ix_feedbacks_restaurant_rating', table_name='feedbacks', postgresql_concurrently=True)
@@ -0,0 +1,29 @@
+"""add_feedback_keyset_indexes
+
+Revision ID: 3d640bf1e805
+Revises: eb84b294086d
+Create Date: 2026-10-19 11:21:06.904157
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d640bf1e805'
+down_revision = 'eb84b294086d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Büyük tablolarda yazmaları kilitlememek için indeksler CONCURRENTLY oluşturulur
+    with op.get_context().autocommit_block():
+        op.create_index('ix_feedbacks_restaurant_created_at_id', 'feedbacks', ['restaurant_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_complaints_restaurant_created_at_id', 'complaints', ['restaurant_id', 'created_at', 'id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_complaints_restaurant_created_at_id', table_name='complaints', postgresql_concurrently=True)
+        op.drop_index('ix_feedbacks_restaurant_created_at_id', table_name='feedbacks', postgresql_concurrently=True)
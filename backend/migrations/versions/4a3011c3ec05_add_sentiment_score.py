@@ -0,0 +1,33 @@
+"""add_sentiment_score
+
+Revision ID: 4a3011c3ec05
+Revises: 89314665f1bd
+Create Date: 2026-10-19 18:03:51.440218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4a3011c3ec05'
+down_revision = '89314665f1bd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Varsayılanı olmayan nullable kolon eklemek tabloyu yeniden yazmaz
+    op.add_column('feedbacks', sa.Column('sentiment_score', sa.Float(), nullable=True))
+    op.add_column('complaints', sa.Column('sentiment_score', sa.Float(), nullable=True))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_feedbacks_unscored', 'feedbacks', ['id'], unique=False, postgresql_where=sa.text('sentiment_score IS NULL AND comment IS NOT NULL'), postgresql_concurrently=True)
+        op.create_index('ix_complaints_unscored', 'complaints', ['id'], unique=False, postgresql_where=sa.text('sentiment_score IS NULL AND comment IS NOT NULL'), postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_complaints_unscored', table_name='complaints', postgresql_concurrently=True)
+        op.drop_index('ix_feedbacks_unscored', table_name='feedbacks', postgresql_concurrently=True)
+    op.drop_column('complaints', 'sentiment_score')
+    op.drop_column('feedbacks', 'sentiment_score')
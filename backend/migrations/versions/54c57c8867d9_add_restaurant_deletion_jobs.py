@@ -0,0 +1,46 @@
+"""add_restaurant_deletion_jobs
+
+Revision ID: 54c57c8867d9
+Revises: 3d640bf1e805
+Create Date: 2026-10-19 12:40:53.117420
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '54c57c8867d9'
+down_revision = '3d640bf1e805'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('restaurants', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_table('restaurant_deletion_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('progress', sa.JSON(), nullable=True),
+    sa.Column('current_table', sa.String(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_restaurant_deletion_jobs_id'), 'restaurant_deletion_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_restaurant_deletion_jobs_restaurant_id'), 'restaurant_deletion_jobs', ['restaurant_id'], unique=False)
+    # Parçalı silme star_clicks üzerinde restaurant_id ile arar
+    with op.get_context().autocommit_block():
+        op.create_index(op.f('ix_star_clicks_restaurant_id'), 'star_clicks', ['restaurant_id'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(op.f('ix_star_clicks_restaurant_id'), table_name='star_clicks', postgresql_concurrently=True)
+    op.drop_index(op.f('ix_restaurant_deletion_jobs_restaurant_id'), table_name='restaurant_deletion_jobs')
+    op.drop_index(op.f('ix_restaurant_deletion_jobs_id'), table_name='restaurant_deletion_jobs')
+    op.drop_table('restaurant_deletion_jobs')
+    op.drop_column('restaurants', 'deleted_at')
@@ -0,0 +1,39 @@
+"""add_feedback_search_vectors
+
+Revision ID: 5f8fb4fdb683
+Revises: fcbaaf25b11b
+Create Date: 2026-10-19 16:31:47.215093
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '5f8fb4fdb683'
+down_revision = 'fcbaaf25b11b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Üretilmiş kolon eklemek tabloyu yeniden yazar; bakım penceresinde çalıştırılmalı
+    for table in ('feedbacks', 'complaints'):
+        op.add_column(table, sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('turkish', coalesce(comment, ''))", persisted=True),
+            nullable=True,
+        ))
+    with op.get_context().autocommit_block():
+        op.create_index('ix_feedbacks_search_vector', 'feedbacks', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+        op.create_index('ix_complaints_search_vector', 'complaints', ['search_vector'], unique=False, postgresql_using='gin', postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_complaints_search_vector', table_name='complaints', postgresql_concurrently=True)
+        op.drop_index('ix_feedbacks_search_vector', table_name='feedbacks', postgresql_concurrently=True)
+    op.drop_column('complaints', 'search_vector')
+    op.drop_column('feedbacks', 'search_vector')
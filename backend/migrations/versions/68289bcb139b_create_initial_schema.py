@@ -0,0 +1,125 @@
+"""create_initial_schema
+
+Revision ID: 68289bcb139b
+Revises:
+Create Date: 2026-10-19 21:04:37.518204
+
+Önceden uygulama açılışta Base.metadata.create_all çalıştırıyordu ve bu tablolar
+hiçbir migrasyonda oluşturulmuyordu. Bu revizyon fff6ecfd11d2'den önceki şemayı
+kurar; boş bir veritabanı yalnızca `alembic upgrade head` ile hazırlanabilir.
+
+create_all ile oluşturulmuş ve hiç stamp'lenmemiş mevcut veritabanları için
+`alembic stamp head` yeterlidir.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '68289bcb139b'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('restaurants',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('subdomain', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_restaurants_id'), 'restaurants', ['id'], unique=False)
+    op.create_index(op.f('ix_restaurants_name'), 'restaurants', ['name'], unique=False)
+    op.create_index(op.f('ix_restaurants_subdomain'), 'restaurants', ['subdomain'], unique=True)
+    op.create_table('waitlist',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_waitlist_email'), 'waitlist', ['email'], unique=True)
+    op.create_index(op.f('ix_waitlist_id'), 'waitlist', ['id'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('hashed_password', sa.String(), nullable=True),
+    sa.Column('role', sa.String(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('restaurant_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    for table in ('feedbacks', 'complaints'):
+        op.create_table(table,
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('email', sa.String(), nullable=True),
+        sa.Column('phone', sa.String(), nullable=True),
+        sa.Column('food_rating', sa.Integer(), nullable=True),
+        sa.Column('service_rating', sa.Integer(), nullable=True),
+        sa.Column('atmosphere_rating', sa.Integer(), nullable=True),
+        sa.Column('average_rating', sa.Float(), nullable=True),
+        sa.Column('comment', sa.Text(), nullable=True),
+        sa.Column('restaurant_id', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index(op.f(f'ix_{table}_id'), table, ['id'], unique=False)
+    op.create_table('platforms',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('url', sa.String(), nullable=True),
+    sa.Column('restaurant_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_platforms_id'), 'platforms', ['id'], unique=False)
+    op.create_table('star_click_statistics',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=True),
+    sa.Column('star_value', sa.Integer(), nullable=True),
+    sa.Column('count', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_star_click_statistics_id'), 'star_click_statistics', ['id'], unique=False)
+    op.create_table('star_clicks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=True),
+    sa.Column('star_value', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_star_clicks_id'), 'star_clicks', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_star_clicks_id'), table_name='star_clicks')
+    op.drop_table('star_clicks')
+    op.drop_index(op.f('ix_star_click_statistics_id'), table_name='star_click_statistics')
+    op.drop_table('star_click_statistics')
+    op.drop_index(op.f('ix_platforms_id'), table_name='platforms')
+    op.drop_table('platforms')
+    for table in ('complaints', 'feedbacks'):
+        op.drop_index(op.f(f'ix_{table}_id'), table_name=table)
+        op.drop_table(table)
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_waitlist_id'), table_name='waitlist')
+    op.drop_index(op.f('ix_waitlist_email'), table_name='waitlist')
+    op.drop_table('waitlist')
+    op.drop_index(op.f('ix_restaurants_subdomain'), table_name='restaurants')
+    op.drop_index(op.f('ix_restaurants_name'), table_name='restaurants')
+    op.drop_index(op.f('ix_restaurants_id'), table_name='restaurants')
+    op.drop_table('restaurants')
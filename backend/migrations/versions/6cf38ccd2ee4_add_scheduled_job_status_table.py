@@ -0,0 +1,36 @@
+"""add_scheduled_job_status_table
+
+Revision ID: 6cf38ccd2ee4
+Revises: 788ce76b7613
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6cf38ccd2ee4'
+down_revision = '788ce76b7613'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('scheduled_job_status',
+    sa.Column('job_id', sa.String(), nullable=False),
+    sa.Column('last_started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_success_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_duration_ms', sa.Float(), nullable=True),
+    sa.Column('last_status', sa.String(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('last_worker', sa.String(), nullable=True),
+    sa.Column('run_count', sa.Integer(), nullable=True),
+    sa.Column('failure_count', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('job_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('scheduled_job_status')
@@ -0,0 +1,44 @@
+"""add_comment_term_frequencies
+
+Revision ID: 89314665f1bd
+Revises: 5f8fb4fdb683
+Create Date: 2026-10-19 17:12:30.871946
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '89314665f1bd'
+down_revision = '5f8fb4fdb683'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('processing_watermarks',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('comment_term_frequencies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=True),
+    sa.Column('source', sa.String(), nullable=True),
+    sa.Column('day', sa.Date(), nullable=True),
+    sa.Column('term', sa.String(), nullable=True),
+    sa.Column('label', sa.String(), nullable=True),
+    sa.Column('count', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('restaurant_id', 'source', 'day', 'term', name='uq_comment_term_frequencies_bucket')
+    )
+    op.create_index(op.f('ix_comment_term_frequencies_id'), 'comment_term_frequencies', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_comment_term_frequencies_id'), table_name='comment_term_frequencies')
+    op.drop_table('comment_term_frequencies')
+    op.drop_table('processing_watermarks')
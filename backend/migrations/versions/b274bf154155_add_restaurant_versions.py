@@ -0,0 +1,34 @@
+"""add_restaurant_versions
+
+Revision ID: b274bf154155
+Revises: 4a3011c3ec05
+Create Date: 2026-10-19 18:47:12.306594
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b274bf154155'
+down_revision = '4a3011c3ec05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('restaurant_versions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=True),
+    sa.Column('version', sa.Integer(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('restaurant_id')
+    )
+    op.create_index(op.f('ix_restaurant_versions_id'), 'restaurant_versions', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_restaurant_versions_id'), table_name='restaurant_versions')
+    op.drop_table('restaurant_versions')
@@ -0,0 +1,24 @@
+"""add_users_restaurant_id_index
+
+Revision ID: eb84b294086d
+Revises: 6cf38ccd2ee4
+Create Date: 2026-10-19 10:04:17.552810
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'eb84b294086d'
+down_revision = '6cf38ccd2ee4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_users_restaurant_id'), 'users', ['restaurant_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_users_restaurant_id'), table_name='users')
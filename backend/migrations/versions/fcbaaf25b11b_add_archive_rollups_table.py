@@ -0,0 +1,37 @@
+"""add_archive_rollups_table
+
+Revision ID: fcbaaf25b11b
+Revises: 54c57c8867d9
+Create Date: 2026-10-19 15:58:12.604371
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fcbaaf25b11b'
+down_revision = '54c57c8867d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('archive_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('restaurant_id', sa.Integer(), nullable=True),
+    sa.Column('source', sa.String(), nullable=True),
+    sa.Column('month', sa.Date(), nullable=True),
+    sa.Column('value', sa.Float(), nullable=True),
+    sa.Column('count', sa.Integer(), nullable=True),
+    sa.Column('latest_created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['restaurant_id'], ['restaurants.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('restaurant_id', 'source', 'month', 'value', name='uq_archive_rollups_bucket')
+    )
+    op.create_index(op.f('ix_archive_rollups_id'), 'archive_rollups', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_archive_rollups_id'), table_name='archive_rollups')
+    op.drop_table('archive_rollups')
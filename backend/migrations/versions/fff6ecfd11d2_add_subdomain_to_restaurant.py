@@ -1,7 +1,7 @@
 """add_subdomain_to_restaurant
 
 Revision ID: fff6ecfd11d2
-Revises: 
+Revises: 68289bcb139b
 Create Date: 2025-03-13 00:45:30.132684
 
 """
@@ -11,7 +11,7 @@ from sqlalchemy.dialects import postgresql
 
 # revision identifiers, used by Alembic.
 revision = 'fff6ecfd11d2'
-down_revision = None
+down_revision = '68289bcb139b'
 branch_labels = None
 depends_on = None
 
@@ -1,4 +1,5 @@
 @echo off
 echo Backend başlatılıyor...
 cd %~dp0
-python -m uvicorn app.api.api:app --reload --host 0.0.0.0 --port 8000 
\ No newline at end of file
+alembic upgrade head
+python main.py --reload 
\ No newline at end of file
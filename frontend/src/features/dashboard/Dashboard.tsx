@@ -6,6 +6,7 @@ import { Label } from '@/components/ui/label';
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select';
 import { useAuth } from '@/features/auth/AuthContext';
 import { restaurantService } from '@/lib/api';
+import useRestaurantEvents from '@/hooks/useRestaurantEvents';
 import { toast } from 'sonner';
 
 // Platform seçenekleri
@@ -87,6 +88,18 @@ const Dashboard = () => {
     }
   };
 
+  // Yeni yorumlar ve güncellenen sayaçlar sayfa yenilenmeden canlı akıştan gelir
+  useRestaurantEvents(!!user?.restaurant_id, {
+    onDashboard: (data) => {
+      setDashboardData(data);
+      setIsLoading(false);
+      // Yıldız tıklamaları da dashboard olayını tetikler; istatistikler ayrı endpoint'ten yenilenir
+      fetchStarClickStats();
+    },
+    onFeedback: (data) => toast.info(`Yeni geri bildirim: ${data.name}`),
+    onComplaint: (data) => toast.warning(`Yeni şikayet: ${data.name}`),
+  });
+
   const fetchPlatformLinks = async () => {
     try {
       console.log('Platform linklerini çekmeye başlıyorum...');
@@ -8,6 +8,7 @@ import { Textarea } from "@/components/ui/textarea";
 import { toast } from "sonner";
 import { useAuth } from '@/features/auth/AuthContext';
 import { restaurantService } from '@/lib/api';
+import useRestaurantEvents from '@/hooks/useRestaurantEvents';
 
 // Comment interface
 interface Comment {
@@ -53,6 +54,20 @@ const CommentTable: React.FC<CommentTableProps> = ({ comments: initialComments }
     }
   }, [user]);
 
+  // Olay yalnızca özet taşır; tablo telefon ve puan ayrıntılarını da gösterdiği için liste yeniden çekilir
+  const refreshComments = async () => {
+    try {
+      setComments(await restaurantService.getFeedbacks());
+    } catch (error) {
+      console.error('Error refreshing comments:', error);
+    }
+  };
+
+  useRestaurantEvents(!!user?.restaurant_id, {
+    onFeedback: refreshComments,
+    onComplaint: refreshComments,
+  });
+
   const fetchComments = async () => {
     try {
       setIsLoading(true);
@@ -0,0 +1,71 @@
+import { useEffect, useRef } from 'react';
+import { restaurantService } from '@/lib/api';
+
+interface RestaurantEventHandlers {
+  onDashboard?: (data: any) => void;
+  onFeedback?: (data: any) => void;
+  onComplaint?: (data: any) => void;
+}
+
+// Bağlantı koptuğunda yeni bilet alınmadan önce beklenecek süre
+const RECONNECT_DELAY = 5000;
+
+// Restoranın canlı olay akışına (Server-Sent Events) abone olur
+const useRestaurantEvents = (enabled: boolean, handlers: RestaurantEventHandlers) => {
+  // Handler'lar her render'da değişse de bağlantı yeniden kurulmasın diye ref'te tutulur
+  const handlersRef = useRef(handlers);
+  handlersRef.current = handlers;
+
+  useEffect(() => {
+    if (!enabled) return;
+
+    let source: EventSource | null = null;
+    let timer: ReturnType<typeof setTimeout> | undefined;
+    let closed = false;
+
+    const scheduleReconnect = () => {
+      if (!closed) {
+        timer = setTimeout(connect, RECONNECT_DELAY);
+      }
+    };
+
+    const listen = (event: string, handler: keyof RestaurantEventHandlers) => {
+      source?.addEventListener(event, (message: MessageEvent) => {
+        handlersRef.current[handler]?.(JSON.parse(message.data));
+      });
+    };
+
+    const connect = async () => {
+      try {
+        source = await restaurantService.openEvents();
+      } catch (error) {
+        console.error('Canlı olay akışına bağlanılamadı:', error);
+        scheduleReconnect();
+        return;
+      }
+      if (closed) {
+        source.close();
+        return;
+      }
+      listen('dashboard', 'onDashboard');
+      listen('feedback', 'onFeedback');
+      listen('complaint', 'onComplaint');
+      source.onerror = () => {
+        // Bilet kısa ömürlü olduğu için tarayıcının aynı URL ile yeniden denemesi yerine yeni bilet alınır
+        source?.close();
+        source = null;
+        scheduleReconnect();
+      };
+    };
+
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(timer);
+      source?.close();
+    };
+  }, [enabled]);
+};
+
+export default useRestaurantEvents;
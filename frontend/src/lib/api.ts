@@ -266,6 +266,11 @@ export const restaurantService = {
       throw error; // Hatayı fırlat, fake veri döndürme
     }
   },
+  openEvents: async () => {
+    // EventSource header gönderemediği için önce kısa ömürlü bir bilet alınır; token URL'ye yazılmaz
+    const response = await api.post('/api/restaurant/events/ticket');
+    return new EventSource(`${API_BASE_URL}/api/restaurant/events?ticket=${encodeURIComponent(response.data.ticket)}`);
+  },
   updateSettings: async (data: any) => {
     const response = await api.patch('/api/restaurant/settings', data);
     return response.data;
@@ -544,25 +549,29 @@ export const waitlistService = {
 
   getWaitlist: async () => {
     try {
-      // API'nin tam URL'ini kullanarak ve redirectleri takip ederek
-      const response = await axios({
-        method: 'get',
-        url: `${API_BASE_URL}/api/waitlist`,
-        headers: {
-          'Content-Type': 'application/json',
-          'Accept': 'application/json'
-        },
-        maxRedirects: 5,
-        withCredentials: false
-      });
-      
-      // Token kontrolü
       const token = localStorage.getItem('token');
-      if (token) {
-        response.config.headers.Authorization = `Bearer ${token}`;
-      }
+      const entries: any[] = [];
+      let cursor: string | null = null;
+
+      // Liste sayfalı döner, sonraki sayfanın cursor'ı X-Next-Cursor header'ında gelir
+      do {
+        const response = await axios({
+          method: 'get',
+          url: `${API_BASE_URL}/api/waitlist/`,
+          params: cursor ? { cursor } : {},
+          headers: {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+            ...(token ? { Authorization: `Bearer ${token}` } : {})
+          },
+          maxRedirects: 5,
+          withCredentials: false
+        });
+        entries.push(...response.data);
+        cursor = response.headers['x-next-cursor'] ?? null;
+      } while (cursor);
       
-      return response.data;
+      return entries;
     } catch (error: any) {
       console.error('Waitlist verisi alınamadı:', error);
       if (error.response?.data?.detail) {